@@ -0,0 +1,426 @@
+import sys
+import time
+import argparse
+from typing import List, Optional, Tuple, Dict
+
+import tong01
+
+# ------------------------
+# Exact blackjack analysis
+# ------------------------
+
+
+def deck_counts(game: tong01.Blackjack, decks: int = 1) -> Tuple[int, ...]:
+    """
+    Count the cards of a fresh deck by blackjack value.
+
+    Input:
+        game (tong01.Blackjack): Game whose suits and ranks make up the deck.
+        decks (int): Number of decks (default: 1).
+
+    Output:
+        Tuple[int, ...]: Ten counts, for values 1 (ace) to 10.
+
+    Description:
+        Uses Blackjack._card_value on every card code of a deck, so the ace is the card
+        worth 11 and J/Q/K count as 10 exactly like in the game.
+    """
+    counts = [0] * 10
+    for card in range(tong01.DECK_SIZE):
+        value = game._card_value(card)
+        counts[0 if value == 11 else value - 1] += decks
+    return tuple(counts)
+
+
+def hand_value(hard: int, ace: bool) -> int:
+    """
+    Best value of a hand, like Blackjack._hand_value.
+
+    Input:
+        hard (int): Total with every ace counted as 1.
+        ace (bool): The hand holds at least one ace.
+
+    Output:
+        int: hard + 10 if one ace can count as 11 without busting, else hard.
+    """
+    return hard + 10 if ace and hard + 10 <= 21 else hard
+
+
+class BlackjackSolver:
+    """
+    Memoized dynamic programming over deck composition (hit/stand only, like the game).
+
+    Input:
+        counts (Tuple[int, ...]): Cards per value 1 (ace) to 10, see deck_counts.
+        blackjack_pays (float): Net win of a player natural per unit bet (default: 1.5).
+        dealer_stands (int): Dealer hits below this value (default: 17, stands on soft 17).
+
+    Output:
+        None
+
+    Description:
+        Rules follow Blackjack.play_hand: both naturals push, a player natural pays
+        blackjack_pays, a dealer natural beats every other hand before the player acts, the
+        player may hit until 21 or bust and the dealer draws to dealer_stands. The dealer's
+        hole card is dealt before the player hits; by exchangeability it is drawn after the
+        player's cards here, weighted by "no dealer natural", so every value below is the
+        exact expectation times P(no dealer natural) (divide by no_natural to get the EV).
+    """
+
+    def __init__(self, counts: Tuple[int, ...], blackjack_pays: float = 1.5,
+                 dealer_stands: int = 17) -> None:
+        """
+        Create a solver.
+
+        Input:
+            counts (Tuple[int, ...]): Cards per value 1 (ace) to 10.
+            blackjack_pays (float): Net win of a player natural per unit bet.
+            dealer_stands (int): Dealer stand value.
+
+        Output:
+            None
+        """
+        self.counts = tuple(counts)
+        self.blackjack_pays = blackjack_pays
+        self.dealer_stands = dealer_stands
+        self._dealer_cache: Dict[Tuple, Tuple[float, ...]] = {}
+        self._stand_cache: Dict[Tuple, float] = {}
+        self._player_cache: Dict[Tuple, float] = {}
+        self._dealer_steps: Dict[Tuple[int, bool], List[Tuple[int, int, bool, int]]] = {}
+
+    def dealer_distribution(self, deck: Tuple[int, ...], hard: int, ace: bool) -> Tuple[float, ...]:
+        """
+        Distribution of the dealer's final value, for a dealer hand that still has to draw.
+
+        Input:
+            deck (Tuple[int, ...]): Cards left per value.
+            hard (int): Dealer's total with aces as 1.
+            ace (bool): The dealer holds an ace.
+
+        Output:
+            Tuple[float, ...]: Probability per final value from dealer_stands to 21, then bust.
+
+        Description:
+            Hands that stop after a card are added in place instead of recursing, which keeps
+            the number of calls (and of cached positions) down; the next-card transitions of
+            each dealer hand are looked up, not recomputed.
+        """
+        key = (deck, hard, ace)
+        cached = self._dealer_cache.get(key)
+        if cached is not None:
+            return cached
+        steps = self._dealer_steps.get((hard, ace))
+        if steps is None:
+            steps = self._dealer_steps[(hard, ace)] = self._next_cards(hard, ace)
+        result = [0.0] * (23 - self.dealer_stands)
+        left = sum(deck)
+        for i, new_hard, new_ace, final in steps:
+            count = deck[i]
+            if not count:
+                continue
+            p = count / left
+            if final >= 0:
+                result[final] += p
+            else:
+                sub = self.dealer_distribution(deck[:i] + (count - 1,) + deck[i + 1:], new_hard, new_ace)
+                result = [r + p * q for r, q in zip(result, sub)]
+        cached = self._dealer_cache[key] = tuple(result)
+        return cached
+
+    def _next_cards(self, hard: int, ace: bool) -> List[Tuple[int, int, bool, int]]:
+        """
+        Dealer hands reached by each card value (computed once per dealer hand).
+
+        Input:
+            hard (int): Dealer's total with aces as 1.
+            ace (bool): The dealer holds an ace.
+
+        Output:
+            List[Tuple[int, int, bool, int]]: (card index, new hard total, new ace flag,
+                index in the distribution if the dealer stops there, else -1).
+        """
+        steps = []
+        for i in range(10):
+            new_hard = hard + i + 1
+            new_ace = ace or i == 0
+            value = hand_value(new_hard, new_ace)
+            if new_hard > 21:
+                final = 22 - self.dealer_stands
+            elif value >= self.dealer_stands:
+                final = value - self.dealer_stands
+            else:
+                final = -1
+            steps.append((i, new_hard, new_ace, final))
+        return steps
+
+    def no_natural(self, deck: Tuple[int, ...], up: int) -> float:
+        """
+        Probability that the hole card does not give the dealer a natural.
+
+        Input:
+            deck (Tuple[int, ...]): Unseen cards (hole card included).
+            up (int): Index of the up card value (value - 1).
+
+        Output:
+            float: P(no dealer natural).
+        """
+        if up == 0:
+            return 1 - deck[9] / sum(deck)
+        if up == 9:
+            return 1 - deck[0] / sum(deck)
+        return 1.0
+
+    def stand(self, deck: Tuple[int, ...], value: int, up: int) -> float:
+        """
+        Value of standing (times P(no dealer natural)).
+
+        Input:
+            deck (Tuple[int, ...]): Unseen cards (hole card included).
+            value (int): Player's hand value (21 or less).
+            up (int): Index of the up card value (value - 1).
+
+        Output:
+            float: Expected net result per unit bet, weighted by "no dealer natural".
+        """
+        key = (deck, value, up)
+        cached = self._stand_cache.get(key)
+        if cached is not None:
+            return cached
+        stands = self.dealer_stands
+        # dealer finals below the player's value (and busts) win, above it lose
+        split = min(max(value - stands, 0), 22 - stands)
+        total = 0.0
+        left = sum(deck)
+        for hole, count in enumerate(deck):
+            if not count or (up == 0 and hole == 9) or (up == 9 and hole == 0):
+                continue
+            rest = deck[:hole] + (count - 1,) + deck[hole + 1:]
+            hard = up + hole + 2
+            ace = up == 0 or hole == 0
+            dealer = hand_value(hard, ace)
+            if dealer >= stands:
+                outcome = (value > dealer) - (value < dealer)
+            else:
+                dist = self.dealer_distribution(rest, hard, ace)
+                outcome = dist[-1] + sum(dist[:split]) - sum(dist[split + (value >= stands):-1])
+            total += count / left * outcome
+        cached = self._stand_cache[key] = total
+        return cached
+
+    def hit(self, deck: Tuple[int, ...], hard: int, ace: bool, up: int) -> float:
+        """
+        Value of taking one card and then playing on optimally (times P(no dealer natural)).
+
+        Input:
+            deck (Tuple[int, ...]): Unseen cards (hole card included).
+            hard (int): Player's total with aces as 1.
+            ace (bool): The player holds an ace.
+            up (int): Index of the up card value.
+
+        Output:
+            float: Expected net result per unit bet, weighted by "no dealer natural".
+        """
+        total = 0.0
+        left = sum(deck)
+        for i, count in enumerate(deck):
+            if not count:
+                continue
+            rest = deck[:i] + (count - 1,) + deck[i + 1:]
+            new_hard = hard + i + 1
+            if new_hard > 21:
+                total -= count / left * self.no_natural(rest, up)
+            else:
+                total += count / left * self.best(rest, new_hard, ace or i == 0, up)
+        return total
+
+    def best(self, deck: Tuple[int, ...], hard: int, ace: bool, up: int) -> float:
+        """
+        Value of the better of hit and stand (times P(no dealer natural)).
+
+        Input:
+            deck (Tuple[int, ...]): Unseen cards (hole card included).
+            hard (int): Player's total with aces as 1 (21 or less).
+            ace (bool): The player holds an ace.
+            up (int): Index of the up card value.
+
+        Output:
+            float: Expected net result per unit bet under optimal play.
+        """
+        key = (deck, hard, ace, up)
+        cached = self._player_cache.get(key)
+        if cached is None:
+            cached = max(self.stand(deck, hand_value(hard, ace), up), self.hit(deck, hard, ace, up))
+            self._player_cache[key] = cached
+        return cached
+
+    def expected_value(self) -> float:
+        """
+        Expected net result per unit bet off the top of a fresh deck, optimal play.
+
+        Input:
+            None
+
+        Output:
+            float: Expected net per unit bet (RTP is 1 + this).
+
+        Description:
+            Sums over every pair of player cards and every up card; hands are played with the
+            composition-dependent optimal hit/stand decision.
+        """
+        deck = self.counts
+        total = 0.0
+        left = sum(deck)
+        for first, c1 in enumerate(deck):
+            if not c1:
+                continue
+            d1 = deck[:first] + (c1 - 1,) + deck[first + 1:]
+            for second, c2 in enumerate(d1):
+                if not c2:
+                    continue
+                d2 = d1[:second] + (c2 - 1,) + d1[second + 1:]
+                for up, c3 in enumerate(d2):
+                    if not c3:
+                        continue
+                    d3 = d2[:up] + (c3 - 1,) + d2[up + 1:]
+                    p = c1 / left * c2 / (left - 1) * c3 / (left - 2)
+                    dealer_natural = 1 - self.no_natural(d3, up)
+                    if {first, second} == {0, 9}:
+                        total += p * (1 - dealer_natural) * self.blackjack_pays
+                    else:
+                        total += p * (self.best(d3, first + second + 2, first == 0 or second == 0, up)
+                                      - dealer_natural)
+        return total
+
+    def strategy_table(self) -> Dict[Tuple[int, bool, int], Tuple[float, float]]:
+        """
+        Stand and hit EVs for every (value, soft, up card) state.
+
+        Input:
+            None
+
+        Output:
+            Dict[Tuple[int, bool, int], Tuple[float, float]]: (value, soft, up card value 2-11)
+                -> (stand EV, hit EV), given that the dealer has no natural.
+
+        Description:
+            Total-dependent table: only the up card is removed from the deck, so every hand
+            with the same value is played the same way (the RTP uses the exact composition).
+        """
+        table = {}
+        for up in range(10):
+            deck = self.counts[:up] + (self.counts[up] - 1,) + self.counts[up + 1:]
+            scale = self.no_natural(deck, up)
+            up_value = 11 if up == 0 else up + 1
+            for value in range(4, 22):
+                for soft in (False, True):
+                    if soft and value < 12:
+                        continue
+                    hard = value - 10 if soft else value
+                    table[(value, soft, up_value)] = (self.stand(deck, value, up) / scale,
+                                                      self.hit(deck, hard, soft, up) / scale)
+        return table
+
+
+def analyze(game: tong01.Blackjack, decks: int = 1, blackjack_pays: float = 1.5,
+            dealer_stands: int = 17) -> Dict:
+    """
+    RTP and strategy table of the game's Blackjack rules.
+
+    Input:
+        game (tong01.Blackjack): Game whose deck is analyzed.
+        decks (int): Number of decks (default: 1).
+        blackjack_pays (float): Net win of a player natural (default: 1.5, i.e. 3:2).
+        dealer_stands (int): Dealer hits below this value (default: 17).
+
+    Output:
+        Dict: rtp, house_edge, table (see BlackjackSolver.strategy_table) and states
+            (number of memoized positions).
+    """
+    solver = BlackjackSolver(deck_counts(game, decks), blackjack_pays, dealer_stands)
+    ev = solver.expected_value()
+    table = solver.strategy_table()
+    return {
+        "rtp": 1 + ev,
+        "house_edge": -ev,
+        "table": table,
+        "states": len(solver._dealer_cache) + len(solver._stand_cache) + len(solver._player_cache),
+    }
+
+
+# ------------------------
+# Entry point
+# ------------------------
+def format_table(table: Dict[Tuple[int, bool, int], Tuple[float, float]], show_ev: bool) -> List[str]:
+    """
+    Render the strategy table, one row per player value.
+
+    Input:
+        table (Dict): Output of BlackjackSolver.strategy_table.
+        show_ev (bool): Print the EV of the better action instead of H/S.
+
+    Output:
+        List[str]: Lines to print.
+    """
+    ups = list(range(2, 12))
+    width = 7 if show_ev else 3
+    header = "".join(f"{'A' if up == 11 else up:>{width}}" for up in ups)
+    lines = [f"   {'hand':<9}{header}"]
+    for soft in (False, True):
+        for value in range(12 if soft else 4, 22):
+            cells = ""
+            for up in ups:
+                stand_ev, hit_ev = table[(value, soft, up)]
+                if show_ev:
+                    cells += f"{max(stand_ev, hit_ev):>+{width}.3f}"
+                else:
+                    cells += f"{'H' if hit_ev > stand_ev else 'S':>{width}}"
+            lines.append(f"   {('soft ' if soft else 'hard ') + str(value):<9}{cells}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Print the house edge and the hit/stand strategy table of the Blackjack rules.
+
+    Input:
+        argv (Optional[List[str]]): Arguments (default: sys.argv[1:]).
+
+    Output:
+        int: Process exit code (1 for invalid rules).
+
+    Description:
+        Defaults to the rules of tong01.Blackjack; the options price a rule change
+        (number of decks, natural payout, dealer stand value) without simulating.
+    """
+    parser = argparse.ArgumentParser(description="Exact house edge and strategy of Blackjack")
+    parser.add_argument("--decks", type=int, default=tong01.BLACKJACK_DECKS,
+                        help=f"number of decks (default: {tong01.BLACKJACK_DECKS}, TONG777_DECKS)")
+    parser.add_argument("--blackjack-pays", type=float, default=1.5,
+                        help="net win of a natural per unit bet (default: 1.5, i.e. 3:2)")
+    parser.add_argument("--dealer-stands", type=int, default=17,
+                        help="dealer hits below this value (default: 17)")
+    parser.add_argument("--ev", action="store_true", help="show EVs instead of H/S")
+    args = parser.parse_args(argv)
+    if args.decks <= 0 or not 12 <= args.dealer_stands <= 21:
+        print("❌ Invalid rules: need at least 1 deck and a dealer stand value of 12-21")
+        return 1
+
+    started = time.perf_counter()
+    stats = analyze(tong01.Blackjack(tong01.ScriptedConsole(())), args.decks,
+                    args.blackjack_pays, args.dealer_stands)
+    elapsed = time.perf_counter() - started
+
+    print(f"🃏 Blackjack: {args.decks} deck(s), natural pays {args.blackjack_pays:g}, "
+          f"dealer stands on {args.dealer_stands}, hit/stand only")
+    print(f"   RTP            {stats['rtp'] * 100:.4f}% (optimal play, fresh deck)")
+    print(f"   House edge     {stats['house_edge'] * 100:+.4f}%")
+    print(f"\n   {'EV of the better action' if args.ev else 'H = hit, S = stand'} "
+          f"by player hand and dealer up card:")
+    for line in format_table(stats["table"], args.ev):
+        print(line)
+    print(f"\n   computed in {elapsed:.2f}s ({stats['states']:,} memoized states)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
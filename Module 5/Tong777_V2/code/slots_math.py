@@ -0,0 +1,240 @@
+import sys
+import math
+import time
+import argparse
+from fractions import Fraction
+from itertools import product
+from typing import List, Optional, Dict
+
+import tong01
+
+# ------------------------
+# Exact paytable analysis
+# ------------------------
+
+
+def outcome_label(special_count: int, net: int) -> str:
+    """
+    Name the outcome class of a spin.
+
+    Input:
+        special_count (int): Number of special symbols on the reels.
+        net (int): Net result of the spin.
+
+    Output:
+        str: Label used in the contribution table.
+    """
+    if special_count:
+        return f"{special_count}x special"
+    return "triple match" if net > 0 else "no win"
+
+
+def analyze(game: tong01.Slots) -> Dict:
+    """
+    Exact return-to-player statistics of a Slots paytable.
+
+    Input:
+        game (tong01.Slots): Game whose symbols, weights and multipliers are analyzed.
+
+    Output:
+        Dict: rtp, hit_frequency, variance, std_dev (per unit bet, as floats), and
+            outcomes: {label: {"probability", "net", "rtp"}} with exact Fractions.
+
+    Description:
+        Enumerates every reel combination (len(symbols) ** 3) with probability equal to the
+        product of the normalized weights, and settles it with Slots.settle at a bet of 1, so
+        the numbers follow the game exactly as coded. Sums are done in Fractions, so the
+        result has no rounding error.
+    """
+    weights = [Fraction(str(w)) for w in game.weights]
+    total_weight = sum(weights)
+    probabilities = [w / total_weight for w in weights]
+
+    outcomes: Dict[str, Dict] = {}
+    mean = Fraction(0)
+    second_moment = Fraction(0)
+    hit = Fraction(0)
+    for (i, p1), (j, p2), (k, p3) in product(enumerate(probabilities), repeat=3):
+        probability = p1 * p2 * p3
+        if probability == 0:
+            continue
+        net, special_count = game.settle(game.symbols[i], game.symbols[j], game.symbols[k], 1)
+        mean += probability * net
+        second_moment += probability * net * net
+        if net > 0:
+            hit += probability
+        entry = outcomes.setdefault(outcome_label(special_count, net),
+                                    {"probability": Fraction(0), "net": net, "rtp": Fraction(0)})
+        entry["probability"] += probability
+        entry["rtp"] += probability * (1 + net)  # stake back plus net result
+
+    variance = second_moment - mean * mean
+    return {
+        "rtp": float(1 + mean),
+        "hit_frequency": float(hit),
+        "variance": float(variance),
+        "std_dev": math.sqrt(variance),
+        "outcomes": outcomes,
+    }
+
+
+# ------------------------
+# Vectorized Monte Carlo
+# ------------------------
+def simulate(game: tong01.Slots, spins: int, chunk: int = 1000000, seed: Optional[int] = None) -> Dict:
+    """
+    Monte Carlo check of a Slots paytable with NumPy (optional dependency).
+
+    Input:
+        game (tong01.Slots): Game whose symbols, weights and multipliers are simulated.
+        spins (int): Number of spins.
+        chunk (int): Spins drawn per array operation (bounds memory, default: 1000000).
+        seed (Optional[int]): Seed for a reproducible run (default: random).
+
+    Output:
+        Dict: spins, rtp, half_width (95% CI), hit_frequency and elapsed seconds.
+
+    Description:
+        Draws reels the way Slots._weighted_choices does (random.choices: a uniform number
+        times the total weight, located in the cumulative weights with bisect_right), but for
+        a whole chunk at once: the reel index is the number of cumulative weights <= the draw.
+        The three indexes form one combination code per spin and np.bincount counts them.
+        Payouts come from a table built with Slots.settle at a bet of 1, so specials and the
+        triple-match branch are settled by the game's own code. Memory use is about
+        chunk * 25 bytes whatever the number of spins. Raises ImportError without NumPy.
+    """
+    import numpy as np
+
+    n = len(game.symbols)
+    payout = [game.settle(r1, r2, r3, 1)[0] for r1, r2, r3 in product(game.symbols, repeat=3)]
+    cumulative = np.cumsum(np.asarray(game.weights, dtype=np.float64))
+    bounds = cumulative[:-1] / cumulative[-1]
+    code_type = np.min_scalar_type(n ** 3 - 1)
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(n ** 3, dtype=np.int64)
+
+    started = time.perf_counter()
+    for start in range(0, spins, chunk):
+        size = min(chunk, spins - start)
+        draws = rng.random((3, size))
+        codes = np.zeros(size, dtype=code_type)
+        for reel in draws:
+            index = np.zeros(size, dtype=code_type)
+            for bound in bounds:
+                index += reel >= bound
+            codes = codes * n + index
+        counts += np.bincount(codes, minlength=n ** 3)
+    elapsed = time.perf_counter() - started
+
+    # exact integer sums over the per-combination counts
+    total = sum(int(c) * net for c, net in zip(counts, payout))
+    squares = sum(int(c) * net * net for c, net in zip(counts, payout))
+    hits = sum(int(c) for c, net in zip(counts, payout) if net > 0)
+    mean = total / spins
+    variance = max(0.0, squares / spins - mean * mean)
+    return {
+        "spins": spins,
+        "rtp": 1 + mean,
+        "half_width": 1.96 * math.sqrt(variance / spins),
+        "hit_frequency": hits / spins,
+        "elapsed": elapsed,
+    }
+
+
+# ------------------------
+# Entry point
+# ------------------------
+def parse_multipliers(text: str) -> Dict[int, int]:
+    """
+    Parse a multiplier table such as "3=100,2=25,1=5".
+
+    Input:
+        text (str): Comma separated count=multiplier pairs.
+
+    Output:
+        Dict[int, int]: Multiplier per number of special symbols.
+
+    Description:
+        Raises ValueError for malformed input.
+    """
+    table = {}
+    for pair in text.split(","):
+        count, _, multiplier = pair.partition("=")
+        table[int(count)] = int(multiplier)
+    return table
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Print the exact RTP report of the Slots paytable.
+
+    Input:
+        argv (Optional[List[str]]): Arguments (default: sys.argv[1:]).
+
+    Output:
+        int: Process exit code (1 for invalid tables or if --max-rtp is exceeded).
+
+    Description:
+        Uses the weights and multipliers in tong01.Slots unless overridden, so a proposed
+        table can be checked before it is deployed; --max-rtp turns the report into a check.
+        --simulate N adds a NumPy Monte Carlo run of N spins and compares it with the exact RTP.
+    """
+    parser = argparse.ArgumentParser(description="Exact RTP and variance of the Slots paytable")
+    parser.add_argument("--weights", help="comma separated symbol weights (special symbol first)")
+    parser.add_argument("--multipliers", help='special symbol multipliers, e.g. "3=100,2=25,1=5"')
+    parser.add_argument("--max-rtp", type=float, help="fail if the RTP (in %%) is above this")
+    parser.add_argument("--simulate", type=int, metavar="SPINS",
+                        help="also run a vectorized Monte Carlo check (needs numpy)")
+    parser.add_argument("--chunk", type=int, default=1000000, help="spins per simulated chunk")
+    parser.add_argument("--seed", type=int, help="seed for a reproducible simulation")
+    args = parser.parse_args(argv)
+
+    game = tong01.Slots(tong01.ScriptedConsole(()))
+    try:
+        if args.weights:
+            game.weights = [float(w) for w in args.weights.split(",")]
+        if args.multipliers:
+            game.multipliers = parse_multipliers(args.multipliers)
+        if len(game.weights) != len(game.symbols) or min(game.weights) < 0 or sum(game.weights) <= 0:
+            raise ValueError(f"need {len(game.symbols)} non-negative weights")
+        if sorted(game.multipliers) != [1, 2, 3]:
+            raise ValueError("need multipliers for 1, 2 and 3 specials")
+    except ValueError as e:
+        print(f"❌ Invalid paytable: {e}")
+        return 1
+
+    started = time.perf_counter()
+    stats = analyze(game)
+    elapsed = time.perf_counter() - started
+
+    print(f"🎰 Slots paytable: weights {game.weights}, multipliers {game.multipliers}")
+    print(f"   RTP            {stats['rtp'] * 100:.4f}%")
+    print(f"   Hit frequency  {stats['hit_frequency'] * 100:.4f}%")
+    print(f"   Variance       {stats['variance']:.4f} (std dev {stats['std_dev']:.4f} bets)")
+    print(f"\n   {'outcome':<14}{'probability':>14}{'net':>8}{'RTP share':>12}")
+    for label, entry in sorted(stats["outcomes"].items(), key=lambda item: -item[1]["net"]):
+        print(f"   {label:<14}{float(entry['probability']) * 100:>13.4f}%{entry['net']:>+8}"
+              f"{float(entry['rtp']) * 100:>11.4f}%")
+    print(f"\n   computed in {elapsed * 1000:.1f} ms")
+
+    if args.simulate:
+        try:
+            sim = simulate(game, args.simulate, max(1, args.chunk), args.seed)
+        except ImportError:
+            print("❌ --simulate needs numpy (pip install numpy)")
+            return 1
+        z = (sim["rtp"] - stats["rtp"]) / (sim["half_width"] / 1.96) if sim["half_width"] else 0.0
+        print(f"\n🎲 Monte Carlo: {sim['spins']:,} spins in {sim['elapsed']:.2f}s "
+              f"- {sim['spins'] / sim['elapsed']:,.0f} spins/s")
+        print(f"   RTP            {sim['rtp'] * 100:.4f}% ± {sim['half_width'] * 100:.4f}% (95% CI)")
+        print(f"   Hit frequency  {sim['hit_frequency'] * 100:.4f}%")
+        print(f"   vs exact       z = {z:+.2f}")
+
+    if args.max_rtp is not None and stats["rtp"] * 100 > args.max_rtp:
+        print(f"❌ RTP above {args.max_rtp}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import multiprocessing
+import os
+import tempfile
+
+# tong01 derives its storage paths from HOME when it is imported
+os.environ["HOME"] = tempfile.mkdtemp(prefix="tong777-test-")
+
+import pytest
+
+import tong01
+
+HASH1 = "$2b$04$" + "a" * 53
+HASH2 = "$2b$04$" + "b" * 53
+
+
+def open_store(mode: str, directory: str) -> tong01.PlayerStore:
+    """
+    Open a store of the given backend.
+
+    Input:
+        mode (str): Key in tong01.STORES.
+        directory (str): Directory for the SQLite database / player table.
+
+    Output:
+        tong01.PlayerStore: The opened store.
+
+    Description:
+        File and ledger stores live under tong01.BASE_PATH (the temporary HOME).
+    """
+    if mode == "sqlite":
+        return tong01.SQLiteStore(os.path.join(directory, "players.db"))
+    if mode == "table":
+        return tong01.TableStore(os.path.join(directory, "players.tbl"))
+    return tong01.STORES[mode]()
+
+
+@pytest.mark.parametrize("mode", sorted(tong01.STORES))
+def test_hash_change_is_saved_with_unchanged_wallet(mode, tmp_path):
+    username = f"bob_{mode}"
+    store = open_store(mode, str(tmp_path))
+    try:
+        store.save(username, HASH1, 1000)
+        store.save(username, HASH2, 1000)
+        assert store.load(username) == (HASH2, 1000)
+    finally:
+        store.close()
+    store = open_store(mode, str(tmp_path))
+    try:
+        assert store.load(username) == (HASH2, 1000)
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("mode", sorted(tong01.STORES))
+def test_hash_change_after_wallet_change(mode, tmp_path):
+    username = f"carol_{mode}"
+    store = open_store(mode, str(tmp_path))
+    try:
+        store.save(username, HASH1, 1000)
+        store.save(username, HASH1, 1500)
+        store.save(username, HASH2, 1500)
+        store.save(username, HASH2, 1200)
+        assert store.load(username) == (HASH2, 1200)
+    finally:
+        store.close()
+    store = open_store(mode, str(tmp_path))
+    try:
+        assert store.load(username) == (HASH2, 1200)
+    finally:
+        store.close()
+
+
+def test_ledger_hash_change_survives_crash_before_compaction():
+    username = "dave_ledger"
+    store = tong01.LedgerStore()
+    store.save(username, HASH1, 1000)
+    store.save(username, HASH1, 1500)  # ledger tail
+    store.save(username, HASH2, 1500)
+    store.sync()
+    store.ledger._fh.close()  # crash: no compaction, the tail is replayed on the next open
+    store = tong01.LedgerStore()
+    try:
+        assert store.load(username) == (HASH2, 1500)
+    finally:
+        store.close()
+
+
+def test_ledger_snapshots_are_synced_and_known_players_bounded(monkeypatch):
+    monkeypatch.setattr(tong01, "LEDGER_KNOWN_PLAYERS", 2)
+    store = tong01.LedgerStore()
+    try:
+        for i in range(4):
+            store.save(f"erin{i}_ledger", HASH1, 100)
+        assert tong01.player_file_path("erin3_ledger") in store._unsynced
+        assert list(store.saved) == ["erin2_ledger", "erin3_ledger"]
+        store.sync()
+        assert store._unsynced == []
+        store.save("erin0_ledger", HASH1, 250)  # evicted player: saved as a snapshot again
+        assert store.load("erin0_ledger") == (HASH1, 250)
+    finally:
+        store.close()
+
+
+def fill_table(path: str, prefix: str, count: int) -> None:
+    """
+    Append players to a player table (runs in a separate process).
+
+    Input:
+        path (str): Table file path.
+        prefix (str): Username prefix of this writer.
+        count (int): Number of players to append.
+
+    Output:
+        None
+    """
+    store = tong01.TableStore(path)
+    try:
+        for i in range(count):
+            store.save(f"{prefix}{i}", HASH1, i)
+    finally:
+        store.close()
+
+
+def test_table_appends_from_several_processes(tmp_path):
+    path = str(tmp_path / "players.tbl")
+    stale = tong01.TableStore(path)  # opened before the other processes grow the file
+    try:
+        context = multiprocessing.get_context("spawn")
+        writers = [context.Process(target=fill_table, args=(path, prefix, 1500))
+                   for prefix in ("p", "q")]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        assert [writer.exitcode for writer in writers] == [0, 0]
+        assert stale.exists("q1499")
+        assert stale.load("p1234") == (HASH1, 1234)
+        assert stale.create("p0", HASH2, 0) is False
+        assert stale.create("r0", HASH2, 7) is True
+        assert len(list(stale.usernames())) == 3001
+    finally:
+        stale.close()
+    reopened = tong01.TableStore(path)
+    try:
+        assert reopened.load("r0") == (HASH2, 7)
+        assert all(reopened.load(f"q{i}") == (HASH1, i) for i in range(1500))
+    finally:
+        reopened.close()
+
+
+def test_ledger_overwrite_of_player_with_tail():
+    username = "frank_ledger"
+    store = tong01.LedgerStore()
+    try:
+        store.save(username, HASH1, 1000)
+        store.save(username, HASH1, 123400)  # ledger tail
+        store.saved.clear()  # like tong_admin migrate --overwrite: the player was never loaded
+        store.save_many([(username, HASH2, 500)])
+        assert store.load(username) == (HASH2, 500)
+        store.sync()
+        store.ledger._fh.close()  # crash before compaction
+        store = tong01.LedgerStore()
+        assert store.load(username) == (HASH2, 500)
+    finally:
+        store.close()
@@ -1,10 +1,27 @@
 import os
 import sys
 import time
+import array
+import bisect
+import errno
+import fcntl
+import hashlib
+import hmac
+import mmap
 import random
+import re
+import queue
+import sqlite3
+import struct
+import threading
 import bcrypt
+import asyncio
+import multiprocessing
 from abc import ABC, abstractmethod
-from typing import Optional, List, Tuple, Generator
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, List, Tuple, Dict, Iterable, Iterator, Generator
 import subprocess
 import platform
 import tty
@@ -68,7 +85,6 @@ menu_pic = r"""
 # Utility
 # ------------------------
 
-
 def get_char(prompt: str = "") -> str:
     """
     Read and return a single character from input (no Enter required).
@@ -100,12 +116,12 @@ def get_char(prompt: str = "") -> str:
         return ch
 
 
-def press_to_continue() -> None:
+def press_to_continue(console: "Console") -> None:
     """
     Pause execution until the user presses any key.
 
     Input:
-        None
+        console (Console): Where to prompt and read the key.
 
     Output:
         None
@@ -113,9 +129,70 @@ def press_to_continue() -> None:
     Description:
         Shows a prompt and uses get_char to wait for one key press.
     """
-    print("\n\n\tPress any key to continue...", end="", flush=True)
-    get_char()
-    print()
+    console.print("\n\n\tPress any key to continue...", end="", flush=True)
+    console.read_char()
+    console.print()
+
+
+ANSI_CLEAR = "\033[H\033[2J\033[3J"  # cursor home, clear screen, clear scrollback
+_ansi_enabled = os.name != "nt"
+
+
+def _enable_ansi() -> None:
+    """
+    Turn on ANSI escape processing in the Windows console (once; nothing to do elsewhere).
+
+    Input:
+        None
+
+    Output:
+        None
+    """
+    global _ansi_enabled
+    if _ansi_enabled:
+        return
+    _ansi_enabled = True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except Exception:
+        pass
+
+
+def render_screen(*sections: str) -> str:
+    """
+    Compose a whole screen into one string.
+
+    Input:
+        *sections (str): Screen parts from top to bottom (banner, status line, body).
+
+    Output:
+        str: ANSI_CLEAR followed by every section and a newline after each.
+
+    Description:
+        The same text as clearing the screen and printing each section, so a screen can be
+        sent with one write instead of one per line.
+    """
+    return ANSI_CLEAR + "".join(f"{section}\n" for section in sections)
+
+
+def show_screen(*sections: str) -> None:
+    """
+    Replace the terminal screen with a single write.
+
+    Input:
+        *sections (str): Screen parts from top to bottom.
+
+    Output:
+        None
+    """
+    _enable_ansi()
+    sys.stdout.write(render_screen(*sections))
+    sys.stdout.flush()
 
 
 def clear_screen() -> None:
@@ -129,9 +206,10 @@ def clear_screen() -> None:
         None
 
     Description:
-        Clear terminal screen using 'cls' command on Windows or 'clear' on Unix-like systems.
+        Writes ANSI_CLEAR to stdout instead of running the 'clear'/'cls' program, so no shell
+        is started for every screen.
     """
-    os.system('cls' if os.name == 'nt' else 'clear')
+    show_screen()
 
 
 def loading_screen() -> None:
@@ -151,14 +229,10 @@ def loading_screen() -> None:
                "♥︎ ♡ ♦︎ ♢", "♡ ♦︎ ♢ ♠", "♦︎ ♢ ♠︎ ♤", "♢ ♦︎ ♤ ♣︎"]
     time.sleep(0.4)
     for symbol in symbols:
-        clear_screen()
-        print(tong_777_pic)
-        print(loading_pic)
-        print(
-            f"\n\n                                                     {symbol}\n")
+        show_screen(tong_777_pic, loading_pic,
+                    f"\n\n                                                     {symbol}\n")
         time.sleep(0.4)
-    clear_screen()
-    print(tong_777_pic)
+    show_screen(tong_777_pic)
     time.sleep(0.4)
 
 
@@ -191,393 +265,4204 @@ def open_image(image_path: str) -> bool:
 
 
 # ------------------------
-# Storage path
+# Console I/O
 # ------------------------
+class Console(ABC):
+    """
+    Text I/O used by the menus and games (Interface).
 
-BASE_PATH = os.path.join(os.path.expanduser("~"), ".tong777_players")
-os.makedirs(BASE_PATH, exist_ok=True)
+    Input:
+        None
 
-# ------------------------
-# Player Class
-# ------------------------
+    Output:
+        None
 
+    Description:
+        Games, game_session and the menus never call print/input/get_char/clear_screen/
+        time.sleep directly; they go through the Console they were given. TerminalConsole
+        is the local terminal, ScriptedConsole answers from a list without rendering or
+        sleeping (simulation, testing), NetworkConsole talks to a TCP client (server mode).
+    """
+    local: bool = False  # True if the player sits at this machine (can see opened images)
 
-class Player:
-    def __init__(self, username: str, hashed_password: str, wallet: float = 0.0) -> None:
+    @abstractmethod
+    def write(self, text: str) -> None:
         """
-        Initialize a Player instance.
+        Output text as is.
 
         Input:
-            username (str): The player's username.
-            hashed_password (str): The bcrypt-hashed password as a string.
-            wallet (float): The player's starting balance (default: 0.0).
+            text (str): Text to show.
 
         Output:
             None
-
-        Description:
-            Creates a new Player object with username, hashed password, and wallet balance.
         """
-        self.username = username
-        self.hashed_password = hashed_password  # stored as decoded str
-        self.wallet = float(wallet)
+        pass
 
-    @property
-    def filepath(self) -> str:
+    @abstractmethod
+    def read_line(self, prompt: str = "") -> str:
         """
-        Get the file path for this player's data file.
+        Show a prompt and read one line (like input()).
 
         Input:
-            None
+            prompt (str): Prompt text.
 
         Output:
-            str: Full path to the player's data file.
-
-        Description:
-            Constructs the file path by combining BASE_PATH with the username and .txt extension.
+            str: The line without its line ending. Raises EOFError when input ends.
         """
-        return os.path.join(BASE_PATH, f"{self.username}.txt")
+        pass
 
-    def save(self) -> None:
+    @abstractmethod
+    def read_char(self, prompt: str = "") -> str:
         """
-        Save player data to file.
+        Show a prompt and read a single key (like get_char()).
 
         Input:
-            None
+            prompt (str): Prompt text.
 
         Output:
-            None
-
-        Description:
-            Writes player data (username, hashed_password, wallet) to a text file using context manager
-            (with open). Handles IOError and OSError exceptions by printing error messages.
+            str: One character. Raises EOFError when input ends.
         """
-        try:
-            with open(self.filepath, "w", encoding="utf-8") as f:
-                f.write(
-                    f"{self.username},{self.hashed_password},{self.wallet:.2f}")
-        except (IOError, OSError) as e:
-            print("❌ Error saving player data:", e)
+        pass
 
-    @classmethod
-    def load(cls, username: str) -> Optional["Player"]:
+    def print(self, *args, sep: str = " ", end: str = "\n", flush: bool = False) -> None:
         """
-        Load player data from file.
+        Output values like the built-in print().
 
         Input:
-            username (str): The username to load.
+            *args: Values to show.
+            sep (str): Separator between values.
+            end (str): Text after the last value.
+            flush (bool): Flush the output right away.
 
         Output:
-            Optional[Player]: Player object if found and valid, None otherwise.
-
-        Description:
-            Reads player data from file, parses it, and creates a Player instance.
-            Returns None if file doesn't exist or data is invalid. Handles I/O and parsing errors.
+            None
         """
-        filename = os.path.join(BASE_PATH, f"{username}.txt")
-        if not os.path.exists(filename):
-            return None
-        try:
-            with open(filename, "r", encoding="utf-8") as f:
-                raw = f.read().strip()
-        except (IOError, OSError) as e:
-            print("❌ Error reading player file:", e)
-            return None
+        self.write(sep.join(str(arg) for arg in args) + end)
+        if flush:
+            self.flush()
 
-        try:
-            parts = raw.split(",")
-            if len(parts) != 3:
-                raise ValueError("Invalid player file format")
-            _, hashed_password, wallet_s = parts
-            wallet = float(wallet_s)
-            return cls(username=username, hashed_password=hashed_password, wallet=wallet)
-        except (ValueError, TypeError) as e:
-            print("❌ Error parsing player file:", e)
-            return None
-
-    @classmethod
-    def create_new(cls, username: str, password_plain: str, starting_wallet: float = 100.0) -> "Player":
+    def flush(self) -> None:
         """
-        Create a new player with hashed password.
+        Push buffered output to the player (no-op by default).
 
         Input:
-            username (str): The desired username.
-            password_plain (str): The plaintext password to hash.
-            starting_wallet (float): Initial wallet balance (default: 100.0).
+            None
 
         Output:
-            Player: A new Player instance with hashed password.
-
-        Description:
-            Creates a new player by hashing the password with bcrypt (using String Encodings), 
-            initializing the wallet, and immediately saving to file.
+            None
         """
-        hashed = bcrypt.hashpw(
-            password_plain.encode("utf-8"), bcrypt.gensalt())
-        hashed_s = hashed.decode("utf-8")
-        player = cls(username=username, hashed_password=hashed_s,
-                     wallet=float(starting_wallet))
-        player.save()
-        return player
+        pass
 
-    def check_password(self, password_plain: str) -> bool:
+    def clear(self) -> None:
         """
-        Verify a plaintext password against stored hash.
+        Clear the screen (no-op by default).
 
         Input:
-            password_plain (str): The plaintext password to check.
+            None
 
         Output:
-            bool: True if password matches, False otherwise.
-
-        Description:
-            Uses bcrypt to compare the plaintext password (encoded to bytes) with the stored hash (also bytes).
-            Returns False if any exception occurs during verification.
+            None
         """
-        try:
-            return bcrypt.checkpw(password_plain.encode("utf-8"), self.hashed_password.encode("utf-8"))
-        except Exception:
-            return False
+        pass
 
-    # Wallet operations with validation + try/except for user input
-    def update_wallet(self, amount: float) -> None:
+    def screen(self, *sections: str) -> None:
         """
-        Update wallet balance by adding or subtracting an amount.
+        Replace the screen: clear it and show the sections (like one print() per section).
 
         Input:
-            amount (float): Amount to add (positive) or subtract (negative).
+            *sections (str): Screen parts from top to bottom (banner, status line, body).
 
         Output:
             None
 
         Description:
-            Adds the specified amount to the wallet, rounds the new balance to 2 decimal places, 
-            and handles potential conversion errors (ValueError, TypeError).
+            Real terminals override this to send the whole screen in a single write
+            (see render_screen).
         """
-        try:
-            new_balance = float(self.wallet) + float(amount)
-        except (ValueError, TypeError):
-            print("❌ Invalid amount to update wallet.")
-            return
-        self.wallet = round(new_balance, 2)
+        self.clear()
+        self.write("".join(f"{section}\n" for section in sections))
+        self.flush()
 
-    def deposit_interactive(self) -> None:
+    def sleep(self, seconds: float) -> None:
         """
-        Interactive deposit interface for adding funds.
+        Pause for an animation or message (no-op by default).
 
         Input:
-            None
+            seconds (float): Pause length.
 
         Output:
             None
-
-        Description:
-            Prompts user to enter deposit amount and transaction ID, validates input (non-negative float),
-            updates wallet, and saves player data. Includes a placeholder for QR code display.
         """
-        qr_path = "/Users/kung/Intro to programming_Python/Fay_Python/Module 5/Tong777_V2/images/QR_PromptPay.png"
+        pass
+
+
+class TerminalConsole(Console):
+    """
+    The local terminal: stdout, input(), get_char(), ANSI screens and time.sleep().
+
+    Input:
+        None
+
+    Output:
+        None
+    """
+    local = True
+
+    def write(self, text: str) -> None:
+        """Write to stdout."""
+        sys.stdout.write(text)
 
+    def read_line(self, prompt: str = "") -> str:
+        """Read a line with input()."""
+        return input(prompt)
+
+    def read_char(self, prompt: str = "") -> str:
+        """Read a key with get_char()."""
+        return get_char(prompt)
+
+    def flush(self) -> None:
+        """Flush stdout."""
+        sys.stdout.flush()
+
+    def clear(self) -> None:
+        """Clear the terminal."""
         clear_screen()
-        print("----[ Deposit Funds ]----")
-        print(f"Current balance: {self.wallet:.2f}")
-        print("\n(Placeholder) Please transfer funds and enter transaction ID when done.")
 
-        while True:
-            amt = input("Amount to deposit (0 to cancel): ").strip()
-            try:
-                if amt == "":
-                    print("Please enter a number.")
-                    continue
-                amt_f = float(amt)
-                if amt_f < 0:
-                    print("Enter positive amount.")
-                    continue
-                if amt_f == 0:
-                    print("Deposit cancelled.")
-                    return
-                break
-            except ValueError:
-                print("❌ Invalid number, try again.")
+    def screen(self, *sections: str) -> None:
+        """Draw the whole screen with one write."""
+        show_screen(*sections)
 
-        # Open QR Code
-        print("\n📱 Opening PromptPay QR Code...")
-        if open_image(qr_path):
-            print("✅ QR Code opened!")
-        else:
-            print("⚠️  Could not open QR Code")
+    def sleep(self, seconds: float) -> None:
+        """Sleep for real."""
+        time.sleep(seconds)
 
-        tx = input("\nTransaction ID: ").strip()
-        # in real app, validate tx
-        self.update_wallet(amt_f)
-        self.save()
-        print(f"✅ Deposited {amt_f:.2f}. New balance: {self.wallet:.2f}")
-        time.sleep(1)
 
-    def withdraw_interactive(self) -> None:
+class ScriptedConsole(Console):
+    """
+    Console that plays from a list of answers at machine speed.
+
+    Input:
+        answers (Iterable[str]): Answers to the prompts, in order (lines or keys).
+        record (bool): Keep the output in self.output (default: False, output is dropped).
+
+    Output:
+        None
+
+    Description:
+        Nothing is rendered and clear/sleep do nothing, so rounds run as fast as their logic.
+        read_char answers with the first character of the next answer. Raises EOFError when
+        the answers run out.
+    """
+
+    def __init__(self, answers: Iterable[str], record: bool = False) -> None:
         """
-        Interactive withdrawal interface for removing funds.
+        Create a console over a sequence of answers.
 
         Input:
-            None
+            answers (Iterable[str]): Answers in order.
+            record (bool): Keep the output.
 
         Output:
             None
+        """
+        self._answers = iter(answers)
+        self.record = record
+        self.output: List[str] = []
 
-        Description:
-            Prompts user to enter withdrawal amount and destination. Validates that the amount
-            is non-negative and does not exceed the current balance. Updates wallet and saves.
+    def _next(self, prompt: str) -> str:
         """
-        clear_screen()
-        print("----[ Withdraw Funds ]----")
-        print(f"Current balance: {self.wallet:.2f}")
-        while True:
-            amt = input("Amount to withdraw (0 to cancel): ").strip()
-            try:
-                if amt == "":
-                    print("Please enter a number.")
-                    continue
-                amt_f = float(amt)
-                if amt_f < 0:
-                    print("Enter positive amount.")
-                    continue
-                if amt_f == 0:
-                    print("Withdrawal cancelled.")
-                    return
-                if amt_f > self.wallet:
-                    print("❌ Not enough balance.")
-                    continue
-                break
-            except ValueError:
-                print("❌ Invalid number, try again.")
-        dest = input("Enter destination (placeholder): ").strip()
-        self.update_wallet(-amt_f)
-        self.save()
-        print(f"✅ Withdrew {amt_f:.2f}. New balance: {self.wallet:.2f}")
-        time.sleep(1)
+        Take the next answer.
+
+        Input:
+            prompt (str): Prompt being answered (recorded only).
+
+        Output:
+            str: The answer.
+        """
+        self.write(prompt)
+        try:
+            return next(self._answers)
+        except StopIteration:
+            raise EOFError("scripted answers exhausted") from None
+
+    def write(self, text: str) -> None:
+        """Record the text if recording, otherwise drop it."""
+        if self.record:
+            self.output.append(text)
+
+    def read_line(self, prompt: str = "") -> str:
+        """Answer with the next scripted line."""
+        return self._next(prompt)
+
+    def read_char(self, prompt: str = "") -> str:
+        """Answer with the first character of the next scripted answer."""
+        return self._next(prompt)[:1]
 
 
 # ------------------------
-# Input helpers
+# Money (integer cents)
 # ------------------------
-def is_positive_number(text: str) -> bool:
+MAX_CENTS = 2**63 - 1  # largest balance the SQLite and table backends can store (signed 64-bit)
+
+
+def parse_cents(text: str) -> int:
     """
-    Validate if a string represents a positive number with max 2 decimals.
+    Parse a decimal amount into integer cents.
 
     Input:
-        text (str): String to validate.
+        text (str): Amount such as "12", "12.5", "+12.50" or "-3.25".
 
     Output:
-        bool: True if valid positive number (including zero), False otherwise.
+        int: Amount in cents (e.g. "12.5" -> 1250).
 
     Description:
-        Checks format validity (max 2 decimals, allows optional leading +) and ensures
-        the parsed float value is non-negative. Uses try/except for robust parsing.
+        Parses the digits directly, without going through float, so large balances
+        such as 1000000390.00 are exact. Raises ValueError for anything that is not
+        a plain decimal number with at most 2 decimals, or whose size exceeds MAX_CENTS.
     """
-    try:
-        s = text.strip()
-        if s == "" or s == ".":
-            return False
-        if s.count(".") > 1:
-            return False
-        if s[0] == "+":
-            s = s[1:]
-        if not s.replace(".", "", 1).isdigit():
-            return False
-        if "." in s:
-            decimals = s.split(".", 1)[1]
-            if len(decimals) > 2:
-                return False
-        return float(s) >= 0
-    except Exception:
-        return False
-
-
-def get_valid_bet(current_money: float) -> float:
+    s = text.strip()
+    sign = 1
+    if s[:1] in ("+", "-"):
+        sign = -1 if s[0] == "-" else 1
+        s = s[1:]
+    whole, _, frac = s.partition(".")
+    if (whole == "" and frac == "") or len(frac) > 2 \
+            or not (whole == "" or whole.isdigit()) or not (frac == "" or frac.isdigit()):
+        raise ValueError(f"Invalid amount: {text!r}")
+    cents = int(whole or "0") * 100 + int(frac.ljust(2, "0"))
+    if cents > MAX_CENTS:
+        raise ValueError(f"Amount too large: {text!r}")
+    return sign * cents
+
+
+def format_cents(cents: int, sign: bool = False) -> str:
     """
-    Prompt user for a valid bet amount.
+    Format integer cents as a decimal amount.
 
     Input:
-        current_money (float): Player's current balance.
+        cents (int): Amount in cents.
+        sign (bool): Always show the sign, also for positive amounts (default: False).
 
     Output:
-        float: Valid bet amount (rounded to 2 decimals), or 0.0 if user cancels.
+        str: Amount with 2 decimals (e.g. 1250 -> "12.50").
 
     Description:
-        Repeatedly prompts until user enters a valid, non-negative bet amount 
-        that does not exceed their available balance.
+        Integer division only, no float formatting.
     """
-    while True:
-        ans = input(f"💰 Enter your bet (0 to cancel): ").strip()
-        try:
-            if not is_positive_number(ans):
-                raise ValueError("Invalid number format")
-            val = float(ans)
-            val = round(val, 2)
-            if val < 0:
-                raise ValueError("Negative bet")
-            if val == 0:
-                return 0.0
-            if val > current_money:
-                print(
-                    f"❌ You cannot bet more than your balance ({current_money:.2f}).")
-                continue
-            return val
-        except ValueError:
-            print("❌ Please enter a valid positive number (max 2 decimals).")
+    prefix = "-" if cents < 0 else ("+" if sign else "")
+    cents = abs(cents)
+    return f"{prefix}{cents // 100}.{cents % 100:02d}"
 
 
 # ------------------------
-# Decorator: game_session
+# Storage path
 # ------------------------
-def game_session(game_name: str):
+
+BASE_PATH = os.path.join(os.path.expanduser("~"), ".tong777_players")
+os.makedirs(BASE_PATH, exist_ok=True)
+
+# "file"   -> rewrite <username>.txt on every save
+# "ledger" -> append wallet changes to LEDGER_PATH, snapshot into <username>.txt periodically
+# "sqlite" -> one SQLite database (SQLITE_PATH) for all players
+# "table"  -> fixed-width binary records in one memory-mapped file (TABLE_PATH)
+STORAGE_MODE = os.environ.get("TONG777_STORAGE", "file")
+SQLITE_PATH = os.path.join(BASE_PATH, "players.db")
+SQLITE_POOL_SIZE = 4
+TABLE_PATH = os.path.join(BASE_PATH, "players.tbl")
+LEDGER_PATH = os.path.join(BASE_PATH, "wallet.ledger")
+INDEX_PATH = os.path.join(BASE_PATH, "usernames.idx")
+
+# "flat"    -> BASE_PATH/<username>.txt
+# "sharded" -> BASE_PATH/<xx>/<yy>/<username>.txt, directories chosen by a hash of the username;
+#              files not yet moved out of the flat layout are still found (fallback read)
+FILE_LAYOUT = os.environ.get("TONG777_LAYOUT", "flat")
+SHARD_LEVELS = 2  # 256 directories per level
+LEDGER_COMPACT_EVERY = 10000  # records appended before the log is snapshotted and truncated
+LEDGER_COMPACT_RETRY = 60.0  # seconds to wait after a failed compaction before trying again
+LEDGER_KNOWN_PLAYERS = 10000  # players whose last saved record the ledger store remembers
+
+# "round"   -> save and fsync after every round, deposit and withdrawal
+# "batched" -> background writer flushes dirty players every FLUSH_INTERVAL seconds
+#              or as soon as FLUSH_COUNT players are dirty
+# "logout"  -> dirty players are only flushed on logout / exit
+DURABILITY = os.environ.get("TONG777_DURABILITY", "batched")
+FLUSH_INTERVAL = 1.0
+FLUSH_COUNT = 64
+
+
+def fsync_directory(path: str) -> None:
     """
-    Decorator for game play_round methods.
+    Make renames inside a directory durable.
 
     Input:
-        game_name (str): Display name of the game for the header.
+        path (str): Directory path.
 
     Output:
-        function: Decorated function wrapper (Callable[[BaseGame, Player, ...], float])
+        None
 
     Description:
-        Provides core functionality wrapping game rounds:
-        1. Prints game header and player balance.
-        2. Handles exceptions during the game logic (try/except).
-        3. Updates the player's wallet with the net change (float).
-        4. Auto-saves player data.
-        5. Prompts user to continue after the round ends.
+        Fsyncs the directory entry table so a rename survives a power loss.
+        Skipped on Windows, where directories cannot be opened.
     """
-    def decorator(func):
-        def wrapper(self, player: Player, *args, **kwargs):
-            clear_screen()
-            print(tong_777_pic)
-            print(f"----[ {game_name} ]----")
-            print(
-                f"Player: {player.username} | Balance: {player.wallet:.2f}\n")
-            try:
-                # Calls the original game logic (play_round)
-                net_change = func(self, player, *args, **kwargs)
-            except Exception as e:
-                print("❌ An error occurred during the game:", e)
-                net_change = 0.0
-            # net_change may be None or float
-            try:
-                if isinstance(net_change, (int, float)):
-                    if net_change != 0:
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def flat_player_path(username: str) -> str:
+    """
+    Get the flat-layout path of a player file.
+
+    Input:
+        username (str): Player's username.
+
+    Output:
+        str: BASE_PATH/<username>.txt
+
+    Description:
+        The original layout, one directory for every player.
+    """
+    return os.path.join(BASE_PATH, f"{username}.txt")
+
+
+def sharded_player_path(username: str) -> str:
+    """
+    Get the sharded-layout path of a player file.
+
+    Input:
+        username (str): Player's username.
+
+    Output:
+        str: BASE_PATH/<xx>/<yy>/<username>.txt
+
+    Description:
+        Each of the SHARD_LEVELS directory names is one byte of a BLAKE2 hash of the
+        username in hex, so players spread evenly over 256^SHARD_LEVELS directories.
+    """
+    digest = hashlib.blake2b(username.encode("utf-8"), digest_size=SHARD_LEVELS).hexdigest()
+    shards = [digest[i:i + 2] for i in range(0, 2 * SHARD_LEVELS, 2)]
+    return os.path.join(BASE_PATH, *shards, f"{username}.txt")
+
+
+def player_file_path(username: str) -> str:
+    """
+    Get the path new writes of a player file go to.
+
+    Input:
+        username (str): Player's username.
+
+    Output:
+        str: Sharded or flat path depending on FILE_LAYOUT.
+
+    Description:
+        Reads use player_file_candidates() instead, to also find files in the old layout.
+    """
+    if FILE_LAYOUT == "sharded":
+        return sharded_player_path(username)
+    return flat_player_path(username)
+
+
+def player_file_candidates(username: str) -> List[str]:
+    """
+    Get the paths a player file may be found at, in lookup order.
+
+    Input:
+        username (str): Player's username.
+
+    Output:
+        List[str]: Paths to try.
+
+    Description:
+        In the sharded layout the sharded path is tried first, then the flat path, then the
+        sharded path again: the reshard tool links a file into its shard before removing the
+        flat copy, so a reader that races with a move always finds one of them.
+    """
+    if FILE_LAYOUT == "sharded":
+        sharded = sharded_player_path(username)
+        return [sharded, flat_player_path(username), sharded]
+    return [flat_player_path(username)]
+
+
+def write_player_temp(path: str, username: str, hashed_password: str, wallet: int,
+                      fsync: bool = False) -> str:
+    """
+    Write a player record into a temporary file next to the real one.
+
+    Input:
+        path (str): Final path of the player file.
+        username (str): Player's username.
+        hashed_password (str): bcrypt hash as a string.
+        wallet (int): Wallet balance in cents.
+        fsync (bool): Force the temp file to stable storage before returning (default: False).
+
+    Output:
+        str: Path of the temporary file.
+
+    Description:
+        The temp name is unique per process and thread, so concurrent writers never
+        share a temp file. Shard directories are created on first use.
+        The caller renames the temp file over path.
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        f = open(tmp, "w", encoding="utf-8")
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(tmp), exist_ok=True)
+        f = open(tmp, "w", encoding="utf-8")
+    with f:
+        f.write(f"{username},{hashed_password},{format_cents(wallet)}")
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    return tmp
+
+
+def write_player_file(username: str, hashed_password: str, wallet: int, fsync: bool = False) -> None:
+    """
+    Write one player record file atomically.
+
+    Input:
+        username (str): Player's username.
+        hashed_password (str): bcrypt hash as a string.
+        wallet (int): Wallet balance in cents.
+        fsync (bool): Force the file and the rename to stable storage before returning (default: False).
+
+    Output:
+        None
+
+    Description:
+        Writes CSV format: username,hashed_password,wallet to a temp file and renames it over
+        player_file_path(username), so a crash leaves either the old or the new record, never
+        a truncated one. Raises IOError/OSError to the caller.
+    """
+    path = player_file_path(username)
+    tmp = write_player_temp(path, username, hashed_password, wallet, fsync)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        os.remove(tmp)
+        raise
+    if fsync:
+        fsync_directory(os.path.dirname(path))
+
+
+def read_player_file(username: str) -> Optional[Tuple[str, int]]:
+    """
+    Read one player record file.
+
+    Input:
+        username (str): Player's username.
+
+    Output:
+        Optional[Tuple[str, int]]: (hashed_password, wallet), or None if the file is missing.
+
+    Description:
+        Opens the first existing path from player_file_candidates() and parses it.
+        Raises IOError/OSError on read errors and ValueError if the file content is not
+        in username,hash,wallet format.
+    """
+    for filename in player_file_candidates(username):
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                raw = f.read().strip()
+            break
+        except FileNotFoundError:
+            continue
+    else:
+        return None
+    parts = raw.split(",")
+    if len(parts) != 3:
+        raise ValueError("Invalid player file format")
+    _, hashed_password, wallet_s = parts
+    return hashed_password, parse_cents(wallet_s)
+
+
+# ------------------------
+# Wallet ledger
+# ------------------------
+class WalletLedger:
+    """
+    Append-only log of wallet changes shared by all players.
+
+    Input:
+        path (str): Ledger file path.
+        compact_every (int): Number of appended records before a snapshot + compaction.
+
+    Output:
+        None
+
+    Description:
+        Every wallet change is one fixed-size record (username, sequence number, delta,
+        balance after the change) appended to a single open file, instead of rewriting the
+        player's .txt file. Each record carries the absolute balance, so replaying the log
+        is idempotent: the last record of a user wins over the snapshot in <username>.txt.
+        Compaction writes the latest balances back into the .txt snapshots and truncates the log.
+        It runs from maybe_compact() after a write-behind flush, never on the append path.
+        Reads trust the in-memory tail of this process, so only one process may use a ledger:
+        the file is locked (flock) while open and a second process gets an OSError.
+    """
+    RECORD = struct.Struct("<64sQqq")  # username (utf-8, NUL padded), seq, delta, balance (cents)
+    MAX_NAME_BYTES = 64
+
+    def __init__(self, path: str = LEDGER_PATH, compact_every: int = LEDGER_COMPACT_EVERY) -> None:
+        """
+        Open the ledger and replay any records left since the last compaction.
+
+        Input:
+            path (str): Ledger file path.
+            compact_every (int): Records appended before compaction is triggered.
+
+        Output:
+            None
+
+        Description:
+            Takes an exclusive lock on the file (OSError if another process holds it), replays
+            the log into the in-memory tail table, drops a torn trailing record (crash in the
+            middle of a write) and compacts, so startup recovery stays fast.
+        """
+        self.path = path
+        self.compact_every = compact_every
+        self.balances: Dict[str, int] = {}  # balances newer than the .txt snapshot
+        self.hashes: Dict[str, str] = {}      # hashes seen since last compaction
+        self.records = 0
+        self.seq = 0
+        self.retry_at = 0.0  # time.monotonic() before which maybe_compact() does nothing
+        self._lock = threading.Lock()
+        self._fh = open(self.path, "a+b")
+        try:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._fh.close()
+            raise OSError(errno.EAGAIN, "Wallet ledger is in use by another process", self.path)
+        self._replay()
+        if self.records:
+            self.compact()
+
+    def _replay(self) -> None:
+        """
+        Rebuild the tail table from the log file.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Reads all complete records, keeps the last balance per user and
+            truncates a partial record at the end of the file.
+        """
+        self._fh.seek(0)
+        data = self._fh.read()
+        usable = len(data) - len(data) % self.RECORD.size
+        if usable != len(data):
+            self._fh.truncate(usable)
+        for name_b, seq, _delta, balance in self.RECORD.iter_unpack(data[:usable]):
+            self.balances[name_b.rstrip(b"\0").decode("utf-8")] = balance
+            self.seq = max(self.seq, seq)
+            self.records += 1
+
+    def accepts(self, username: str) -> bool:
+        """
+        Check whether a username fits in the fixed-size record.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            bool: True if the username can be stored in the ledger.
+
+        Description:
+            Usernames longer than MAX_NAME_BYTES in UTF-8 are saved as plain files instead.
+        """
+        return len(username.encode("utf-8")) <= self.MAX_NAME_BYTES
+
+    def append(self, username: str, hashed_password: str, delta: int, balance: int) -> None:
+        """
+        Append one wallet change.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): Player's hash (kept for the next snapshot).
+            delta (int): Change applied to the wallet, in cents.
+            balance (int): Wallet balance after the change, in cents.
+
+        Output:
+            None
+
+        Description:
+            Writes one fixed-size record with a single write call. Compaction is left
+            to maybe_compact(), so an append never waits for snapshot writes.
+        """
+        with self._lock:
+            self.seq += 1
+            self._fh.write(self.RECORD.pack(
+                username.encode("utf-8"), self.seq, delta, balance))
+            self._fh.flush()
+            self.balances[username] = balance
+            self.hashes[username] = hashed_password
+            self.records += 1
+
+    def balance(self, username: str) -> Optional[int]:
+        """
+        Get the balance recorded in the log after the last snapshot.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[int]: Latest logged balance in cents, or None if the snapshot is current.
+
+        Description:
+            Player.load applies this on top of the balance read from <username>.txt.
+        """
+        with self._lock:
+            return self.balances.get(username)
+
+    def maybe_compact(self) -> None:
+        """
+        Compact once enough records have accumulated.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Called after each write-behind flush (LedgerStore.sync). Does nothing until
+            compact_every records are logged, nor within LEDGER_COMPACT_RETRY seconds of a
+            failed compaction.
+        """
+        with self._lock:
+            if self.records >= self.compact_every and time.monotonic() >= self.retry_at:
+                self._compact_locked()
+
+    def compact(self) -> None:
+        """
+        Snapshot the logged balances and truncate the log.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Thread-safe wrapper around _compact_locked.
+        """
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """
+        Snapshot the logged balances and truncate the log (lock held).
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Rewrites <username>.txt for every player touched since the last compaction,
+            then truncates the log. If a crash happens in between, the next replay simply
+            writes the same balances again. A failed snapshot keeps the log and delays the
+            next maybe_compact() by LEDGER_COMPACT_RETRY seconds.
+        """
+        for username, balance in self.balances.items():
+            hashed = self.hashes.get(username)
+            try:
+                if hashed is None:
+                    record = read_player_file(username)
+                    if record is None:
+                        continue
+                    hashed = record[0]
+                # Snapshots must be on disk before the log that backs them is dropped
+                write_player_file(username, hashed, balance, fsync=True)
+            except (IOError, OSError, ValueError) as e:
+                print("❌ Error writing ledger snapshot:", e)
+                self.retry_at = time.monotonic() + LEDGER_COMPACT_RETRY
+                return  # keep the log, retry after the back-off
+        self._fh.truncate(0)
+        self._fh.flush()
+        self.balances.clear()
+        self.hashes.clear()
+        self.records = 0
+
+    def sync(self) -> None:
+        """
+        Force appended records to stable storage.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            One fsync covers every record appended since the previous sync.
+        """
+        with self._lock:
+            os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        """
+        Compact and close the ledger file.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Leaves only up-to-date snapshots behind on a clean shutdown.
+        """
+        self.compact()
+        self._fh.close()
+
+
+# ------------------------
+# Player stores
+# ------------------------
+STORE_ERRORS = (IOError, OSError, sqlite3.Error)
+
+
+class PlayerStore(ABC):
+    """
+    Abstract storage backend for player records (Interface).
+
+    Input:
+        None
+
+    Output:
+        None
+
+    Description:
+        Player.load / Player.save go through the active store returned by get_store(),
+        so the login loop, game_session and the games do not depend on where records live.
+        A record is (hashed_password, wallet) keyed by username.
+    """
+
+    @abstractmethod
+    def load(self, username: str) -> Optional[Tuple[str, int]]:
+        """
+        Load one player record.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[Tuple[str, int]]: (hashed_password, wallet), or None if not found.
+
+        Description:
+            Raises one of STORE_ERRORS on I/O failure and ValueError on a corrupt record.
+        """
+        pass
+
+    @abstractmethod
+    def save(self, username: str, hashed_password: str, wallet: int) -> None:
+        """
+        Insert or update one player record.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Wallet balance in cents.
+
+        Output:
+            None
+
+        Description:
+            Raises one of STORE_ERRORS on failure.
+        """
+        pass
+
+    @abstractmethod
+    def usernames(self) -> Iterator[str]:
+        """
+        Iterate over all stored usernames.
+
+        Input:
+            None
+
+        Output:
+            Iterator[str]: Usernames in no particular order.
+
+        Description:
+            Used to rebuild the username index at startup.
+        """
+        pass
+
+    def create(self, username: str, hashed_password: str, wallet: int) -> bool:
+        """
+        Insert a new player record, refusing to replace an existing one.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Starting wallet balance in cents.
+
+        Output:
+            bool: True if the record was created, False if the username is already stored.
+
+        Description:
+            Default implementation checks exists() before saving; backends override it with
+            an exclusive insert so an account written by another process is never overwritten.
+            Raises one of STORE_ERRORS on failure.
+        """
+        if self.exists(username):
+            return False
+        self.save(username, hashed_password, wallet)
+        return True
+
+    def save_many(self, records: List[Tuple[str, str, int]]) -> None:
+        """
+        Insert or update many player records.
+
+        Input:
+            records (List[Tuple[str, str, int]]): (username, hashed_password, wallet) tuples.
+
+        Output:
+            None
+
+        Description:
+            Default implementation saves one by one; backends override it to batch the writes.
+        """
+        for username, hashed_password, wallet in records:
+            self.save(username, hashed_password, wallet)
+
+    def exists(self, username: str) -> bool:
+        """
+        Check whether a player record exists.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            bool: True if the username is taken.
+
+        Description:
+            Default implementation loads the record.
+        """
+        return self.load(username) is not None
+
+    def sync(self) -> None:
+        """
+        Force everything saved so far to stable storage.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            No-op by default. Called by the write-behind queue after each flush.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Release files / connections held by the store.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            No-op by default.
+        """
+        pass
+
+
+class FileStore(PlayerStore):
+    """
+    One text file per player under BASE_PATH (original format, flat or sharded layout).
+
+    Input:
+        None
+
+    Output:
+        None
+
+    Description:
+        Every save atomically replaces the player's file (temp file + rename).
+        save_many is a group commit: one fsync pass and one directory fsync for the batch.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create the store.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Starts with no files waiting for sync().
+        """
+        self._unsynced: List[str] = []
+
+    def load(self, username: str) -> Optional[Tuple[str, int]]:
+        """
+        Load a player from its text file.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[Tuple[str, int]]: (hashed_password, wallet), or None if not found.
+
+        Description:
+            Parses the username,hash,wallet text format.
+        """
+        return read_player_file(username)
+
+    def save(self, username: str, hashed_password: str, wallet: int) -> None:
+        """
+        Rewrite the player's text file.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Wallet balance in cents.
+
+        Output:
+            None
+
+        Description:
+            Writes a temp file and renames it into place. The path is remembered for the next sync().
+        """
+        write_player_file(username, hashed_password, wallet)
+        self._unsynced.append(player_file_path(username))
+
+    def create(self, username: str, hashed_password: str, wallet: int) -> bool:
+        """
+        Create the player's text file only if no file exists yet.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Starting wallet balance in cents.
+
+        Output:
+            bool: True if the file was created, False if the username is already stored.
+
+        Description:
+            Writes a temp file and hard-links it into place. os.link fails with
+            FileExistsError instead of replacing the target, so two processes registering
+            the same name cannot overwrite each other. The flat layout is checked as well.
+        """
+        if self.exists(username):
+            return False
+        path = player_file_path(username)
+        tmp = write_player_temp(path, username, hashed_password, wallet)
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp)
+        self._unsynced.append(path)
+        return True
+
+    def save_many(self, records: List[Tuple[str, str, int]]) -> None:
+        """
+        Group commit: durably replace many player files at once.
+
+        Input:
+            records (List[Tuple[str, str, int]]): (username, hashed_password, wallet) tuples.
+
+        Output:
+            None
+
+        Description:
+            Writes and fsyncs every temp file, renames them all into place and then fsyncs
+            each touched directory once for the whole batch. If the batch fails part-way, the
+            remaining temp files are removed and the old records stay in place.
+        """
+        temps: List[Tuple[str, str]] = []
+        renamed = 0
+        try:
+            for username, hashed_password, wallet in records:
+                path = player_file_path(username)
+                tmp = write_player_temp(
+                    path, username, hashed_password, wallet, fsync=True)
+                temps.append((tmp, path))
+            for tmp, path in temps:
+                os.replace(tmp, path)
+                renamed += 1
+        finally:
+            for tmp, _ in temps[renamed:]:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+        for directory in set(os.path.dirname(path) for _, path in temps):
+            fsync_directory(directory)
+
+    def exists(self, username: str) -> bool:
+        """
+        Check whether the player's file exists.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            bool: True if the username is taken.
+
+        Description:
+            Only stats the file (in the current and the flat layout), without reading it.
+        """
+        return any(os.path.exists(path) for path in player_file_candidates(username))
+
+    def usernames(self) -> Iterator[str]:
+        """
+        Iterate over the usernames of all player files.
+
+        Input:
+            None
+
+        Output:
+            Iterator[str]: Usernames in directory order.
+
+        Description:
+            Streams BASE_PATH and its shard directories with os.scandir (no per-file stat)
+            and keeps only *.txt entries. A name can appear twice while a reshard is running.
+        """
+        pending = [(BASE_PATH, 0)]
+        while pending:
+            directory, level = pending.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".txt"):
+                        if entry.is_file():
+                            yield entry.name[:-4]
+                    elif level < SHARD_LEVELS and len(entry.name) == 2 and entry.is_dir():
+                        pending.append((entry.path, level + 1))
+
+    def sync(self) -> None:
+        """
+        Fsync every file written since the last sync.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Reopens each written file read-only to fsync it, so saves themselves stay cheap,
+            then fsyncs each touched directory once to make the renames durable.
+        """
+        pending, self._unsynced = self._unsynced, []
+        if not pending:
+            return
+        paths = set(pending)
+        for path in paths:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        for directory in set(os.path.dirname(path) for path in paths):
+            fsync_directory(directory)
+
+
+class LedgerStore(FileStore):
+    """
+    Text file snapshots plus the shared append-only WalletLedger.
+
+    Input:
+        None
+
+    Output:
+        None
+
+    Description:
+        The first save of a player writes its .txt file. After that, wallet changes are
+        appended to the ledger and the .txt file is only rewritten on compaction or when
+        the password hash changes. Loading applies the ledger tail on top of the snapshot.
+    """
+
+    def __init__(self) -> None:
+        """
+        Open the wallet ledger.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Replays (and compacts) any records left from a previous run.
+        """
+        super().__init__()
+        self.ledger = WalletLedger()
+        # last persisted (hash, balance) of recently used players, LRU bounded
+        self.saved: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+
+    def _remember(self, username: str, hashed_password: str, wallet: int) -> None:
+        """
+        Record what was last persisted for a player.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Wallet balance in cents.
+
+        Output:
+            None
+
+        Description:
+            Keeps at most LEDGER_KNOWN_PLAYERS entries. A player that was evicted is simply
+            saved through a new snapshot next time.
+        """
+        self.saved[username] = (hashed_password, wallet)
+        self.saved.move_to_end(username)
+        while len(self.saved) > LEDGER_KNOWN_PLAYERS:
+            self.saved.popitem(last=False)
+
+    def load(self, username: str) -> Optional[Tuple[str, int]]:
+        """
+        Load the snapshot and apply the ledger tail.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[Tuple[str, int]]: (hashed_password, wallet), or None if not found.
+
+        Description:
+            Remembers the loaded record so later saves can log only the delta.
+        """
+        record = read_player_file(username)
+        if record is None:
+            return None
+        hashed_password, wallet = record
+        tail = self.ledger.balance(username)
+        if tail is not None:
+            wallet = tail
+        self._remember(username, hashed_password, wallet)
+        return hashed_password, wallet
+
+    def save(self, username: str, hashed_password: str, wallet: int) -> None:
+        """
+        Persist a wallet change.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Wallet balance in cents.
+
+        Output:
+            None
+
+        Description:
+            Writes the .txt snapshot for players not seen yet (e.g. new registrations) and
+            when the hash changed (rehash on login), otherwise appends one record to the
+            ledger. A snapshot written while the player has a ledger tail is followed by a
+            record with the same balance and hash, so neither a replay nor the next
+            compaction brings back the old values. Unchanged records write nothing.
+        """
+        previous = self.saved.get(username)
+        if previous is None or previous[0] != hashed_password \
+                or not self.ledger.accepts(username):
+            write_player_file(username, hashed_password, wallet)
+            self._unsynced.append(player_file_path(username))
+            tail = self.ledger.balance(username)
+            if tail is not None:
+                self.ledger.append(username, hashed_password, wallet - tail, wallet)
+        elif wallet != previous[1]:
+            self.ledger.append(username, hashed_password,
+                               wallet - previous[1], wallet)
+        self._remember(username, hashed_password, wallet)
+
+    def create(self, username: str, hashed_password: str, wallet: int) -> bool:
+        """
+        Create the player's .txt snapshot only if the player is unknown.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Starting wallet balance in cents.
+
+        Output:
+            bool: True if the snapshot was created, False if the username is already stored.
+
+        Description:
+            A player with a ledger tail counts as existing; otherwise the snapshot is created
+            exclusively like FileStore.create.
+        """
+        if self.ledger.balance(username) is not None:
+            return False
+        if not super().create(username, hashed_password, wallet):
+            return False
+        self._remember(username, hashed_password, wallet)
+        return True
+
+    def save_many(self, records: List[Tuple[str, str, int]]) -> None:
+        """
+        Log many wallet changes.
+
+        Input:
+            records (List[Tuple[str, str, int]]): (username, hashed_password, wallet) tuples.
+
+        Output:
+            None
+
+        Description:
+            Appends one record per changed player; the following sync() fsyncs them all at once.
+        """
+        for username, hashed_password, wallet in records:
+            self.save(username, hashed_password, wallet)
+
+    def sync(self) -> None:
+        """
+        Fsync the ledger and any snapshot files written directly.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            A single fsync of the ledger covers all logged wallet changes. Then the ledger
+            is compacted if it has grown past LEDGER_COMPACT_EVERY records.
+        """
+        self.ledger.sync()
+        super().sync()
+        self.ledger.maybe_compact()
+
+    def close(self) -> None:
+        """
+        Compact and close the ledger.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Leaves every .txt snapshot current.
+        """
+        self.ledger.close()
+
+
+class SQLiteStore(PlayerStore):
+    """
+    All players in one SQLite database (WAL mode) with a small connection pool.
+
+    Input:
+        path (str): Database file path (default: SQLITE_PATH).
+        pool_size (int): Number of pooled connections (default: SQLITE_POOL_SIZE).
+
+    Output:
+        None
+
+    Description:
+        Uses a single indexed table instead of one file per user. Statements are constant
+        parameterised SQL, so sqlite3's statement cache keeps them prepared per connection.
+        WAL mode lets readers run while a writer commits. save_many writes a whole batch
+        in one transaction.
+    """
+    SQL_CREATE = ("CREATE TABLE IF NOT EXISTS players ("
+                  "username TEXT PRIMARY KEY, "
+                  "hashed_password TEXT NOT NULL, "
+                  "wallet_cents INTEGER NOT NULL) WITHOUT ROWID")
+    SQL_LOAD = "SELECT hashed_password, wallet_cents FROM players WHERE username = ?"
+    SQL_EXISTS = "SELECT 1 FROM players WHERE username = ?"
+    SQL_NAMES = "SELECT username FROM players"
+    SQL_INSERT = "INSERT INTO players (username, hashed_password, wallet_cents) VALUES (?, ?, ?)"
+    SQL_SAVE = ("INSERT INTO players (username, hashed_password, wallet_cents) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET "
+                "hashed_password = excluded.hashed_password, wallet_cents = excluded.wallet_cents")
+
+    def __init__(self, path: Optional[str] = None, pool_size: Optional[int] = None) -> None:
+        """
+        Open the database and fill the connection pool.
+
+        Input:
+            path (str): Database file path.
+            pool_size (int): Number of connections.
+
+        Output:
+            None
+
+        Description:
+            Every connection is opened up front, so requests never pay for a connect.
+        """
+        self.path = path or SQLITE_PATH
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._connections: List[sqlite3.Connection] = []
+        for _ in range(pool_size or SQLITE_POOL_SIZE):
+            conn = self._connect()
+            self._connections.append(conn)
+            self._pool.put(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open one pooled connection.
+
+        Input:
+            None
+
+        Output:
+            sqlite3.Connection: Configured connection.
+
+        Description:
+            Enables WAL journaling with synchronous=NORMAL (durable at checkpoints,
+            no fsync per commit) and makes sure the players table exists.
+        """
+        conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False,
+                               cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute(self.SQL_CREATE)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection from the pool.
+
+        Input:
+            None
+
+        Output:
+            Generator yielding sqlite3.Connection.
+
+        Description:
+            Blocks while all connections are in use and always returns the connection.
+        """
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def load(self, username: str) -> Optional[Tuple[str, int]]:
+        """
+        Load one player row.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[Tuple[str, int]]: (hashed_password, wallet), or None if not found.
+
+        Description:
+            Primary-key lookup on the players table.
+        """
+        with self.connection() as conn:
+            row = conn.execute(self.SQL_LOAD, (username,)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    def save(self, username: str, hashed_password: str, wallet: int) -> None:
+        """
+        Upsert one player row.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Wallet balance in cents.
+
+        Output:
+            None
+
+        Description:
+            Runs in its own short transaction.
+        """
+        with self.connection() as conn, conn:
+            conn.execute(self.SQL_SAVE, (username, hashed_password, wallet))
+
+    def create(self, username: str, hashed_password: str, wallet: int) -> bool:
+        """
+        Insert a new player row without replacing an existing one.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Starting wallet balance in cents.
+
+        Output:
+            bool: True if the row was inserted, False if the username is already stored.
+
+        Description:
+            Plain INSERT: the primary key rejects a name that another process already added.
+        """
+        try:
+            with self.connection() as conn, conn:
+                conn.execute(self.SQL_INSERT, (username, hashed_password, wallet))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def save_many(self, records: List[Tuple[str, str, int]]) -> None:
+        """
+        Upsert many player rows in a single transaction.
+
+        Input:
+            records (List[Tuple[str, str, int]]): (username, hashed_password, wallet) tuples.
+
+        Output:
+            None
+
+        Description:
+            One commit for the whole batch instead of one per player.
+        """
+        with self.connection() as conn, conn:
+            conn.executemany(self.SQL_SAVE, records)
+
+    def exists(self, username: str) -> bool:
+        """
+        Check whether a player row exists.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            bool: True if the username is taken.
+
+        Description:
+            Index-only lookup, the row itself is not fetched.
+        """
+        with self.connection() as conn:
+            return conn.execute(self.SQL_EXISTS, (username,)).fetchone() is not None
+
+    def usernames(self) -> Iterator[str]:
+        """
+        Iterate over all usernames in the players table.
+
+        Input:
+            None
+
+        Output:
+            Iterator[str]: Usernames in primary-key order.
+
+        Description:
+            Fetches in chunks so the whole table is never held in memory at once.
+        """
+        with self.connection() as conn:
+            cursor = conn.execute(self.SQL_NAMES)
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                for (username,) in rows:
+                    yield username
+
+    def sync(self) -> None:
+        """
+        Checkpoint the WAL into the database file.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            With synchronous=NORMAL, commits become durable at the next checkpoint;
+            a FULL checkpoint fsyncs the WAL and the database.
+        """
+        with self.connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Closing the last connection checkpoints the WAL into the database file.
+        """
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+
+
+class TableStore(PlayerStore):
+    """
+    Fixed-width binary player table accessed through mmap.
+
+    Input:
+        path (str): Table file path (default: TABLE_PATH).
+
+    Output:
+        None
+
+    Description:
+        The file is a 16-byte header followed by one RECORD per player: username (64 bytes,
+        UTF-8, NUL padded), bcrypt hash (60 bytes), balance in cents (int64) and a version
+        counter (uint64) bumped on every write. The username -> slot map is built when the
+        table is opened; after that loading or updating a wallet is an offset calculation
+        plus struct.unpack_from / pack_into on the mapped file, with no text parsing and no
+        per-user file handle. The file doubles in size when it runs out of slots.
+        Several processes (games, tong_admin migrate) may share the table: writes and lookups
+        of unknown names hold an exclusive flock on the file and first pick up slots appended
+        by other processes, remapping the file if it grew.
+    """
+    HEADER = struct.Struct("<8sII")  # magic, record size, record count
+    RECORD = struct.Struct("<64s60sqQ")  # username, hash, balance (cents), version
+    MAGIC = b"T777TBL1"
+    HASH_BYTES = 60
+    NAME_BYTES = 64
+    INITIAL_SLOTS = 1024
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Open (or create) the table file and map it into memory.
+
+        Input:
+            path (str): Table file path.
+
+        Output:
+            None
+
+        Description:
+            The header of a new (empty) file is written under the file lock, so two processes
+            opening the table at the same time cannot both initialise it.
+            Raises ValueError if the file exists but is not a player table.
+        """
+        self.path = path or TABLE_PATH
+        self._lock = threading.Lock()
+        self.slots: Dict[str, int] = {}
+        self.count = 0
+        self._fh = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+        with self._file_lock():
+            if os.fstat(self._fh.fileno()).st_size == 0:
+                self._fh.write(self.HEADER.pack(self.MAGIC, self.RECORD.size, 0))
+                self._fh.truncate(self.HEADER.size + self.INITIAL_SLOTS * self.RECORD.size)
+                self._fh.flush()
+            self._map = mmap.mmap(self._fh.fileno(), 0)
+            magic, record_size, _ = self.HEADER.unpack_from(self._map, 0)
+            valid = magic == self.MAGIC and record_size == self.RECORD.size
+            if valid:
+                self._refresh_locked()
+        if not valid:
+            self.close()
+            raise ValueError("Invalid player table file")
+
+    @contextmanager
+    def _file_lock(self):
+        """
+        Hold an exclusive flock on the table file.
+
+        Input:
+            None
+
+        Output:
+            Generator yielding None.
+
+        Description:
+            Serialises appends and slot lookups with other processes using the same table.
+            Blocks while another process holds the lock.
+        """
+        fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+
+    def _offset(self, slot: int) -> int:
+        """
+        Get the byte offset of a slot.
+
+        Input:
+            slot (int): Record number.
+
+        Output:
+            int: Offset of the record in the file.
+
+        Description:
+            Header size plus slot * record size.
+        """
+        return self.HEADER.size + slot * self.RECORD.size
+
+    def _capacity(self) -> int:
+        """
+        Get the number of slots the file currently has room for.
+
+        Input:
+            None
+
+        Output:
+            int: Slot capacity.
+
+        Description:
+            Derived from the mapped size.
+        """
+        return (len(self._map) - self.HEADER.size) // self.RECORD.size
+
+    def _grow(self) -> None:
+        """
+        Double the table file and remap it.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Called with both locks held when every slot is in use.
+        """
+        new_size = self._offset(max(self.INITIAL_SLOTS, self._capacity() * 2))
+        self._map.flush()
+        self._map.close()
+        self._fh.truncate(new_size)
+        self._map = mmap.mmap(self._fh.fileno(), 0)
+
+    def load(self, username: str) -> Optional[Tuple[str, int]]:
+        """
+        Read one player record from the mapped table.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[Tuple[str, int]]: (hashed_password, wallet), or None if not found.
+
+        Description:
+            Dictionary lookup for the slot, then one unpack_from at its offset. An unknown
+            name is looked up again after picking up slots appended by other processes.
+        """
+        with self._lock:
+            slot = self.slots.get(username)
+            if slot is None:
+                with self._file_lock():
+                    self._refresh_locked()
+                slot = self.slots.get(username)
+                if slot is None:
+                    return None
+            _, hashed, cents, _ = self.RECORD.unpack_from(self._map, self._offset(slot))
+        return hashed.decode("ascii"), cents
+
+    def save(self, username: str, hashed_password: str, wallet: int) -> None:
+        """
+        Update a player record in place, or append a new one.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Wallet balance in cents.
+
+        Output:
+            None
+
+        Description:
+            Writes the record with pack_into directly into the mapped file and bumps its version.
+            Raises OSError(ENAMETOOLONG) for usernames over 64 bytes, like a too-long file name.
+        """
+        with self._lock, self._file_lock():
+            self._refresh_locked()
+            self._write_locked(username, hashed_password, wallet)
+
+    def create(self, username: str, hashed_password: str, wallet: int) -> bool:
+        """
+        Append a new player record only if the username has no slot yet.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Starting wallet balance in cents.
+
+        Output:
+            bool: True if the record was appended, False if the username is already stored.
+
+        Description:
+            Picks up slots appended by other processes first, so the check also sees
+            accounts created after this table was opened.
+        """
+        with self._lock, self._file_lock():
+            self._refresh_locked()
+            if username in self.slots:
+                return False
+            self._write_locked(username, hashed_password, wallet)
+        return True
+
+    def _refresh_locked(self) -> None:
+        """
+        Pick up slots appended by other processes (both locks held).
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Remaps the file if another process grew it, then re-reads the record count from
+            the header and maps the new names to their slots.
+        """
+        if os.fstat(self._fh.fileno()).st_size != len(self._map):
+            self._map.close()
+            self._map = mmap.mmap(self._fh.fileno(), 0)
+        count = self.HEADER.unpack_from(self._map, 0)[2]
+        for slot in range(self.count, count):
+            name = self._map[self._offset(slot):self._offset(slot) + self.NAME_BYTES]
+            self.slots[name.rstrip(b"\0").decode("utf-8")] = slot
+        self.count = count
+
+    def _write_locked(self, username: str, hashed_password: str, wallet: int) -> None:
+        """
+        Write one player record into its slot or a new one (lock held).
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Wallet balance in cents.
+
+        Output:
+            None
+
+        Description:
+            Shared by save and create, after _refresh_locked so a new record takes the
+            first slot no process has used.
+        """
+        name_b = username.encode("utf-8")
+        if len(name_b) > self.NAME_BYTES:
+            raise OSError(errno.ENAMETOOLONG, "Username too long for player table", username)
+        hash_b = hashed_password.encode("ascii")
+        if len(hash_b) != self.HASH_BYTES:
+            raise ValueError("Player table expects a 60-byte bcrypt hash")
+        slot = self.slots.get(username)
+        if slot is None:
+            if self.count == self._capacity():
+                self._grow()
+            slot = self.count
+            version = 0
+        else:
+            version = self.RECORD.unpack_from(self._map, self._offset(slot))[3]
+        self.RECORD.pack_into(self._map, self._offset(slot),
+                              name_b, hash_b, wallet, version + 1)
+        if username not in self.slots:
+            self.slots[username] = slot
+            self.count += 1
+            self.HEADER.pack_into(self._map, 0, self.MAGIC, self.RECORD.size, self.count)
+
+    def version(self, username: str) -> Optional[int]:
+        """
+        Get the write counter of a player record.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[int]: Number of writes to the record, or None if not found.
+
+        Description:
+            Lets callers detect concurrent updates.
+        """
+        with self._lock:
+            slot = self.slots.get(username)
+            if slot is None:
+                return None
+            return self.RECORD.unpack_from(self._map, self._offset(slot))[3]
+
+    def exists(self, username: str) -> bool:
+        """
+        Check whether a player has a slot.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            bool: True if the username is taken.
+
+        Description:
+            Dictionary lookup, after picking up slots appended by other processes.
+        """
+        with self._lock:
+            if username in self.slots:
+                return True
+            with self._file_lock():
+                self._refresh_locked()
+            return username in self.slots
+
+    def usernames(self) -> Iterator[str]:
+        """
+        Iterate over all usernames in the table.
+
+        Input:
+            None
+
+        Output:
+            Iterator[str]: Usernames in slot order.
+
+        Description:
+            Uses the in-memory slot map, after picking up slots appended by other processes.
+        """
+        with self._lock:
+            with self._file_lock():
+                self._refresh_locked()
+            names = list(self.slots)
+        return iter(names)
+
+    def sync(self) -> None:
+        """
+        Flush dirty pages of the mapping to disk.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            mmap.flush() is msync, which writes and waits for the changed pages.
+        """
+        with self._lock:
+            self._map.flush()
+
+    def close(self) -> None:
+        """
+        Flush and unmap the table.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Safe to call more than once.
+        """
+        if self._map.closed:
+            return
+        self._map.flush()
+        self._map.close()
+        self._fh.close()
+
+
+STORES = {
+    "file": FileStore,
+    "ledger": LedgerStore,
+    "sqlite": SQLiteStore,
+    "table": TableStore,
+}
+
+_store: Optional[PlayerStore] = None
+
+
+def get_store() -> PlayerStore:
+    """
+    Get the process-wide player store, creating it on first use.
+
+    Input:
+        None
+
+    Output:
+        PlayerStore: Store selected by STORAGE_MODE.
+
+    Description:
+        Raises ValueError for an unknown STORAGE_MODE.
+    """
+    global _store
+    if _store is None:
+        if STORAGE_MODE not in STORES:
+            raise ValueError(f"Unknown storage mode: {STORAGE_MODE}")
+        _store = STORES[STORAGE_MODE]()
+    return _store
+
+
+def close_storage() -> None:
+    """
+    Flush and close storage before the program exits.
+
+    Input:
+        None
+
+    Output:
+        None
+
+    Description:
+        Flushes the write-behind queue, then closes the active store (compacting the wallet
+        ledger, closing SQLite connections) so that everything is on disk when the process
+        ends, and empties the player cache.
+    """
+    global _store
+    write_behind.stop()
+    if _store is not None:
+        _store.close()
+        _store = None
+    player_cache.clear()
+
+# ------------------------
+# Player cache
+# ------------------------
+PLAYER_CACHE_SIZE = int(os.environ.get("TONG777_CACHE_SIZE", "1024"))
+
+
+class PlayerCache:
+    """
+    Bounded in-memory cache of player records with LRU eviction.
+
+    Input:
+        capacity (int): Maximum number of cached players.
+
+    Output:
+        None
+
+    Description:
+        Keeps (hashed_password, wallet) records of recently used players in an OrderedDict
+        ordered from least to most recently used. Records are copied into new Player
+        objects on every hit, so callers never share a cached object. Counts hits,
+        misses and evictions for monitoring.
+    """
+
+    def __init__(self, capacity: int = PLAYER_CACHE_SIZE) -> None:
+        """
+        Create an empty cache.
+
+        Input:
+            capacity (int): Maximum number of cached players (0 disables caching).
+
+        Output:
+            None
+
+        Description:
+            Initializes the LRU table, counters and lock.
+        """
+        self.capacity = capacity
+        self._records: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, username: str) -> Optional[Tuple[str, int]]:
+        """
+        Look up a cached record.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[Tuple[str, int]]: (hashed_password, wallet), or None on a miss.
+
+        Description:
+            A hit moves the entry to the most recently used end.
+        """
+        with self._lock:
+            record = self._records.get(username)
+            if record is None:
+                self.misses += 1
+                return None
+            self._records.move_to_end(username)
+            self.hits += 1
+            return record
+
+    def put(self, username: str, hashed_password: str, wallet: int) -> None:
+        """
+        Insert or replace a cached record.
+
+        Input:
+            username (str): Player's username.
+            hashed_password (str): bcrypt hash as a string.
+            wallet (int): Wallet balance in cents.
+
+        Output:
+            None
+
+        Description:
+            Evicts the least recently used entries while the cache is over capacity.
+        """
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._records[username] = (hashed_password, wallet)
+            self._records.move_to_end(username)
+            while len(self._records) > self.capacity:
+                self._records.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, username: str) -> None:
+        """
+        Drop a cached record.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            None
+
+        Description:
+            The next load goes to the store.
+        """
+        with self._lock:
+            self._records.pop(username, None)
+
+    def clear(self) -> None:
+        """
+        Drop all cached records.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Used when the storage backend is closed or switched.
+        """
+        with self._lock:
+            self._records.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+
+        Input:
+            None
+
+        Output:
+            Dict[str, int]: size, capacity, hits, misses and evictions.
+
+        Description:
+            Snapshot of the counters for monitoring.
+        """
+        with self._lock:
+            return {"size": len(self._records), "capacity": self.capacity,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+player_cache = PlayerCache()
+
+# ------------------------
+# Username index
+# ------------------------
+class UsernameIndex:
+    """
+    In-memory username index backed by an on-disk list.
+
+    Input:
+        path (str): Index file path (default: INDEX_PATH).
+
+    Output:
+        None
+
+    Description:
+        Holds every registered username in a hash set for O(1) existence checks and in a
+        sorted list for prefix / range search (admin lookups). It is rebuilt from the store
+        at startup and written to INDEX_PATH (one username per line); create_new appends
+        new names to the file instead of rewriting it.
+    """
+
+    def __init__(self, path: str = INDEX_PATH) -> None:
+        """
+        Create an empty index.
+
+        Input:
+            path (str): Index file path.
+
+        Output:
+            None
+
+        Description:
+            Call rebuild() or load() to fill it.
+        """
+        self.path = path
+        self._names: set = set()
+        self._sorted: List[str] = []
+        self._lock = threading.Lock()
+
+    def rebuild(self, store: Optional[PlayerStore] = None) -> int:
+        """
+        Rebuild the index from the player store and rewrite the index file.
+
+        Input:
+            store (PlayerStore): Store to scan (default: get_store()).
+
+        Output:
+            int: Number of usernames indexed.
+
+        Description:
+            File stores are scanned with os.scandir, SQLite with one streaming SELECT.
+            The index file is replaced atomically.
+        """
+        names = set((store or get_store()).usernames())
+        ordered = sorted(names)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(f"{name}\n" for name in ordered)
+        os.replace(tmp, self.path)
+        with self._lock:
+            self._names = names
+            self._sorted = ordered
+        return len(ordered)
+
+    def load(self) -> int:
+        """
+        Load the index from the index file without scanning the store.
+
+        Input:
+            None
+
+        Output:
+            int: Number of usernames loaded.
+
+        Description:
+            Used by the admin tool. Returns 0 if the index file does not exist.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            names = set(line.rstrip("\n") for line in f if line.strip())
+        with self._lock:
+            self._names = names
+            self._sorted = sorted(names)
+        return len(names)
+
+    def add(self, username: str) -> None:
+        """
+        Add a newly registered username.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            None
+
+        Description:
+            Updates the set and the sorted list and appends one line to the index file.
+        """
+        with self._lock:
+            if username in self._names:
+                return
+            self._names.add(username)
+            bisect.insort(self._sorted, username)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{username}\n")
+
+    def exists(self, username: str) -> bool:
+        """
+        Check whether a username is registered.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            bool: True if the username is taken.
+
+        Description:
+            Hash set lookup, no filesystem access.
+        """
+        return username in self._names
+
+    def prefix(self, prefix: str, limit: int = 100) -> List[str]:
+        """
+        Find usernames starting with a prefix.
+
+        Input:
+            prefix (str): Username prefix.
+            limit (int): Maximum number of results (default: 100).
+
+        Output:
+            List[str]: Matching usernames in sorted order.
+
+        Description:
+            Binary search for the first match, then a scan until the prefix stops matching.
+        """
+        with self._lock:
+            start = bisect.bisect_left(self._sorted, prefix)
+            result = []
+            for name in self._sorted[start:start + limit]:
+                if not name.startswith(prefix):
+                    break
+                result.append(name)
+            return result
+
+    def range(self, low: str, high: str, limit: int = 100) -> List[str]:
+        """
+        Find usernames in the range low <= name < high.
+
+        Input:
+            low (str): Inclusive lower bound.
+            high (str): Exclusive upper bound.
+            limit (int): Maximum number of results (default: 100).
+
+        Output:
+            List[str]: Matching usernames in sorted order.
+
+        Description:
+            Two binary searches on the sorted list.
+        """
+        with self._lock:
+            start = bisect.bisect_left(self._sorted, low)
+            end = bisect.bisect_left(self._sorted, high)
+            return self._sorted[start:min(end, start + limit)]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+_username_index: Optional[UsernameIndex] = None
+
+
+def get_username_index() -> UsernameIndex:
+    """
+    Get the process-wide username index, rebuilding it on first use.
+
+    Input:
+        None
+
+    Output:
+        UsernameIndex: The shared index.
+
+    Description:
+        main() calls this at startup so the scan happens during the loading screen.
+    """
+    global _username_index
+    if _username_index is None:
+        _username_index = UsernameIndex()
+        _username_index.rebuild()
+    return _username_index
+
+
+# ------------------------
+# Authentication service
+# ------------------------
+AUTH_WORKERS = int(os.environ.get("TONG777_AUTH_WORKERS", str(os.cpu_count() or 1)))
+# bcrypt cost: calibrated at startup to the highest cost whose verification stays within
+# AUTH_TARGET_MS on this host, unless pinned with TONG777_BCRYPT_ROUNDS. Higher cost is
+# stronger against offline cracking but allows fewer logins per second per core.
+AUTH_TARGET_MS = float(os.environ.get("TONG777_AUTH_TARGET_MS", "250"))
+BCRYPT_ROUNDS = int(os.environ.get("TONG777_BCRYPT_ROUNDS", "0"))  # 0 -> calibrate
+BCRYPT_DEFAULT_ROUNDS = 12  # used until calibration finishes
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
+
+def _hash_password(password_plain: str, rounds: int) -> str:
+    """
+    Hash a password with bcrypt (runs in an auth worker process).
+
+    Input:
+        password_plain (str): The plaintext password.
+        rounds (int): bcrypt cost (log2 of the key expansion rounds).
+
+    Output:
+        str: bcrypt hash as a string.
+
+    Description:
+        Module-level so the process pool can pickle it.
+    """
+    return bcrypt.hashpw(password_plain.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check_password(password_plain: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a bcrypt hash (runs in an auth worker process).
+
+    Input:
+        password_plain (str): The plaintext password.
+        hashed_password (str): bcrypt hash as a string.
+
+    Output:
+        bool: True if the password matches.
+
+    Description:
+        Module-level so the process pool can pickle it.
+    """
+    return bcrypt.checkpw(password_plain.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def _calibrate_rounds(target_ms: float) -> int:
+    """
+    Find the highest bcrypt cost that verifies within the target time (runs in an auth worker process).
+
+    Input:
+        target_ms (float): Target verification latency in milliseconds.
+
+    Output:
+        int: bcrypt cost between BCRYPT_MIN_ROUNDS and BCRYPT_MAX_ROUNDS.
+
+    Description:
+        Times one checkpw per cost, starting at BCRYPT_MIN_ROUNDS. Every extra cost step doubles
+        the time, so it stops as soon as the next step would exceed the target.
+    """
+    password = b"tong777-calibration"
+    best = BCRYPT_MIN_ROUNDS
+    for rounds in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1):
+        hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+        started = time.perf_counter()
+        bcrypt.checkpw(password, hashed)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > target_ms:
+            break
+        best = rounds
+        if elapsed_ms * 2 > target_ms:
+            break
+    return best
+
+
+def hash_rounds(hashed_password: str) -> int:
+    """
+    Read the cost out of a bcrypt hash.
+
+    Input:
+        hashed_password (str): bcrypt hash such as "$2b$12$...".
+
+    Output:
+        int: The cost (12 in the example), or 0 if the hash is malformed.
+    """
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+class AuthService:
+    """
+    Process pool that runs bcrypt hashing and verification off the session threads.
+
+    Input:
+        workers (int): Worker processes (default: AUTH_WORKERS, one per core).
+
+    Output:
+        None
+
+    Description:
+        bcrypt is deliberately slow (hundreds of milliseconds of CPU per call), so a burst of
+        logins would stall every session that shares the process. Requests are queued to a
+        ProcessPoolExecutor and return a concurrent.futures.Future; the *_async variants wrap
+        that future for asyncio callers, so an event loop keeps serving other sessions while
+        a password is checked. depth() is the number of requests queued or running (the
+        queue-depth metric), peak_depth its high-water mark.
+
+        New hashes use self.rounds: BCRYPT_ROUNDS if pinned, otherwise the cost found by
+        calibrate(). needs_rehash() tells Player.check_password when a stored hash should be
+        upgraded to that cost after a successful login.
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        """
+        Create the service; the worker processes start on first use.
+
+        Input:
+            workers (int): Worker processes.
+
+        Output:
+            None
+
+        Description:
+            Workers are spawned rather than forked, so they never inherit the write-behind
+            thread, open SQLite connections or the table mmap.
+        """
+        self.workers = workers or AUTH_WORKERS
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._depth = 0
+        self.peak_depth = 0
+        self.completed = 0
+        self.rounds = BCRYPT_ROUNDS or BCRYPT_DEFAULT_ROUNDS
+        self.calibrated = BCRYPT_ROUNDS > 0
+        self.rehashed = 0
+
+    def _submit(self, fn, *args) -> Future:
+        """
+        Queue one request on the pool and track the queue depth.
+
+        Input:
+            fn (Callable): Worker function.
+            *args: Its arguments.
+
+        Output:
+            Future: Completes with the worker function's result.
+
+        Description:
+            Starts the pool on first use.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            self._depth += 1
+            self.peak_depth = max(self.peak_depth, self._depth)
+            future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        """
+        Done-callback: one request left the queue.
+
+        Input:
+            future (Future): The finished request.
+
+        Output:
+            None
+        """
+        with self._lock:
+            self._depth -= 1
+            self.completed += 1
+
+    def calibrate(self, target_ms: Optional[float] = None) -> None:
+        """
+        Benchmark this host and pick the bcrypt cost for new hashes.
+
+        Input:
+            target_ms (float): Target verification latency (default: AUTH_TARGET_MS).
+
+        Output:
+            None
+
+        Description:
+            Runs _calibrate_rounds in a worker process (so it measures the cores that will do
+            the work) without waiting for it: until it finishes, new hashes use the current cost
+            and needs_rehash() reports False. Does nothing if the cost is pinned.
+        """
+        if self.calibrated:
+            return
+
+        def done(future: Future) -> None:
+            try:
+                self.rounds = future.result()
+            except Exception:
+                return  # keep the current cost
+            self.calibrated = True
+
+        self._submit(_calibrate_rounds, target_ms or AUTH_TARGET_MS).add_done_callback(done)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Check whether a stored hash uses a different cost than the target.
+
+        Input:
+            hashed_password (str): Stored bcrypt hash.
+
+        Output:
+            bool: True if the hash should be replaced after the next successful login.
+        """
+        return self.calibrated and hash_rounds(hashed_password) != self.rounds
+
+    def hash_password(self, password_plain: str) -> Future:
+        """
+        Queue a bcrypt hash of a new password.
+
+        Input:
+            password_plain (str): The plaintext password.
+
+        Output:
+            Future: Completes with the bcrypt hash as a string (cost self.rounds).
+        """
+        return self._submit(_hash_password, password_plain, self.rounds)
+
+    def check_password(self, password_plain: str, hashed_password: str) -> Future:
+        """
+        Queue a bcrypt verification.
+
+        Input:
+            password_plain (str): The plaintext password.
+            hashed_password (str): Stored bcrypt hash.
+
+        Output:
+            Future: Completes with True if the password matches.
+        """
+        return self._submit(_check_password, password_plain, hashed_password)
+
+    async def hash_password_async(self, password_plain: str) -> str:
+        """
+        Hash a new password without blocking the event loop.
+
+        Input:
+            password_plain (str): The plaintext password.
+
+        Output:
+            str: bcrypt hash as a string.
+        """
+        return await asyncio.wrap_future(self.hash_password(password_plain))
+
+    async def check_password_async(self, password_plain: str, hashed_password: str) -> bool:
+        """
+        Verify a password without blocking the event loop.
+
+        Input:
+            password_plain (str): The plaintext password.
+            hashed_password (str): Stored bcrypt hash.
+
+        Output:
+            bool: True if the password matches.
+        """
+        return await asyncio.wrap_future(self.check_password(password_plain, hashed_password))
+
+    def depth(self) -> int:
+        """
+        Number of requests queued or running.
+
+        Input:
+            None
+
+        Output:
+            int: Current queue depth.
+        """
+        with self._lock:
+            return self._depth
+
+    def close(self) -> None:
+        """
+        Stop the worker processes.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Waits for queued requests; the pool is started again if the service is used later.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+auth_service = AuthService()
+
+# ------------------------
+# Session tokens
+# ------------------------
+SESSION_TTL = float(os.environ.get("TONG777_SESSION_TTL", "900"))  # seconds a login can be resumed
+SESSION_MAX = 100000  # live tokens kept; the oldest are dropped first
+# HMAC key; random per process unless shared between servers through the environment
+SESSION_SECRET = os.environ.get("TONG777_SESSION_SECRET", "").encode("utf-8") or os.urandom(32)
+
+
+class SessionTokens:
+    """
+    HMAC-signed session tokens that let a player resume a login without bcrypt.
+
+    Input:
+        ttl (float): Token lifetime in seconds (default: SESSION_TTL).
+        secret (bytes): HMAC key (default: SESSION_SECRET).
+
+    Output:
+        None
+
+    Description:
+        A token is "<id>.<expires>.<signature>", where the signature is HMAC-SHA256 over id,
+        expiry and username. Issued tokens are kept in an OrderedDict (id -> username, expires)
+        in issue order; since every token has the same lifetime that is also expiry order, so
+        expired tokens are evicted from the front. verify() costs one HMAC and a constant-time
+        compare instead of a bcrypt run, and fails for expired, revoked or forged tokens.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, secret: Optional[bytes] = None) -> None:
+        """
+        Create an empty token table.
+
+        Input:
+            ttl (float): Token lifetime in seconds.
+            secret (bytes): HMAC key.
+
+        Output:
+            None
+        """
+        self.ttl = ttl or SESSION_TTL
+        self._secret = secret or SESSION_SECRET
+        self._tokens: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.issued = 0
+        self.resumed = 0
+
+    def _sign(self, token_id: str, expires: int, username: str) -> str:
+        """
+        Compute a token signature.
+
+        Input:
+            token_id (str): Random token id.
+            expires (int): Expiry as a Unix timestamp.
+            username (str): Player's username.
+
+        Output:
+            str: Hex HMAC-SHA256 signature.
+        """
+        message = f"{token_id}.{expires}.{username}".encode("utf-8")
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def _evict(self, now: float) -> None:
+        """
+        Drop expired tokens and the oldest ones over SESSION_MAX (caller holds the lock).
+
+        Input:
+            now (float): Current time.
+
+        Output:
+            None
+        """
+        while self._tokens:
+            _, (_, expires) = next(iter(self._tokens.items()))
+            if expires > now and len(self._tokens) <= SESSION_MAX:
+                break
+            self._tokens.popitem(last=False)
+
+    def issue(self, username: str) -> str:
+        """
+        Mint a token after a successful password check.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            str: The session token.
+        """
+        now = time.time()
+        token_id = os.urandom(12).hex()
+        expires = int(now + self.ttl)
+        with self._lock:
+            self._evict(now)
+            self._tokens[token_id] = (username, expires)
+            self.issued += 1
+        return f"{token_id}.{expires}.{self._sign(token_id, expires, username)}"
+
+    def verify(self, token: str, username: str) -> bool:
+        """
+        Check a token for a username.
+
+        Input:
+            token (str): Token from issue().
+            username (str): Username the client claims.
+
+        Output:
+            bool: True if the token is well formed, correctly signed for this username,
+            not expired and still in the table.
+        """
+        parts = token.split(".")
+        if len(parts) != 3 or not parts[1].isdigit():
+            return False
+        token_id, expires_s, signature = parts
+        expires = int(expires_s)
+        if not hmac.compare_digest(self._sign(token_id, expires, username), signature):
+            return False
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            if self._tokens.get(token_id) != (username, expires):
+                return False
+            self.resumed += 1
+        return True
+
+    def revoke(self, token: str) -> None:
+        """
+        Invalidate a token (e.g. when the player exits).
+
+        Input:
+            token (str): Token from issue().
+
+        Output:
+            None
+        """
+        with self._lock:
+            self._tokens.pop(token.split(".", 1)[0], None)
+
+    def __len__(self) -> int:
+        """
+        Number of live tokens in the table.
+
+        Input:
+            None
+
+        Output:
+            int: Token count (expired tokens may linger until the next issue/verify).
+        """
+        return len(self._tokens)
+
+
+session_tokens = SessionTokens()
+
+# ------------------------
+# Login throttling
+# ------------------------
+LOGIN_USER_BURST = 5          # password attempts per username before throttling starts
+LOGIN_USER_RATE = 1 / 30      # then one attempt per 30 seconds per username
+LOGIN_SOURCE_BURST = 20       # attempts per source (terminal / client address)
+LOGIN_SOURCE_RATE = 1.0       # then one attempt per second per source
+THROTTLE_SWEEP_INTERVAL = 60.0
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter over many keys.
+
+    Input:
+        rate (float): Tokens added per second.
+        burst (int): Bucket capacity.
+
+    Output:
+        None
+
+    Description:
+        Each key maps to one (tokens, timestamp) tuple; the level is brought up to date lazily
+        when the key is used. A key whose bucket has refilled completely behaves exactly like
+        a missing key, so sweep() drops those and the dict only holds recently active keys.
+        Not thread-safe on its own; LoginThrottle serializes access.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """
+        Create an empty limiter.
+
+        Input:
+            rate (float): Tokens added per second.
+            burst (int): Bucket capacity.
+
+        Output:
+            None
+        """
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def level(self, key: str, now: float) -> float:
+        """
+        Current number of tokens for a key.
+
+        Input:
+            key (str): Bucket key.
+            now (float): Current time (time.monotonic()).
+
+        Output:
+            float: Tokens available, at most burst.
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.burst)
+        tokens, stamp = bucket
+        return min(float(self.burst), tokens + (now - stamp) * self.rate)
+
+    def take(self, key: str, now: float) -> None:
+        """
+        Consume one token (caller checked level() >= 1).
+
+        Input:
+            key (str): Bucket key.
+            now (float): Current time.
+
+        Output:
+            None
+        """
+        self._buckets[key] = (self.level(key, now) - 1, now)
+
+    def wait_time(self, key: str, now: float) -> float:
+        """
+        Seconds until the next token is available.
+
+        Input:
+            key (str): Bucket key.
+            now (float): Current time.
+
+        Output:
+            float: 0 if a token is available now.
+        """
+        return max(0.0, (1 - self.level(key, now)) / self.rate)
+
+    def sweep(self, now: float) -> None:
+        """
+        Drop buckets that have refilled completely.
+
+        Input:
+            now (float): Current time.
+
+        Output:
+            None
+        """
+        full = [key for key in self._buckets if self.level(key, now) >= self.burst]
+        for key in full:
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        """
+        Number of tracked keys.
+
+        Input:
+            None
+
+        Output:
+            int: Key count.
+        """
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    """
+    Per-username and per-source limits on password checks.
+
+    Input:
+        None
+
+    Output:
+        None
+
+    Description:
+        check() is called before any bcrypt work for a login or registration. The attempt is
+        allowed only if both the username bucket and the source bucket have a token, and only
+        then are tokens taken, so a flood from one source cannot lock a player out from every
+        other source for longer than the username limit allows. Buckets are swept every
+        THROTTLE_SWEEP_INTERVAL seconds. checks_avoided counts the rejected attempts, i.e. the
+        bcrypt runs that did not happen.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create empty username and source limiters.
+
+        Input:
+            None
+
+        Output:
+            None
+        """
+        self.users = TokenBucket(LOGIN_USER_RATE, LOGIN_USER_BURST)
+        self.sources = TokenBucket(LOGIN_SOURCE_RATE, LOGIN_SOURCE_BURST)
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.allowed = 0
+        self.checks_avoided = 0
+
+    def check(self, username: str, source: str) -> float:
+        """
+        Ask for permission to run one password check.
+
+        Input:
+            username (str): Username being logged into or registered.
+            source (str): Where the attempt comes from (terminal, client address).
+
+        Output:
+            float: 0 if the attempt may go ahead, otherwise seconds to wait before retrying.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep >= THROTTLE_SWEEP_INTERVAL:
+                self.users.sweep(now)
+                self.sources.sweep(now)
+                self._last_sweep = now
+            wait = max(self.users.wait_time(username, now), self.sources.wait_time(source, now))
+            if wait > 0:
+                self.checks_avoided += 1
+                return wait
+            self.users.take(username, now)
+            self.sources.take(source, now)
+            self.allowed += 1
+            return 0.0
+
+
+login_throttle = LoginThrottle()
+
+# ------------------------
+# Active sessions
+# ------------------------
+class ActiveSessions:
+    """
+    Usernames that are logged in on a session of this process.
+
+    Input:
+        None
+
+    Output:
+        None
+
+    Description:
+        Each session works on its own Player object, so two sessions of the same account
+        would both spend the same wallet and the last write would win. A login claims the
+        username and is refused while another session holds it; logout, exit and disconnect
+        release it. Only sessions of this process (the server's connections) are covered.
+    """
+
+    def __init__(self) -> None:
+        """
+        Start with no logged-in players.
+
+        Input:
+            None
+
+        Output:
+            None
+        """
+        self._names: set = set()
+        self._lock = threading.Lock()
+
+    def claim(self, username: str) -> bool:
+        """
+        Mark a username as logged in.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            bool: True if claimed, False if another session already holds it.
+        """
+        with self._lock:
+            if username in self._names:
+                return False
+            self._names.add(username)
+            return True
+
+    def release(self, username: str) -> None:
+        """
+        Mark a username as logged out.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            None
+        """
+        with self._lock:
+            self._names.discard(username)
+
+
+active_sessions = ActiveSessions()
+
+# ------------------------
+# Player Class
+# ------------------------
+_registration_lock = threading.Lock()  # name check + first save of a new player
+# Usernames become file names and fields of the username,hash,wallet record: no path
+# separators, no "..", no commas or control characters, and no leading dot (hidden files).
+USERNAME_RE = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]{0,31}")
+USERNAME_RULES = "1-32 letters, digits, '_', '-' or '.', not starting with '.'"
+
+
+def valid_username(username: str) -> bool:
+    """
+    Check that a username is safe to use as a file name and record field.
+
+    Input:
+        username (str): Username typed by the user.
+
+    Output:
+        bool: True if the whole username matches USERNAME_RE.
+    """
+    return USERNAME_RE.fullmatch(username) is not None
+
+
+class Player:
+    def __init__(self, username: str, hashed_password: str, wallet: int = 0) -> None:
+        """
+        Initialize a Player instance.
+
+        Input:
+            username (str): The player's username.
+            hashed_password (str): The bcrypt-hashed password as a string.
+            wallet (int): The player's starting balance in cents (default: 0).
+
+        Output:
+            None
+
+        Description:
+            Creates a new Player object with username, hashed password, and wallet balance.
+        """
+        self.username = username
+        self.hashed_password = hashed_password  # stored as decoded str
+        self.wallet = int(wallet)  # cents
+        self._lock = threading.Lock()  # guards hashed_password against the rehash callback
+
+    @property
+    def filepath(self) -> str:
+        """
+        Get the file path for this player's data file.
+
+        Input:
+            None
+
+        Output:
+            str: Full path to the player's data file.
+
+        Description:
+            Returns the path new saves go to (flat or sharded, see FILE_LAYOUT).
+        """
+        return player_file_path(self.username)
+
+    def save(self) -> None:
+        """
+        Save player data to file.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Writes player data (username, hashed_password, wallet) through the active PlayerStore
+            (text file, wallet ledger or SQLite, see STORAGE_MODE). Handles storage errors
+            by printing error messages.
+        """
+        try:
+            get_store().save(self.username, self.hashed_password, self.wallet)
+        except STORE_ERRORS as e:
+            player_cache.invalidate(self.username)
+            print("❌ Error saving player data:", e)
+            return
+        # Replace the cached copy with what was just saved
+        player_cache.put(self.username, self.hashed_password, self.wallet)
+
+    @classmethod
+    def load(cls, username: str) -> Optional["Player"]:
+        """
+        Load player data from file.
+
+        Input:
+            username (str): The username to load.
+
+        Output:
+            Optional[Player]: Player object if found and valid, None otherwise.
+
+        Description:
+            Reads player data from the write-behind queue (not yet written changes), the player
+            cache, or from the active PlayerStore on a miss, and creates a Player instance.
+            Returns None if the player doesn't exist or data is invalid. Handles I/O and parsing errors.
+        """
+        record = write_behind.pending(username) or player_cache.get(username)
+        if record is not None:
+            hashed_password, wallet = record
+            return cls(username=username, hashed_password=hashed_password, wallet=wallet)
+        try:
+            record = get_store().load(username)
+        except STORE_ERRORS as e:
+            print("❌ Error reading player file:", e)
+            return None
+        except (ValueError, TypeError) as e:
+            print("❌ Error parsing player file:", e)
+            return None
+        if record is None:
+            return None
+        hashed_password, wallet = record
+        player_cache.put(username, hashed_password, wallet)
+        return cls(username=username, hashed_password=hashed_password, wallet=wallet)
+
+    @classmethod
+    def create_new(cls, username: str, password_plain: str, starting_wallet: int = 10000) -> "Player":
+        """
+        Create a new player with hashed password.
+
+        Input:
+            username (str): The desired username.
+            password_plain (str): The plaintext password to hash.
+            starting_wallet (int): Initial wallet balance in cents (default: 10000).
+
+        Output:
+            Player: A new Player instance with hashed password.
+
+        Description:
+            Creates a new player by hashing the password with bcrypt in the auth service's worker
+            pool, initializing the wallet, immediately saving to file and adding the name to the username index.
+            The record is created with the store's exclusive create, so an account written by another
+            process after the index was built is never overwritten. Raises FileExistsError if the name
+            is already registered, in this session or any other, and ValueError if it is not a valid username.
+        """
+        if not valid_username(username):
+            raise ValueError(f"Invalid username: {username!r}")
+        hashed_s = auth_service.hash_password(password_plain).result()
+        player = cls(username=username, hashed_password=hashed_s,
+                     wallet=starting_wallet)
+        with _registration_lock:
+            if get_username_index().exists(username):
+                raise FileExistsError(username)
+            try:
+                created = get_store().create(username, hashed_s, starting_wallet)
+            except STORE_ERRORS as e:
+                print("❌ Error saving player data:", e)
+                return player
+            if not created:
+                get_username_index().add(username)  # the index missed an outside write
+                raise FileExistsError(username)
+            player_cache.put(username, hashed_s, starting_wallet)
+            get_username_index().add(username)
+        return player
+
+    def check_password(self, password_plain: str) -> bool:
+        """
+        Verify a plaintext password against stored hash.
+
+        Input:
+            password_plain (str): The plaintext password to check.
+
+        Output:
+            bool: True if password matches, False otherwise.
+
+        Description:
+            Runs bcrypt verification in the auth service's worker pool and waits for the result.
+            Returns False if any exception occurs during verification. After a successful check
+            the stored hash is upgraded in the background if its cost differs from the target.
+        """
+        try:
+            ok = auth_service.check_password(password_plain, self.hashed_password).result()
+        except Exception:
+            return False
+        if ok and auth_service.needs_rehash(self.hashed_password):
+            self.rehash(password_plain)
+        return ok
+
+    def rehash(self, password_plain: str) -> None:
+        """
+        Re-hash the password at the current bcrypt cost without waiting for it.
+
+        Input:
+            password_plain (str): The verified plaintext password.
+
+        Output:
+            None
+
+        Description:
+            The new hash is computed in the auth worker pool; when it is ready the callback only
+            replaces hashed_password. It runs on the pool's result thread, so it does no storage
+            I/O: the hash is persisted by the session's next write-behind submit (at the latest on
+            logout). The login continues immediately with the old hash.
+        """
+        def done(future: Future) -> None:
+            try:
+                hashed = future.result()
+            except Exception as e:
+                print("❌ Error re-hashing password:", e)
+                return  # keep the old hash, try again on the next login
+            with self._lock:
+                self.hashed_password = hashed
+            auth_service.rehashed += 1
+
+        auth_service.hash_password(password_plain).add_done_callback(done)
+
+    # Wallet operations with validation + try/except for user input
+    def update_wallet(self, amount: int) -> None:
+        """
+        Update wallet balance by adding or subtracting an amount.
+
+        Input:
+            amount (int): Amount in cents to add (positive) or subtract (negative).
+
+        Output:
+            None
+
+        Description:
+            Adds the specified amount to the wallet with integer arithmetic (no rounding needed)
+            and rejects amounts that are not integer cents. Raises ValueError (wallet unchanged)
+            if the new balance would exceed MAX_CENTS.
+        """
+        if not isinstance(amount, int):
+            print("❌ Invalid amount to update wallet.")
+            return
+        if self.wallet + amount > MAX_CENTS:
+            raise ValueError(f"Balance cannot exceed {format_cents(MAX_CENTS)}")
+        self.wallet += amount
+
+    def deposit_interactive(self, console: Console) -> None:
+        """
+        Interactive deposit interface for adding funds.
+
+        Input:
+            console (Console): The player's console.
+
+        Output:
+            None
+
+        Description:
+            Prompts user to enter deposit amount and transaction ID, validates input (non-negative, max 2 decimals,
+            new balance within MAX_CENTS), updates wallet, and saves player data through the write-behind queue. Includes a placeholder for QR code display
+            (opened only on a local terminal).
+        """
+        qr_path = "/Users/kung/Intro to programming_Python/Fay_Python/Module 5/Tong777_V2/images/QR_PromptPay.png"
+
+        console.screen("----[ Deposit Funds ]----",
+                       f"Current balance: {format_cents(self.wallet)}",
+                       "\n(Placeholder) Please transfer funds and enter transaction ID when done.")
+
+        while True:
+            amt = console.read_line("Amount to deposit (0 to cancel): ").strip()
+            try:
+                if amt == "":
+                    console.print("Please enter a number.")
+                    continue
+                amt_c = parse_cents(amt)
+                if amt_c < 0:
+                    console.print("Enter positive amount.")
+                    continue
+                if amt_c == 0:
+                    console.print("Deposit cancelled.")
+                    return
+                if self.wallet + amt_c > MAX_CENTS:
+                    console.print(f"❌ Balance cannot exceed {format_cents(MAX_CENTS)}.")
+                    continue
+                break
+            except ValueError:
+                console.print("❌ Invalid number, try again.")
+
+        # Open QR Code
+        console.print("\n📱 Opening PromptPay QR Code...")
+        if console.local and open_image(qr_path):
+            console.print("✅ QR Code opened!")
+        else:
+            console.print("⚠️  Could not open QR Code")
+
+        tx = console.read_line("\nTransaction ID: ").strip()
+        # in real app, validate tx
+        self.update_wallet(amt_c)
+        write_behind.submit(self)
+        console.print(f"✅ Deposited {format_cents(amt_c)}. New balance: {format_cents(self.wallet)}")
+        console.sleep(1)
+
+    def withdraw_interactive(self, console: Console) -> None:
+        """
+        Interactive withdrawal interface for removing funds.
+
+        Input:
+            console (Console): The player's console.
+
+        Output:
+            None
+
+        Description:
+            Prompts user to enter withdrawal amount and destination. Validates that the amount
+            is non-negative and does not exceed the current balance. Updates wallet and saves
+            through the write-behind queue.
+        """
+        console.screen("----[ Withdraw Funds ]----",
+                       f"Current balance: {format_cents(self.wallet)}")
+        while True:
+            amt = console.read_line("Amount to withdraw (0 to cancel): ").strip()
+            try:
+                if amt == "":
+                    console.print("Please enter a number.")
+                    continue
+                amt_c = parse_cents(amt)
+                if amt_c < 0:
+                    console.print("Enter positive amount.")
+                    continue
+                if amt_c == 0:
+                    console.print("Withdrawal cancelled.")
+                    return
+                if amt_c > self.wallet:
+                    console.print("❌ Not enough balance.")
+                    continue
+                break
+            except ValueError:
+                console.print("❌ Invalid number, try again.")
+        dest = console.read_line("Enter destination (placeholder): ").strip()
+        self.update_wallet(-amt_c)
+        write_behind.submit(self)
+        console.print(f"✅ Withdrew {format_cents(amt_c)}. New balance: {format_cents(self.wallet)}")
+        console.sleep(1)
+
+
+# ------------------------
+# Write-behind
+# ------------------------
+class WriteBehind:
+    """
+    Write-behind queue for wallet persistence.
+
+    Input:
+        durability (str): "round", "batched" or "logout" (default: DURABILITY).
+        flush_interval (float): Seconds between background flushes (default: FLUSH_INTERVAL).
+        flush_count (int): Dirty players that trigger an early flush (default: FLUSH_COUNT).
+
+    Output:
+        None
+
+    Description:
+        Instead of saving synchronously, game rounds and wallet operations mark the player
+        dirty. Repeated changes to the same player are coalesced into one pending record,
+        and a background thread writes all pending records with one PlayerStore.save_many
+        followed by one PlayerStore.sync. In "round" mode submit() blocks until its record is
+        committed; concurrent submitters that queue up behind a running flush are written by
+        the next flush together (group commit), so many sessions share one batch of fsyncs.
+    """
+
+    def __init__(self, durability: Optional[str] = None, flush_interval: Optional[float] = None,
+                 flush_count: Optional[int] = None) -> None:
+        """
+        Create an idle write-behind queue.
+
+        Input:
+            durability (str): Durability level.
+            flush_interval (float): Seconds between background flushes.
+            flush_count (int): Dirty players that trigger an early flush.
+
+        Output:
+            None
+
+        Description:
+            Raises ValueError for an unknown durability level. The writer thread starts on first use.
+        """
+        self.durability = durability or DURABILITY
+        if self.durability not in ("round", "batched", "logout"):
+            raise ValueError(f"Unknown durability level: {self.durability}")
+        self.flush_interval = flush_interval or FLUSH_INTERVAL
+        self.flush_count = flush_count or FLUSH_COUNT
+        self._dirty: Dict[str, Tuple[str, int]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.records_written = 0
+
+    def submit(self, player: "Player") -> None:
+        """
+        Persist a player's current state according to the durability level.
+
+        Input:
+            player (Player): Player whose wallet changed.
+
+        Output:
+            None
+
+        Description:
+            The record replaces any pending one for the same player. "round": flush now
+            (group commit with other waiting sessions). "batched": the writer thread is
+            woken when FLUSH_COUNT players are dirty.
+        """
+        with player._lock:
+            record = (player.hashed_password, player.wallet)
+        with self._lock:
+            self._dirty[player.username] = record
+            dirty = len(self._dirty)
+        player_cache.put(player.username, *record)
+        if self.durability == "round":
+            self.flush()  # returns at once if a concurrent flush already took the record
+            return
+        if self.durability == "batched":
+            self._ensure_thread()
+            if dirty >= self.flush_count:
+                self._wake.set()
+
+    def pending(self, username: str) -> Optional[Tuple[str, int]]:
+        """
+        Get a record that is waiting to be written.
+
+        Input:
+            username (str): Player's username.
+
+        Output:
+            Optional[Tuple[str, int]]: (hashed_password, wallet), or None if nothing is pending.
+
+        Description:
+            Player.load checks this first so a reload never sees an older stored balance.
+        """
+        with self._lock:
+            return self._dirty.get(username)
+
+    def flush(self) -> int:
+        """
+        Write all pending records now.
+
+        Input:
+            None
+
+        Output:
+            int: Number of player records written.
+
+        Description:
+            Takes the whole dirty table, writes it with one save_many and one sync.
+            If the batch fails, the records are saved one by one so a single bad record
+            (e.g. a wallet the backend cannot store) does not hold up the others.
+            Records that could not be written are put back (unless a newer one arrived)
+            for the next flush. Any exception is caught and printed.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._dirty = self._dirty, {}
+            if not batch:
+                return 0
+            records = [(username, hashed, wallet)
+                       for username, (hashed, wallet) in batch.items()]
+            failed: List[Tuple[str, str, int]] = []
+            try:
+                store = get_store()
+                try:
+                    store.save_many(records)
+                except Exception as e:
+                    print("❌ Error flushing player data:", e)
+                    failed = self._save_each(store, records)
+                store.sync()
+            except Exception as e:
+                print("❌ Error flushing player data:", e)
+                self._requeue(records)
+                return 0
+            self._requeue(failed)
+            written = len(records) - len(failed)
+            self.flushes += 1
+            self.records_written += written
+            return written
+
+    def _save_each(self, store: PlayerStore,
+                   records: List[Tuple[str, str, int]]) -> List[Tuple[str, str, int]]:
+        """
+        Save records one by one after a failed batch.
+
+        Input:
+            store (PlayerStore): Active player store.
+            records (List[Tuple[str, str, int]]): (username, hashed_password, wallet) tuples.
+
+        Output:
+            List[Tuple[str, str, int]]: Records that could not be written.
+
+        Description:
+            Records already written by the failed batch are simply written again.
+        """
+        failed = []
+        for username, hashed, wallet in records:
+            try:
+                store.save(username, hashed, wallet)
+            except Exception as e:
+                print(f"❌ Error saving player data for {username}:", e)
+                failed.append((username, hashed, wallet))
+        return failed
+
+    def _requeue(self, records: List[Tuple[str, str, int]]) -> None:
+        """
+        Put unwritten records back into the dirty table.
+
+        Input:
+            records (List[Tuple[str, str, int]]): (username, hashed_password, wallet) tuples.
+
+        Output:
+            None
+
+        Description:
+            A record submitted while the flush was running is newer and wins.
+        """
+        with self._lock:
+            for username, hashed, wallet in records:
+                self._dirty.setdefault(username, (hashed, wallet))
+
+    def _ensure_thread(self) -> None:
+        """
+        Start the background writer thread if it is not running.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            The thread is a daemon; stop() flushes whatever is left.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop = False
+            self._thread = threading.Thread(
+                target=self._run, name="tong777-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """
+        Background writer loop.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Flushes every flush_interval seconds, or earlier when woken by submit().
+            An unexpected error is printed and the loop keeps running.
+        """
+        while not self._stop:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print("❌ Error in background writer:", e)
+
+    def stop(self) -> None:
+        """
+        Stop the writer thread and flush everything still pending.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Called by close_storage() on exit.
+        """
+        self._stop = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+write_behind = WriteBehind()
+
+# ------------------------
+# Input helpers
+# ------------------------
+def is_positive_number(text: str) -> bool:
+    """
+    Validate if a string represents a positive number with max 2 decimals.
+
+    Input:
+        text (str): String to validate.
+
+    Output:
+        bool: True if valid positive number (including zero), False otherwise.
+
+    Description:
+        Checks format validity (max 2 decimals, allows optional leading +) and ensures
+        the parsed float value is non-negative. Uses try/except for robust parsing.
+    """
+    try:
+        s = text.strip()
+        if s == "" or s == ".":
+            return False
+        if s.count(".") > 1:
+            return False
+        if s[0] == "+":
+            s = s[1:]
+        if not s.replace(".", "", 1).isdigit():
+            return False
+        if "." in s:
+            decimals = s.split(".", 1)[1]
+            if len(decimals) > 2:
+                return False
+        return float(s) >= 0
+    except Exception:
+        return False
+
+
+def get_valid_bet(console: Console, current_money: int) -> int:
+    """
+    Prompt user for a valid bet amount.
+
+    Input:
+        console (Console): The player's console.
+        current_money (int): Player's current balance in cents.
+
+    Output:
+        int: Valid bet amount in cents, or 0 if user cancels.
+
+    Description:
+        Repeatedly prompts until user enters a valid, non-negative bet amount
+        (max 2 decimals) that does not exceed their available balance.
+    """
+    while True:
+        ans = console.read_line(f"💰 Enter your bet (0 to cancel): ").strip()
+        try:
+            if not is_positive_number(ans):
+                raise ValueError("Invalid number format")
+            val = parse_cents(ans)
+            if val < 0:
+                raise ValueError("Negative bet")
+            if val == 0:
+                return 0
+            if val > current_money:
+                console.print(
+                    f"❌ You cannot bet more than your balance ({format_cents(current_money)}).")
+                continue
+            return val
+        except ValueError:
+            console.print("❌ Please enter a valid positive number (max 2 decimals).")
+
+
+# ------------------------
+# Decorator: game_session
+# ------------------------
+def game_session(game_name: str):
+    """
+    Decorator for game play_round methods.
+
+    Input:
+        game_name (str): Display name of the game for the header.
+
+    Output:
+        function: Decorated function wrapper (Callable[[BaseGame, Player, ...], int])
+
+    Description:
+        Provides core functionality wrapping game rounds (all output goes to the game's console):
+        1. Draws the game screen (banner, header and player balance) in one write.
+        2. Handles exceptions during the game logic (try/except).
+        3. Updates the player's wallet with the net change (int cents).
+        4. Auto-saves player data (through the write-behind queue, see DURABILITY).
+        5. Prompts user to continue after the round ends.
+    """
+    def decorator(func):
+        def wrapper(self, player: Player, *args, **kwargs):
+            self.console.screen(
+                tong_777_pic, f"----[ {game_name} ]----",
+                f"Player: {player.username} | Balance: {format_cents(player.wallet)}\n")
+            try:
+                # Calls the original game logic (play_round)
+                net_change = func(self, player, *args, **kwargs)
+            except Exception as e:
+                self.console.print("❌ An error occurred during the game:", e)
+                net_change = 0
+            # net_change may be None or int (cents)
+            try:
+                if isinstance(net_change, int):
+                    if net_change != 0:
                         player.update_wallet(net_change)
-                    player.save()
-                    print(f"\n💰 New balance: {player.wallet:.2f}")
+                    write_behind.submit(player)
+                    self.console.print(f"\n💰 New balance: {format_cents(player.wallet)}")
                 else:
                     # if function handled wallet update itself
-                    player.save()
+                    write_behind.submit(player)
             except Exception as e:
-                print("❌ Error updating player wallet:", e)
-            press_to_continue()
+                self.console.print("❌ Error updating player wallet:", e)
+            press_to_continue(self.console)
             return net_change
         return wrapper
     return decorator
 
 
+# ------------------------
+# Random number streams
+# ------------------------
+# "seeded": outcomes come from a Mersenne Twister seeded with 128 random bits per session (the
+# seed can be logged and replayed); "system": outcomes come from os.urandom (not replayable).
+RNG_MODE = os.environ.get("TONG777_RNG", "seeded")
+RNG_SEED = os.environ.get("TONG777_SEED")  # replay: every session uses this seed
+RNG_SEED_LOG = os.environ.get("TONG777_SEED_LOG")  # file that records the seed of every session
+_seed_log_lock = threading.Lock()
+
+
+def _derive_seed(seed: int, label: str) -> int:
+    """
+    Derive an independent 128-bit seed for one stream.
+
+    Input:
+        seed (int): Session seed.
+        label (str): Stream name, e.g. "Blackjack/outcome".
+
+    Output:
+        int: Seed for that stream.
+    """
+    return int.from_bytes(hashlib.sha256(f"{seed}/{label}".encode("utf-8")).digest()[:16], "big")
+
+
+def new_session_seed(source: str = "terminal") -> int:
+    """
+    Pick the seed of a new session and record it.
+
+    Input:
+        source (str): Where the session comes from (written to the seed log).
+
+    Output:
+        int: TONG777_SEED if set, otherwise 128 bits from os.urandom.
+
+    Description:
+        With TONG777_SEED_LOG set, appends "<time> <source> <seed>" to that file, so a
+        disputed session can be replayed exactly by running it again with TONG777_SEED.
+    """
+    seed = int(RNG_SEED) if RNG_SEED else int.from_bytes(os.urandom(16), "big")
+    if RNG_SEED_LOG:
+        try:
+            with _seed_log_lock, open(RNG_SEED_LOG, "a", encoding="utf-8") as f:
+                f.write(f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {source} {seed}\n")
+        except (IOError, OSError) as e:
+            print("⚠️ Could not record the session seed:", e)
+    return seed
+
+
+class RandomStreams:
+    """
+    The random number generators of one game in one session.
+
+    Input:
+        seed (Optional[int]): Session seed (default: 128 bits from os.urandom, not recorded).
+        label (str): Name of the game, so every game of a session gets its own streams.
+
+    Output:
+        None
+
+    Description:
+        outcome decides results (numbers, coin sides, reels, shoe shuffles); cosmetic only
+        picks animation frames. Both are private random.Random objects, so concurrent sessions
+        never share or reseed a global generator, and the number of animation frames shown
+        never shifts the outcome sequence. In "system" mode the outcome stream is
+        random.SystemRandom and only the cosmetic stream is seeded.
+    """
+
+    def __init__(self, seed: Optional[int] = None, label: str = "") -> None:
+        """
+        Create the streams.
+
+        Input:
+            seed (Optional[int]): Session seed.
+            label (str): Game name.
+
+        Output:
+            None
+        """
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(16), "big")
+        if RNG_MODE == "system":
+            self.outcome: random.Random = random.SystemRandom()
+        else:
+            self.outcome = random.Random(_derive_seed(self.seed, f"{label}/outcome"))
+        self.cosmetic = random.Random(_derive_seed(self.seed, f"{label}/cosmetic"))
+
+
+# ------------------------
+# Outcome pre-generation
+# ------------------------
+PREPARE_WORKERS = 2
+# outcomes generated per refill; bigger blocks are cheaper per outcome (simulation),
+# smaller ones keep less memory per idle session (server)
+OUTCOME_BLOCK = int(os.environ.get("TONG777_OUTCOME_BLOCK", "256"))
+
+
+class PrepareService:
+    """
+    Thread pool that prepares random outcomes ahead of time, shared by all sessions.
+
+    Input:
+        workers (int): Threads (default: PREPARE_WORKERS).
+
+    Output:
+        None
+
+    Description:
+        Shoes queue their next shuffled order and outcome buffers their next block as soon as
+        they start using the current one, so by the time it runs out the next one is normally
+        ready and swapping it in costs nothing inside a player's round.
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        """
+        Create the service; the threads start on first use.
+
+        Input:
+            workers (int): Threads.
+
+        Output:
+            None
+        """
+        self.workers = workers or PREPARE_WORKERS
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args) -> Future:
+        """
+        Queue one preparation job.
+
+        Input:
+            fn (Callable): Job, e.g. a shuffle or a block generator.
+            *args: Its arguments.
+
+        Output:
+            Future: Completes with the job's result.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="tong777-prepare")
+            return self._pool.submit(fn, *args)
+
+    def close(self) -> None:
+        """
+        Stop the threads (pending jobs are dropped).
+
+        Input:
+            None
+
+        Output:
+            None
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+prepare_service = PrepareService()
+
+
+class OutcomeBuffer:
+    """
+    Block of pre-generated outcomes handed out one at a time.
+
+    Input:
+        generate (Callable[[int], List]): Makes a list of n outcomes in one call (it runs in a
+            prepare_service thread and is the only user of its generator).
+        block (int): Outcomes per block (default: OUTCOME_BLOCK).
+        key (Optional[Callable[[], Any]]): Returns the settings the outcomes depend on
+            (e.g. Slots weights); None if they never change.
+
+    Output:
+        None
+
+    Description:
+        pop() reads the item under a cursor, O(1). The next block is generated in the
+        background while the current one is used; blocks are made one after the other from
+        the same generator, so the outcome sequence (and a seeded replay) is exactly what
+        drawing one at a time from that generator would give for the same calls. When key()
+        returns something else than for the current blocks, pop() drops the current and the
+        pending block, so outcomes always follow the settings in effect.
+    """
+
+    def __init__(self, generate, block: Optional[int] = None, key=None) -> None:
+        """
+        Create an empty buffer.
+
+        Input:
+            generate (Callable[[int], List]): Block generator.
+            block (int): Outcomes per block.
+            key (Optional[Callable[[], Any]]): Settings the outcomes depend on.
+
+        Output:
+            None
+        """
+        self._generate = generate
+        self.block = max(1, block or OUTCOME_BLOCK)
+        self._key_of = key
+        self._key = None  # key() when the current and pending blocks were requested
+        self._items: List = []
+        self._cursor = 0
+        self._next: Optional[Future] = None
+
+    def pop(self):
+        """
+        Take the next outcome.
+
+        Input:
+            None
+
+        Output:
+            Any: One outcome as made by generate.
+        """
+        if self._key_of is not None:
+            key = self._key_of()
+            if key != self._key:
+                self._discard()
+                self._key = key
+        if self._cursor >= len(self._items):
+            if self._next is None:
+                self._next = prepare_service.submit(self._generate, self.block)
+            self._items = self._next.result()
+            self._cursor = 0
+            self._next = prepare_service.submit(self._generate, self.block)
+        item = self._items[self._cursor]
+        self._cursor += 1
+        return item
+
+    def _discard(self) -> None:
+        """
+        Drop the current and the pending block.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Waits for a pending block to finish first, so the generator is never used by two
+            threads at once and a seeded replay stays deterministic.
+        """
+        if self._next is not None:
+            self._next.result()
+            self._next = None
+        self._items = []
+        self._cursor = 0
+
+
+# ------------------------
+# Cards and shoe
+# ------------------------
+# A card is an int code 0-51: suit * 13 + rank index. Everything about a card is a table
+# lookup, so dealing and counting never compare or parse strings.
+CARD_SUITS = ['♠', '♥', '♦', '♣']
+CARD_RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+DECK_SIZE = len(CARD_SUITS) * len(CARD_RANKS)
+CARD_RANK = [rank for suit in CARD_SUITS for rank in CARD_RANKS]
+CARD_SUIT = [suit for suit in CARD_SUITS for rank in CARD_RANKS]
+CARD_VALUE = [11 if rank == 'A' else 10 if rank in ('J', 'Q', 'K') else int(rank)
+              for rank in CARD_RANK]  # blackjack value, ace as 11
+CARD_LABEL = [f"{rank}{suit}" for rank, suit in zip(CARD_RANK, CARD_SUIT)]
+
+
+class Hand:
+    """
+    Blackjack hand with a running total.
+
+    Input:
+        None
+
+    Output:
+        None
+
+    Description:
+        Keeps the hard total (every ace counted as 1) and the number of aces up to date in
+        add(), so value(), is_bust() and is_blackjack() are O(1) however often they are asked.
+        At most one ace can count as 11 without busting, so the best value is hard + 10 when
+        the hand holds an ace and hard <= 11 (a soft hand).
+    """
+    __slots__ = ("cards", "hard", "aces")
+
+    def __init__(self) -> None:
+        """
+        Create an empty hand.
+
+        Input:
+            None
+
+        Output:
+            None
+        """
+        self.cards: List[int] = []
+        self.hard = 0
+        self.aces = 0
+
+    def add(self, card: int) -> None:
+        """
+        Add a card and update the totals.
+
+        Input:
+            card (int): Card code 0-51.
+
+        Output:
+            None
+        """
+        self.cards.append(card)
+        value = CARD_VALUE[card]
+        if value == 11:
+            self.hard += 1
+            self.aces += 1
+        else:
+            self.hard += value
+
+    def is_soft(self) -> bool:
+        """
+        Check whether an ace currently counts as 11.
+
+        Input:
+            None
+
+        Output:
+            bool: True for a soft hand.
+        """
+        return self.aces > 0 and self.hard <= 11
+
+    def value(self) -> int:
+        """
+        Best value of the hand (not exceeding 21 if possible).
+
+        Input:
+            None
+
+        Output:
+            int: Hand value.
+        """
+        return self.hard + 10 if self.aces and self.hard <= 11 else self.hard
+
+    def is_bust(self) -> bool:
+        """
+        Check whether the hand is over 21.
+
+        Input:
+            None
+
+        Output:
+            bool: True if busted.
+        """
+        return self.hard > 21
+
+    def is_blackjack(self) -> bool:
+        """
+        Check for a natural (21 with the first two cards).
+
+        Input:
+            None
+
+        Output:
+            bool: True for a natural blackjack.
+        """
+        return len(self.cards) == 2 and self.aces > 0 and self.hard == 11
+
+    def __len__(self) -> int:
+        """
+        Number of cards in the hand.
+
+        Input:
+            None
+
+        Output:
+            int: Card count.
+        """
+        return len(self.cards)
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Card at a position (hand[1] is the dealer's up card).
+
+        Input:
+            index (int): Position in the hand.
+
+        Output:
+            int: Card code.
+        """
+        return self.cards[index]
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Iterate over the card codes.
+
+        Input:
+            None
+
+        Output:
+            Iterator[int]: Card codes in dealing order.
+        """
+        return iter(self.cards)
+
+
+BLACKJACK_DECKS = int(os.environ.get("TONG777_DECKS", "1"))
+# fraction of the shoe dealt before the cut card; at least SHOE_RESERVE cards stay behind it
+SHOE_PENETRATION = float(os.environ.get("TONG777_PENETRATION", "0.75"))
+SHOE_RESERVE = 15
+
+
+def _shuffled(codes: "array.array", rng: random.Random) -> "array.array":
+    """
+    Shuffled copy of a card code array (runs in a prepare_service thread).
+
+    Input:
+        codes (array.array): Card codes.
+        rng (random.Random): Generator to shuffle with.
+
+    Output:
+        array.array: New array in random order.
+    """
+    shuffled = array.array(codes.typecode, codes)
+    rng.shuffle(shuffled)
+    return shuffled
+
+
+
+class Shoe:
+    """
+    N-deck card shoe stored as an array of card codes with a cursor and a cut card.
+
+    Input:
+        decks (int): Decks in the shoe (default: BLACKJACK_DECKS).
+        penetration (float): Fraction dealt before the cut card (default: SHOE_PENETRATION).
+        rng (Optional[random.Random]): Generator for the shuffles (default: a new one).
+
+    Output:
+        None
+
+    Description:
+        draw() returns the code under the cursor, so dealing never allocates. When the cursor passes the cut card, needs_shuffle() turns
+        True and the game calls reshuffle() between rounds, which swaps in the order that
+        prepare_service shuffled in the background and queues the next one. Each shoe has
+        its own generator (the game's outcome stream), only used by one shuffle at a time.
+    """
+
+    def __init__(self, decks: Optional[int] = None, penetration: Optional[float] = None,
+                 rng: Optional[random.Random] = None) -> None:
+        """
+        Create a shoe and queue its first shuffle.
+
+        Input:
+            decks (int): Decks in the shoe.
+            penetration (float): Fraction dealt before the cut card.
+            rng (Optional[random.Random]): Generator for the shuffles.
+
+        Output:
+            None
+        """
+        self.decks = max(1, decks or BLACKJACK_DECKS)
+        self.size = DECK_SIZE * self.decks
+        self.cut = min(int(self.size * (penetration or SHOE_PENETRATION)), self.size - SHOE_RESERVE)
+        self.cut = max(1, self.cut)
+        self._base = array.array("B", range(DECK_SIZE)) * self.decks
+        self._rng = rng or random.Random()
+        self._codes = self._base
+        self._cursor = self.size  # nothing dealt until the first reshuffle()
+        self._next = prepare_service.submit(_shuffled, self._base, self._rng)
+
+    def remaining(self) -> int:
+        """
+        Cards left in the shoe.
+
+        Input:
+            None
+
+        Output:
+            int: Undealt cards.
+        """
+        return self.size - self._cursor
+
+    def needs_shuffle(self) -> bool:
+        """
+        Check whether the cut card has come out.
+
+        Input:
+            None
+
+        Output:
+            bool: True if the shoe should be reshuffled before the next round.
+        """
+        return self._cursor >= self.cut
+
+    def reshuffle(self) -> None:
+        """
+        Start dealing from a freshly shuffled shoe.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            Takes the order prepared in the background (waiting for it only if it is not
+            finished yet) and queues the shuffle for the shoe after this one.
+        """
+        self._codes = self._next.result()
+        self._cursor = 0
+        self._next = prepare_service.submit(_shuffled, self._base, self._rng)
+
+    def draw(self) -> int:
+        """
+        Deal one card.
+
+        Input:
+            None
+
+        Output:
+            int: Card code 0-51.
+
+        Description:
+            O(1) and allocation free. Reshuffles only if a single round runs through the
+            cards behind the cut card.
+        """
+        if self._cursor >= self.size:
+            self.reshuffle()
+        card = self._codes[self._cursor]
+        self._cursor += 1
+        return card
+
+
 # ------------------------
 # Base Game and Subclasses
 # ------------------------
@@ -594,11 +4479,26 @@ class BaseGame(ABC):
     Description:
         Defines the mandatory interface (contract) for all game classes using ABC 
         and an abstract play_round method that must be implemented by concrete subclasses.
+        All I/O of a game goes through its console, all randomness through its RandomStreams.
     """
     name: str = "BaseGame"
 
+    def __init__(self, console: Optional[Console] = None, seed: Optional[int] = None) -> None:
+        """
+        Attach the game to a console and create its random streams.
+
+        Input:
+            console (Optional[Console]): Where the game reads and writes (default: TerminalConsole).
+            seed (Optional[int]): Session seed (default: a new random seed).
+
+        Output:
+            None
+        """
+        self.console = console or TerminalConsole()
+        self.rng = RandomStreams(seed, self.name)
+
     @abstractmethod
-    def play_round(self, player: Player) -> float:
+    def play_round(self, player: Player) -> int:
         """
         Play a single round or session of the game. (Abstract Method)
 
@@ -606,7 +4506,7 @@ class BaseGame(ABC):
             player (Player): The player object.
 
         Output:
-            float: Net change to player's wallet (positive for wins, negative for losses).
+            int: Net change to player's wallet in cents (positive for wins, negative for losses).
 
         Description:
             Abstract method that must be implemented by subclasses to define specific game logic.
@@ -631,21 +4531,25 @@ class HighLow(BaseGame):
     """
     name = "High-Low"
 
-    def __init__(self):
+    def __init__(self, console: Optional[Console] = None, seed: Optional[int] = None) -> None:
         """
         Initialize High-Low game parameters.
 
         Input:
-            None
+            console (Optional[Console]): The game's console (default: TerminalConsole).
+            seed (Optional[int]): Session seed (default: a new random seed).
 
         Output:
             None
 
         Description:
-            Sets the minimum and maximum range for the numbers used in the game (1 to 100).
+            Sets the minimum and maximum range for the numbers used in the game (1 to 100)
+            and the buffer the drawn numbers come from.
         """
+        super().__init__(console, seed)
         self.min_num = 1
         self.max_num = 100
+        self._numbers = OutcomeBuffer(self._number_block)
 
     def _number_reveal_animation(self, final_number: int, frames: int = 15) -> Generator[Tuple[int, float], None, None]:
         """
@@ -660,21 +4564,18 @@ class HighLow(BaseGame):
 
         Description:
             Creates suspense by yielding random numbers with progressive delays that slow down 
-            before revealing the final number. Uses time-based seeding for randomness.
+            before revealing the final number. Frames come from the cosmetic stream.
         """
         for i in range(frames):
             # Progressive delay - starts fast, slows down dramatically
             delay = 0.04 + (i * 0.03)
 
-            # Add time-based randomization
-            random.seed(int(time.time() * 1000000) + i)
-
             # Show random numbers, but get closer to final as we approach the end
             if i < frames - 3:
-                num = random.randint(self.min_num, self.max_num)
+                num = self.rng.cosmetic.randint(self.min_num, self.max_num)
             else:
                 # Last few frames hint at the final number
-                num = final_number + random.randint(-5, 5)
+                num = final_number + self.rng.cosmetic.randint(-5, 5)
                 num = max(self.min_num, min(self.max_num, num))
 
             yield (num, delay)
@@ -693,12 +4594,12 @@ class HighLow(BaseGame):
         Description:
             Shows the number in an ASCII art box for visual emphasis and formatting.
         """
-        print(f"\n    ╔═══════════╗")
-        print(f"    ║  {label:^7}  ║")
-        print(f"    ║           ║")
-        print(f"    ║    {number:3d}    ║")
-        print(f"    ║           ║")
-        print(f"    ╚═══════════╝\n")
+        self.console.print(f"\n    ╔═══════════╗")
+        self.console.print(f"    ║  {label:^7}  ║")
+        self.console.print(f"    ║           ║")
+        self.console.print(f"    ║    {number:3d}    ║")
+        self.console.print(f"    ║           ║")
+        self.console.print(f"    ╚═══════════╝\n")
 
     def _spinning_numbers(self, final_number: int, position: str = "FIRST") -> None:
         """
@@ -715,23 +4616,23 @@ class HighLow(BaseGame):
             Displays animated countdown effect using the _number_reveal_animation generator,
             showing random numbers before revealing the final number.
         """
-        print("\n" + "="*40)
-        print(f"🎲 REVEALING {position} NUMBER... 🎲".center(40))
-        print("="*40 + "\n")
+        self.console.print("\n" + "="*40)
+        self.console.print(f"🎲 REVEALING {position} NUMBER... 🎲".center(40))
+        self.console.print("="*40 + "\n")
 
         # Spinning effect
         for (num, delay) in self._number_reveal_animation(final_number, frames=18):
-            print(f"        ▶  {num:3d}  ◀        ", end="\r", flush=True)
-            time.sleep(delay)
+            self.console.print(f"        ▶  {num:3d}  ◀        ", end="\r", flush=True)
+            self.console.sleep(delay)
 
-        print()  # newline
+        self.console.print()  # newline
 
         # Dramatic pause before reveal
-        time.sleep(0.3)
+        self.console.sleep(0.3)
 
         # Show final number in box
         self._display_number_box(final_number, position)
-        time.sleep(0.5)
+        self.console.sleep(0.5)
 
     def _compare_visual(self, num1: int, num2: int, guess: str) -> None:
         """
@@ -749,9 +4650,9 @@ class HighLow(BaseGame):
             Displays both numbers side by side with visual indicators (arrows) 
             showing the relationship between them.
         """
-        print("\n" + "="*40)
-        print("📊 COMPARISON 📊".center(40))
-        print("="*40 + "\n")
+        self.console.print("\n" + "="*40)
+        self.console.print("📊 COMPARISON 📊".center(40))
+        self.console.print("="*40 + "\n")
 
         # Determine relationship
         if num2 > num1:
@@ -765,10 +4666,10 @@ class HighLow(BaseGame):
             relation = "EQUAL"
 
         # Display comparison
-        print(f"    {num1:3d}   {symbol}   {num2:3d}")
-        print(f"          {relation}          \n")
+        self.console.print(f"    {num1:3d}   {symbol}   {num2:3d}")
+        self.console.print(f"          {relation}          \n")
 
-        time.sleep(0.5)
+        self.console.sleep(0.5)
 
     def _get_difficulty_hint(self, num: int) -> str:
         """
@@ -795,8 +4696,55 @@ class HighLow(BaseGame):
         else:
             return "💡 Tip: Above middle - slight bias downward"
 
+    def _number_block(self, count: int) -> List[int]:
+        """
+        Generate a block of numbers (runs in a prepare_service thread).
+
+        Input:
+            count (int): Numbers to generate (two per round).
+
+        Output:
+            List[int]: Numbers between min_num and max_num, from the outcome stream.
+        """
+        return self.rng.outcome.choices(range(self.min_num, self.max_num + 1), k=count)
+
+    def draw_number(self) -> int:
+        """
+        Draw one number of the round (outcome only, no animation).
+
+        Input:
+            None
+
+        Output:
+            int: A number between min_num and max_num.
+
+        Description:
+            Pops the next pre-generated number (see OutcomeBuffer).
+        """
+        return self._numbers.pop()
+
+    def settle(self, bet: int, guess: str, num1: int, num2: int) -> int:
+        """
+        Settle a High-Low round.
+
+        Input:
+            bet (int): Bet amount in cents.
+            guess (str): 'h' (higher) or 'l' (lower).
+            num1 (int): First number.
+            num2 (int): Second number.
+
+        Output:
+            int: Net change in cents (+bet for a correct guess, -bet otherwise).
+
+        Description:
+            House rule: equal numbers lose. Shared by play_round and the simulator (tong_sim.py).
+        """
+        if (guess == 'h' and num2 > num1) or (guess == 'l' and num2 < num1):
+            return bet
+        return -bet
+
     @game_session("High-Low 🎲")
-    def play_round(self, player: Player) -> float:
+    def play_round(self, player: Player) -> int:
         """
         Play one round of High-Low with enhanced animations.
 
@@ -804,7 +4752,7 @@ class HighLow(BaseGame):
             player (Player): The player object.
 
         Output:
-            float: Bet amount if win, negative bet if loss, 0 if cancelled.
+            int: Bet amount (cents) if win, negative bet if loss, 0 if cancelled.
 
         Description:
             Implements the main game logic: animated reveal of first number, prompts 
@@ -812,61 +4760,57 @@ class HighLow(BaseGame):
             the final result.
         """
         while True:
-            print("\n╔═════════════════════════════════════╗")
-            print("║            HIGH-LOW GAME            ║")
-            print("╚═════════════════════════════════════╝")
-            print("\n📋 Rules:")
-            print("  • A number from 1-100 will be shown")
-            print("  • Guess if the next number is Higher or Lower")
-            print("  • Correct guess = Win 1x your bet")
-            print("  • Wrong guess = Lose your bet")
-            print("  • Equal numbers = You lose")
-            print("\nEnter 0 to return to main menu.")
-
-            bet = get_valid_bet(player.wallet)
+            self.console.print("\n╔═════════════════════════════════════╗")
+            self.console.print("║            HIGH-LOW GAME            ║")
+            self.console.print("╚═════════════════════════════════════╝")
+            self.console.print("\n📋 Rules:")
+            self.console.print("  • A number from 1-100 will be shown")
+            self.console.print("  • Guess if the next number is Higher or Lower")
+            self.console.print("  • Correct guess = Win 1x your bet")
+            self.console.print("  • Wrong guess = Lose your bet")
+            self.console.print("  • Equal numbers = You lose")
+            self.console.print("\nEnter 0 to return to main menu.")
+
+            bet = get_valid_bet(self.console, player.wallet)
             if bet == 0:
-                print("💼 Returning to menu...")
-                time.sleep(0.5)
-                return 0.0
+                self.console.print("💼 Returning to menu...")
+                self.console.sleep(0.5)
+                return 0
 
-            print(f"\n💰 Betting: {bet:.2f}")
-            time.sleep(0.5)
+            self.console.print(f"\n💰 Betting: {format_cents(bet)}")
+            self.console.sleep(0.5)
 
-            # Generate first number with time-based seed
-            random.seed(int(time.time() * 1000000))
-            num1 = random.randint(self.min_num, self.max_num)
+            num1 = self.draw_number()
 
             # Show first number with animation
             self._spinning_numbers(num1, "FIRST")
 
             # Show difficulty hint
             hint = self._get_difficulty_hint(num1)
-            print(hint)
-            print()
+            self.console.print(hint)
+            self.console.print()
 
             # Get player's guess with better prompts
-            print("─"*40)
-            print("Make your prediction:")
-            print("  [H] Higher - Next number will be > " + str(num1))
-            print("  [L] Lower  - Next number will be < " + str(num1))
-            print("─"*40)
+            self.console.print("─"*40)
+            self.console.print("Make your prediction:")
+            self.console.print("  [H] Higher - Next number will be > " + str(num1))
+            self.console.print("  [L] Lower  - Next number will be < " + str(num1))
+            self.console.print("─"*40)
 
-            guess = get_char("\n🎯 Your choice (h/l): ").lower().strip()
+            guess = self.console.read_char("\n🎯 Your choice (h/l): ").lower().strip()
             while guess not in ('h', 'l'):
-                guess = get_char("❌ Please enter 'h' or 'l': ").lower().strip()
+                guess = self.console.read_char("❌ Please enter 'h' or 'l': ").lower().strip()
 
             choice_name = 'HIGHER' if guess == 'h' else 'LOWER'
-            print(f"\n✅ You predicted: {choice_name}")
+            self.console.print(f"\n✅ You predicted: {choice_name}")
 
-            time.sleep(1)
+            self.console.sleep(1)
 
-            # Generate second number with new time-based seed
-            random.seed(int(time.time() * 1000000))
-            num2 = random.randint(self.min_num, self.max_num)
+            num2 = self.draw_number()
 
             # Dramatic pause
-            print("\n🎲 Drawing next number...")
-            time.sleep(0.8)
+            self.console.print("\n🎲 Drawing next number...")
+            self.console.sleep(0.8)
 
             # Show second number with animation
             self._spinning_numbers(num2, "SECOND")
@@ -875,35 +4819,34 @@ class HighLow(BaseGame):
             self._compare_visual(num1, num2, guess)
 
             # Determine result
-            print("="*40)
+            self.console.print("="*40)
 
             # Check for win/loss
-            won = False
+            net = self.settle(bet, guess, num1, num2)
             if num2 == num1:
-                print("😐 EQUAL NUMBERS 😐".center(40))
-                print("="*40)
-                print(f"\n🔄 Both numbers are {num1}!")
-                print(f"💸 You lost {bet:.2f} (House rule: Equal = Loss)")
-            elif (guess == 'h' and num2 > num1) or (guess == 'l' and num2 < num1):
-                won = True
-                print("🎉 YOU WIN! 🎉".center(40))
-                print("="*40)
-                print(f"\n✨ You guessed correctly!")
-                print(f"💰 You won {bet:.2f}!")
+                self.console.print("😐 EQUAL NUMBERS 😐".center(40))
+                self.console.print("="*40)
+                self.console.print(f"\n🔄 Both numbers are {num1}!")
+                self.console.print(f"💸 You lost {format_cents(bet)} (House rule: Equal = Loss)")
+            elif net > 0:
+                self.console.print("🎉 YOU WIN! 🎉".center(40))
+                self.console.print("="*40)
+                self.console.print(f"\n✨ You guessed correctly!")
+                self.console.print(f"💰 You won {format_cents(bet)}!")
 
                 # Victory animation
-                time.sleep(0.3)
-                print("\n" + "🎊 " * 10)
-                time.sleep(0.3)
+                self.console.sleep(0.3)
+                self.console.print("\n" + "🎊 " * 10)
+                self.console.sleep(0.3)
             else:
-                print("💀 YOU LOSE 💀".center(40))
-                print("="*40)
-                print(f"\n😔 Your guess was wrong...")
-                print(f"💸 You lost {bet:.2f}.")
+                self.console.print("💀 YOU LOSE 💀".center(40))
+                self.console.print("="*40)
+                self.console.print(f"\n😔 Your guess was wrong...")
+                self.console.print(f"💸 You lost {format_cents(bet)}.")
 
-            time.sleep(1)
+            self.console.sleep(1)
 
-            return bet if won else -bet
+            return net
 
 
 class CoinFlip(BaseGame):
@@ -922,19 +4865,23 @@ class CoinFlip(BaseGame):
     """
     name = "Coin Flip"
 
-    def __init__(self):
+    def __init__(self, console: Optional[Console] = None, seed: Optional[int] = None) -> None:
         """
         Initialize Coin Flip game.
 
         Input:
-            None
+            console (Optional[Console]): The game's console (default: TerminalConsole).
+            seed (Optional[int]): Session seed (default: a new random seed).
 
         Output:
             None
 
         Description:
-            Sets up coin symbols for animation and ASCII art representation of Heads/Tails faces.
+            Sets up coin symbols for animation and ASCII art representation of Heads/Tails faces,
+            and the buffer the flips come from.
         """
+        super().__init__(console, seed)
+        self._flips = OutcomeBuffer(self._flip_block)
         # Coin symbols for animation
         self.coin_frames = [
             "◯",  # Spinning
@@ -983,9 +4930,6 @@ class CoinFlip(BaseGame):
             # Progressive delay - starts fast, slows down
             delay = 0.03 + (i * 0.015)
 
-            # Add time-based randomization
-            random.seed(int(time.time() * 1000000) + i)
-
             # Cycle through coin frames
             frame = self.coin_frames[i % len(self.coin_frames)]
 
@@ -1004,16 +4948,16 @@ class CoinFlip(BaseGame):
         Description:
             Shows the final coin face using appropriate ASCII art and a brief pause for effect.
         """
-        print("\n" + "="*40)
-        print("🪙 COIN LANDED! 🪙".center(40))
-        print("="*40)
+        self.console.print("\n" + "="*40)
+        self.console.print("🪙 COIN LANDED! 🪙".center(40))
+        self.console.print("="*40)
 
         if result == 'h':
-            print(self.heads)
+            self.console.print(self.heads)
         else:
-            print(self.tails)
+            self.console.print(self.tails)
 
-        time.sleep(0.5)
+        self.console.sleep(0.5)
 
     def _spinning_effect(self) -> None:
         """
@@ -1029,20 +4973,61 @@ class CoinFlip(BaseGame):
             Displays animated coin flip with progressive slowdown effect
             using the _flip_animation generator for realistic physics simulation.
         """
-        print("\n" + "="*40)
-        print("🪙 FLIPPING COIN... 🪙".center(40))
-        print("="*40 + "\n")
+        self.console.print("\n" + "="*40)
+        self.console.print("🪙 FLIPPING COIN... 🪙".center(40))
+        self.console.print("="*40 + "\n")
 
         for (frame, delay) in self._flip_animation(frames=25):
             # Create spinning effect with multiple frames on one line
-            print(f"        {frame} {frame} {frame}        ",
+            self.console.print(f"        {frame} {frame} {frame}        ",
                   end="\r", flush=True)
-            time.sleep(delay)
+            self.console.sleep(delay)
+
+        self.console.print()  # newline after animation
+
+    def _flip_block(self, count: int) -> List[str]:
+        """
+        Generate a block of coin flips (runs in a prepare_service thread).
+
+        Input:
+            count (int): Flips to generate.
+
+        Output:
+            List[str]: 'h' or 't' each, from the outcome stream.
+        """
+        return self.rng.outcome.choices(('h', 't'), k=count)
+
+    def flip(self) -> str:
+        """
+        Flip the coin (outcome only, no animation).
+
+        Input:
+            None
+
+        Output:
+            str: 'h' for heads or 't' for tails.
 
-        print()  # newline after animation
+        Description:
+            Pops the next pre-generated flip (see OutcomeBuffer).
+        """
+        return self._flips.pop()
+
+    def settle(self, bet: int, guess: str, result: str) -> int:
+        """
+        Settle a Coin Flip round.
+
+        Input:
+            bet (int): Bet amount in cents.
+            guess (str): 'h' or 't'.
+            result (str): Flipped side.
+
+        Output:
+            int: Net change in cents (+bet if the guess matches, -bet otherwise).
+        """
+        return bet if guess == result else -bet
 
     @game_session("Coin Flip 🪙")
-    def play_round(self, player: Player) -> float:
+    def play_round(self, player: Player) -> int:
         """
         Play one round of Coin Flip with animation.
 
@@ -1050,52 +5035,51 @@ class CoinFlip(BaseGame):
             player (Player): The player object.
 
         Output:
-            float: Bet amount if win, negative bet if loss, 0 if cancelled.
+            int: Bet amount (cents) if win, negative bet if loss, 0 if cancelled.
 
         Description:
             Player chooses heads or tails, watches realistic coin flip animation,
             and wins if their choice matches the result.
         """
         while True:
-            print("\n╔══════════════════════════════════════╗")
-            print("║            COIN FLIP GAME            ║")
-            print("╚══════════════════════════════════════╝")
-            print("\n📋 Rules:")
-            print("  • Choose Heads (H) or Tails (T)")
-            print("  • Correct guess = Win 1x your bet")
-            print("  • Wrong guess = Lose your bet")
-            print("  • 50/50 chance!")
-            print("\nEnter 0 to return to main menu.")
-
-            bet = get_valid_bet(player.wallet)
+            self.console.print("\n╔══════════════════════════════════════╗")
+            self.console.print("║            COIN FLIP GAME            ║")
+            self.console.print("╚══════════════════════════════════════╝")
+            self.console.print("\n📋 Rules:")
+            self.console.print("  • Choose Heads (H) or Tails (T)")
+            self.console.print("  • Correct guess = Win 1x your bet")
+            self.console.print("  • Wrong guess = Lose your bet")
+            self.console.print("  • 50/50 chance!")
+            self.console.print("\nEnter 0 to return to main menu.")
+
+            bet = get_valid_bet(self.console, player.wallet)
             if bet == 0:
-                print("💼 Returning to menu...")
-                time.sleep(0.5)
-                return 0.0
+                self.console.print("💼 Returning to menu...")
+                self.console.sleep(0.5)
+                return 0
 
             # Get player's choice with better prompts
-            print("\n" + "─"*40)
-            print("Choose your side:")
-            print("  [H] Heads")
-            print("  [T] Tails")
-            print("─"*40)
+            self.console.print("\n" + "─"*40)
+            self.console.print("Choose your side:")
+            self.console.print("  [H] Heads")
+            self.console.print("  [T] Tails")
+            self.console.print("─"*40)
 
-            guess = get_char("\n🎯 Your choice (h/t): ").lower().strip()
+            guess = self.console.read_char("\n🎯 Your choice (h/t): ").lower().strip()
             while guess not in ('h', 't'):
-                guess = get_char("❌ Please enter 'h' or 't': ").lower().strip()
+                guess = self.console.read_char("❌ Please enter 'h' or 't': ").lower().strip()
 
             choice_name = 'HEADS' if guess == 'h' else 'TAILS'
-            print(f"\n✅ You chose: {choice_name}")
-            print(f"💰 Betting: {bet:.2f}")
+            self.console.print(f"\n✅ You chose: {choice_name}")
+            self.console.print(f"💰 Betting: {format_cents(bet)}")
 
-            time.sleep(0.8)
+            self.console.sleep(0.8)
 
             # Coin flip with animation
             self._spinning_effect()
 
-            # Determine result with time-based randomization
-            random.seed(int(time.time() * 1000000))
-            result = random.choice(['h', 't'])
+            # Determine result from the outcome stream
+            result = self.flip()
 
             # Show result
             self._display_result(result)
@@ -1103,32 +5087,33 @@ class CoinFlip(BaseGame):
             result_name = 'HEADS' if result == 'h' else 'TAILS'
 
             # Determine win/loss
-            print("\n" + "="*40)
-            if guess == result:
-                print("🎉 YOU WIN! 🎉".center(40))
-                print("="*40)
-                print(f"\n✨ The coin landed on {result_name}!")
-                print(f"💰 You won {bet:.2f}!")
+            net = self.settle(bet, guess, result)
+            self.console.print("\n" + "="*40)
+            if net > 0:
+                self.console.print("🎉 YOU WIN! 🎉".center(40))
+                self.console.print("="*40)
+                self.console.print(f"\n✨ The coin landed on {result_name}!")
+                self.console.print(f"💰 You won {format_cents(bet)}!")
 
                 # Victory animation
-                time.sleep(0.3)
-                print("\n" + "🎊 " * 10)
-                time.sleep(0.3)
+                self.console.sleep(0.3)
+                self.console.print("\n" + "🎊 " * 10)
+                self.console.sleep(0.3)
 
-                return bet
+                return net
             else:
-                print("💀 YOU LOSE 💀".center(40))
-                print("="*40)
-                print(f"\n😔 The coin landed on {result_name}...")
-                print(f"💸 You lost {bet:.2f}.")
+                self.console.print("💀 YOU LOSE 💀".center(40))
+                self.console.print("="*40)
+                self.console.print(f"\n😔 The coin landed on {result_name}...")
+                self.console.print(f"💸 You lost {format_cents(bet)}.")
 
-                time.sleep(0.5)
-                return -bet
+                self.console.sleep(0.5)
+                return net
 
 
 class Blackjack(BaseGame):
     """
-    Realistic Blackjack card game with standard 52-card deck.
+    Realistic Blackjack card game dealt from a shoe of standard 52-card decks.
 
     Input:
         None
@@ -1137,32 +5122,34 @@ class Blackjack(BaseGame):
         None
 
     Description:
-        Simulates real blackjack with 52-card deck. Player tries to get closer to 21 than dealer.
-        Supports multiple rounds in one session.
+        Simulates real blackjack with a shoe of BLACKJACK_DECKS decks (one by default). Player
+        tries to get closer to 21 than dealer. Supports multiple rounds in one session.
     """
     name = "Blackjack"
 
-    def __init__(self):
+    def __init__(self, console: Optional[Console] = None, seed: Optional[int] = None) -> None:
         """
         Initialize Blackjack game.
 
         Input:
-            None
+            console (Optional[Console]): The game's console (default: TerminalConsole).
+            seed (Optional[int]): Session seed (default: a new random seed).
 
         Output:
             None
 
         Description:
-            Sets up card suits and ranks for a standard 52-card deck. Initializes an empty deck list.
+            Sets up the shoe the cards are dealt from (its first shuffle starts in the
+            background right away). Cards are int codes, see CARD_VALUE and CARD_LABEL.
         """
-        self.suits = ['♠', '♥', '♦', '♣']
-        self.ranks = ['A', '2', '3', '4', '5', '6',
-                      '7', '8', '9', '10', 'J', 'Q', 'K']
-        self.deck = []
+        super().__init__(console, seed)
+        self.suits = CARD_SUITS
+        self.ranks = CARD_RANKS
+        self.shoe = Shoe(rng=self.rng.outcome)
 
     def _create_deck(self) -> None:
         """
-        Create a fresh 52-card deck and shuffle it.
+        Start dealing from a freshly shuffled shoe.
 
         Input:
             None
@@ -1171,96 +5158,76 @@ class Blackjack(BaseGame):
             None
 
         Description:
-            Creates a standard deck with 4 suits × 13 ranks = 52 cards, each represented as a tuple 
-            of (rank, suit). The deck is immediately shuffled.
+            The shuffle itself was done in the background (see Shoe.reshuffle).
         """
-        self.deck = [(rank, suit)
-                     for suit in self.suits for rank in self.ranks]
-        random.shuffle(self.deck)
+        self.shoe.reshuffle()
 
-    def _draw_card(self) -> Tuple[str, str]:
+    def _draw_card(self) -> int:
         """
-        Draw one card from the deck.
+        Draw one card from the shoe.
 
         Input:
             None
 
         Output:
-            Tuple[str, str]: (rank, suit) of the drawn card.
+            int: Code (0-51) of the drawn card.
 
         Description:
-            Removes and returns the top card from the deck. Creates a new deck if the current one is empty.
+            O(1) read at the shoe's cursor (see Shoe.draw).
         """
-        if len(self.deck) == 0:
-            self._create_deck()
-        return self.deck.pop()
+        return self.shoe.draw()
 
-    def _card_value(self, card: Tuple[str, str]) -> int:
+    def _card_value(self, card: int) -> int:
         """
         Get numeric value of a card.
 
         Input:
-            card (Tuple[str, str]): Card as (rank, suit).
+            card (int): Card code 0-51.
 
         Output:
             int: Card value (A=11, J/Q/K=10, others=face value).
 
         Description:
-            Returns the blackjack value of a card. Ace returns 11 initially. Face cards return 10.
+            Looks the value up in CARD_VALUE.
         """
-        rank = card[0]
-        if rank == 'A':
-            return 11
-        elif rank in ['J', 'Q', 'K']:
-            return 10
-        else:
-            return int(rank)
+        return CARD_VALUE[card]
 
-    def _format_card(self, card: Tuple[str, str]) -> str:
+    def _format_card(self, card: int) -> str:
         """
         Format card for display.
 
         Input:
-            card (Tuple[str, str]): Card as (rank, suit).
+            card (int): Card code 0-51.
 
         Output:
             str: Formatted card string (e.g., "A♠" or "10♥").
 
         Description:
-            Creates a visual representation of the card with rank and suit symbol.
+            Looks the label up in CARD_LABEL.
         """
-        return f"{card[0]}{card[1]}"
+        return CARD_LABEL[card]
 
-    def _hand_value(self, hand: List[Tuple[str, str]]) -> int:
+    def _hand_value(self, hand: Hand) -> int:
         """
         Calculate total value of a hand with Ace adjustment.
 
         Input:
-            hand (List[Tuple[str, str]]): List of cards.
+            hand (Hand): The hand.
 
         Output:
             int: Best possible hand value (not exceeding 21 if possible).
 
         Description:
-            Sums card values and adjusts Aces from 11 to 1 if the total exceeds 21 
-            (to prevent busting when possible).
+            O(1): the hand keeps its hard total and ace count as cards are added.
         """
-        total = sum(self._card_value(card) for card in hand)
-        aces = sum(1 for card in hand if card[0] == 'A')
+        return hand.value()
 
-        # Adjust Aces from 11 to 1 if busting
-        while total > 21 and aces > 0:
-            total -= 10
-            aces -= 1
-
-        return total
-
-    def _display_hand(self, hand: List[Tuple[str, str]], name: str = "Hand", hide_first: bool = False) -> None:
+    def _display_hand(self, hand: Hand, name: str = "Hand", hide_first: bool = False) -> None:
         """
         Display a hand of cards with visual formatting.
 
         Input:
-            hand (List[Tuple[str, str]]): List of cards.
+            hand (Hand): The hand.
             name (str): Name to display (default: "Hand").
             hide_first (bool): Whether to hide the first card (hole card) (default: False).
 
@@ -1273,20 +5240,20 @@ class Blackjack(BaseGame):
         """
         if hide_first and len(hand) > 0:
             cards_str = "🂠  " + "  ".join(self._format_card(card)
-                                          for card in hand[1:])
-            visible_value = sum(self._card_value(card) for card in hand[1:])
-            print(f"{name}: {cards_str} (Showing: {visible_value})")
+                                          for card in hand.cards[1:])
+            visible_value = sum(self._card_value(card) for card in hand.cards[1:])
+            self.console.print(f"{name}: {cards_str} (Showing: {visible_value})")
         else:
             cards_str = "  ".join(self._format_card(card) for card in hand)
             total = self._hand_value(hand)
-            print(f"{name}: {cards_str} (Total: {total})")
+            self.console.print(f"{name}: {cards_str} (Total: {total})")
 
-    def _deal_animation(self, card: Tuple[str, str], recipient: str) -> None:
+    def _deal_animation(self, card: int, recipient: str) -> None:
         """
         Animated card dealing effect.
 
         Input:
-            card (Tuple[str, str]): Card being dealt.
+            card (int): Card being dealt.
             recipient (str): Who receives the card ("Player" or "Dealer").
 
         Output:
@@ -1296,16 +5263,108 @@ class Blackjack(BaseGame):
             Shows a quick animation of a card being dealt with brief delays for visual effect.
         """
         symbols = ['🂠', '🃏', '🎴', '🂡']
-        for i in range(4):
-            random.seed(int(time.time() * 1000000) + i)
-            print(
-                f"Dealing to {recipient}... {random.choice(symbols)}", end="\r", flush=True)
-            time.sleep(0.1)
-        print(f"Dealt to {recipient}: {self._format_card(card)}    ")
-        time.sleep(0.3)
+        for _ in range(4):
+            self.console.print(
+                f"Dealing to {recipient}... {self.rng.cosmetic.choice(symbols)}", end="\r", flush=True)
+            self.console.sleep(0.1)
+        self.console.print(f"Dealt to {recipient}: {self._format_card(card)}    ")
+        self.console.sleep(0.3)
+
+    def _is_blackjack(self, hand: Hand) -> bool:
+        """
+        Check for a natural (21 with the first two cards).
+
+        Input:
+            hand (Hand): The hand.
+
+        Output:
+            bool: True for a natural blackjack.
+        """
+        return hand.is_blackjack()
+
+    def settle_naturals(self, bet: int, player_hand: Hand, dealer_hand: Hand) -> Optional[int]:
+        """
+        Settle a hand that ends on the deal.
+
+        Input:
+            bet (int): Bet amount in cents.
+            player_hand (Hand): Player's first two cards.
+            dealer_hand (Hand): Dealer's first two cards.
+
+        Output:
+            Optional[int]: Net change in cents (0 if both have blackjack, 3:2 for a player
+            blackjack, -bet for a dealer blackjack), or None if play continues.
+        """
+        player_blackjack = self._is_blackjack(player_hand)
+        dealer_blackjack = self._is_blackjack(dealer_hand)
+        if player_blackjack and dealer_blackjack:
+            return 0
+        if player_blackjack:
+            return bet * 3 // 2  # 3:2, odd half-cent rounded down
+        if dealer_blackjack:
+            return -bet
+        return None
+
+    def settle(self, bet: int, player_hand: Hand, dealer_hand: Hand) -> int:
+        """
+        Settle a hand after the player and the dealer have played.
+
+        Input:
+            bet (int): Bet amount in cents.
+            player_hand (Hand): Player's final hand.
+            dealer_hand (Hand): Dealer's final hand.
+
+        Output:
+            int: Net change in cents (-bet on a player bust, 0 on a push).
+        """
+        player_value = player_hand.value()
+        dealer_value = dealer_hand.value()
+        if player_hand.is_bust():
+            return -bet
+        if dealer_value > 21 or player_value > dealer_value:
+            return bet
+        if player_value == dealer_value:
+            return 0
+        return -bet
+
+    def play_hand(self, bet: int, decide) -> int:
+        """
+        Play one complete hand without any I/O (used by the simulator, tong_sim.py).
+
+        Input:
+            bet (int): Bet amount in cents.
+            decide (Callable[[Hand, int], str]): Player strategy; gets the player's hand and
+                the dealer's up card, returns 'h' or 's'.
+
+        Output:
+            int: Net change in cents.
+
+        Description:
+            Same rules and shoe handling as play_round: reshuffle at the cut card, deal
+            player/dealer/player/dealer, settle naturals, player decisions, dealer hits below 17.
+        """
+        if self.shoe.needs_shuffle():
+            self._create_deck()
+        player_hand = Hand()
+        dealer_hand = Hand()
+        player_hand.add(self._draw_card())
+        dealer_hand.add(self._draw_card())
+        player_hand.add(self._draw_card())
+        dealer_hand.add(self._draw_card())
+
+        net = self.settle_naturals(bet, player_hand, dealer_hand)
+        if net is not None:
+            return net
+        while not player_hand.is_bust() and decide(player_hand, dealer_hand[1]) == 'h':
+            player_hand.add(self._draw_card())
+        if player_hand.is_bust():
+            return -bet
+        while dealer_hand.value() < 17:
+            dealer_hand.add(self._draw_card())
+        return self.settle(bet, player_hand, dealer_hand)
 
     @game_session("Blackjack ♠♥♦♣")
-    def play_round(self, player: Player) -> float:
+    def play_round(self, player: Player) -> int:
         """
         Play Blackjack session with multiple rounds using real deck.
 
@@ -1313,110 +5372,106 @@ class Blackjack(BaseGame):
             player (Player): The player object.
 
         Output:
-            float: Total net change across all rounds in the session.
+            int: Total net change in cents across all rounds in the session.
 
         Description:
             Implements the main Blackjack game loop, including betting, card dealing, 
             player/dealer turns, Ace adjustment, and result calculation (Blackjack pays 3:2).
             Returns cumulative net change when the player decides to quit the session.
         """
-        total_change = 0.0
-        self._create_deck()  # Create initial deck
+        total_change = 0
+        self._create_deck()  # Fresh shoe for every session
 
         while True:
-            print("\n╔══════════════════════════════════════╗")
-            print("║           BLACKJACK TABLE           ║")
-            print("╚══════════════════════════════════════╝")
-            print("\n📋 Rules:")
-            print("  • Goal: Get closer to 21 than dealer")
-            print("  • Dealer hits on 16, stands on 17")
-            print("  • Blackjack (A + 10/J/Q/K) pays 3:2")
-            print("  • Aces count as 1 or 11")
-            print(f"\n💰 Session Balance: {player.wallet + total_change:.2f}")
-            print("\nEnter 0 to return to main menu.")
-
-            bet = get_valid_bet(player.wallet + total_change)
+            self.console.print("\n╔══════════════════════════════════════╗")
+            self.console.print("║           BLACKJACK TABLE           ║")
+            self.console.print("╚══════════════════════════════════════╝")
+            self.console.print("\n📋 Rules:")
+            self.console.print("  • Goal: Get closer to 21 than dealer")
+            self.console.print("  • Dealer hits on 16, stands on 17")
+            self.console.print("  • Blackjack (A + 10/J/Q/K) pays 3:2")
+            self.console.print("  • Aces count as 1 or 11")
+            self.console.print(f"\n💰 Session Balance: {format_cents(player.wallet + total_change)}")
+            self.console.print("\nEnter 0 to return to main menu.")
+
+            bet = get_valid_bet(self.console, player.wallet + total_change)
             if bet == 0:
-                print("💼 Cashing out from Blackjack table...")
-                time.sleep(0.5)
+                self.console.print("💼 Cashing out from Blackjack table...")
+                self.console.sleep(0.5)
                 return total_change
 
-            # Check if deck needs reshuffling
-            if len(self.deck) < 15:
-                print("\n🔄 Shuffling new deck...")
-                time.sleep(0.8)
+            # Cut card reached: switch to the shoe shuffled in the background
+            if self.shoe.needs_shuffle():
+                self.console.print("\n🔄 Shuffling new deck...")
+                self.console.sleep(0.8)
                 self._create_deck()
 
-            print("\n" + "="*40)
-            print("🎴 DEALING CARDS 🎴".center(40))
-            print("="*40 + "\n")
+            self.console.print("\n" + "="*40)
+            self.console.print("🎴 DEALING CARDS 🎴".center(40))
+            self.console.print("="*40 + "\n")
 
             # Initial deal - 2 cards each
-            player_hand = []
-            dealer_hand = []
+            player_hand = Hand()
+            dealer_hand = Hand()
 
             # Deal with animation
-            time.sleep(0.3)
+            self.console.sleep(0.3)
             card = self._draw_card()
             self._deal_animation(card, "Player")
-            player_hand.append(card)
+            player_hand.add(card)
 
             card = self._draw_card()
             self._deal_animation(card, "Dealer")
-            dealer_hand.append(card)
+            dealer_hand.add(card)
 
             card = self._draw_card()
             self._deal_animation(card, "Player")
-            player_hand.append(card)
+            player_hand.add(card)
 
             card = self._draw_card()
-            print("Dealing to Dealer... 🂠 (Face Down)")
-            dealer_hand.append(card)
-            time.sleep(0.5)
+            self.console.print("Dealing to Dealer... 🂠 (Face Down)")
+            dealer_hand.add(card)
+            self.console.sleep(0.5)
 
             # Display initial hands
-            print("\n" + "="*40)
+            self.console.print("\n" + "="*40)
             self._display_hand(dealer_hand, "Dealer", hide_first=True)
             self._display_hand(player_hand, "Your Hand")
-            print("="*40 + "\n")
-
-            player_value = self._hand_value(player_hand)
-            dealer_value = self._hand_value(dealer_hand)
+            self.console.print("="*40 + "\n")
 
             # Check for natural blackjack
-            player_blackjack = (player_value == 21 and len(player_hand) == 2)
-            dealer_blackjack = (dealer_value == 21 and len(dealer_hand) == 2)
+            net = self.settle_naturals(bet, player_hand, dealer_hand)
+            player_blackjack = self._is_blackjack(player_hand)
 
-            if player_blackjack and dealer_blackjack:
-                print("🤝 Both have Blackjack! Push!")
+            if net == 0:
+                self.console.print("🤝 Both have Blackjack! Push!")
                 self._display_hand(dealer_hand, "Dealer's Hand")
-                time.sleep(1)
+                self.console.sleep(1)
                 continue
 
-            if player_blackjack:
-                win = bet * 1.5
-                print("🎉 BLACKJACK! You win " + f"{win:.2f}! 🎉")
-                print("💎 Paid 3:2 💎")
-                total_change += win
-                time.sleep(1.5)
+            if net is not None and player_blackjack:
+                self.console.print("🎉 BLACKJACK! You win " + f"{format_cents(net)}! 🎉")
+                self.console.print("💎 Paid 3:2 💎")
+                total_change += net
+                self.console.sleep(1.5)
 
-                print(f"\n💰 Session net: {total_change:+.2f}")
+                self.console.print(f"\n💰 Session net: {format_cents(total_change, sign=True)}")
 
-                cont = get_char(
+                cont = self.console.read_char(
                     "\n♠ Play another hand? (y/n): ").lower().strip()
                 if cont != 'y':
                     return total_change
                 continue
 
-            if dealer_blackjack:
-                print("💀 Dealer has Blackjack! You lose.")
+            if net is not None:
+                self.console.print("💀 Dealer has Blackjack! You lose.")
                 self._display_hand(dealer_hand, "Dealer's Hand")
-                total_change -= bet
-                time.sleep(1.5)
+                total_change += net
+                self.console.sleep(1.5)
 
-                print(f"\n💰 Session net: {total_change:+.2f}")
+                self.console.print(f"\n💰 Session net: {format_cents(total_change, sign=True)}")
 
-                cont = get_char(
+                cont = self.console.read_char(
                     "\n♠ Play another hand? (y/n): ").lower().strip()
                 if cont != 'y':
                     return total_change
@@ -1425,104 +5480,104 @@ class Blackjack(BaseGame):
             # Player's turn
             busted = False
             while True:
-                player_value = self._hand_value(player_hand)
+                player_value = player_hand.value()
 
-                if player_value > 21:
-                    print("\n💀 BUST! You went over 21!")
+                if player_hand.is_bust():
+                    self.console.print("\n💀 BUST! You went over 21!")
                     total_change -= bet
                     busted = True
-                    time.sleep(1)
+                    self.console.sleep(1)
                     break
 
-                move = get_char("\n🎯 (H)it or (S)tand? ").lower().strip()
+                move = self.console.read_char("\n🎯 (H)it or (S)tand? ").lower().strip()
                 while move not in ('h', 's'):
-                    move = get_char(
+                    move = self.console.read_char(
                         "Please enter 'h' or 's': ").lower().strip()
 
                 if move == 'h':
                     card = self._draw_card()
-                    print(f"\n🎴 You drew: {self._format_card(card)}")
-                    player_hand.append(card)
-                    time.sleep(0.5)
+                    self.console.print(f"\n🎴 You drew: {self._format_card(card)}")
+                    player_hand.add(card)
+                    self.console.sleep(0.5)
                     self._display_hand(player_hand, "Your Hand")
                 else:
-                    print(f"\n✋ You stand with {player_value}")
-                    time.sleep(0.8)
+                    self.console.print(f"\n✋ You stand with {player_value}")
+                    self.console.sleep(0.8)
                     break
 
             if busted:
-                print(f"\n💸 Lost: {bet:.2f}")
-                print(f"💰 Session net: {total_change:+.2f}")
+                self.console.print(f"\n💸 Lost: {format_cents(bet)}")
+                self.console.print(f"💰 Session net: {format_cents(total_change, sign=True)}")
 
-                cont = get_char(
+                cont = self.console.read_char(
                     "\n♠ Play another hand? (y/n): ").lower().strip()
                 if cont != 'y':
                     return total_change
                 continue
 
             # Dealer's turn
-            print("\n" + "="*40)
-            print("🎴 DEALER'S TURN 🎴".center(40))
-            print("="*40 + "\n")
+            self.console.print("\n" + "="*40)
+            self.console.print("🎴 DEALER'S TURN 🎴".center(40))
+            self.console.print("="*40 + "\n")
 
-            time.sleep(0.8)
-            print("Revealing dealer's hole card...")
-            time.sleep(0.8)
+            self.console.sleep(0.8)
+            self.console.print("Revealing dealer's hole card...")
+            self.console.sleep(0.8)
             self._display_hand(dealer_hand, "Dealer's Hand")
-            time.sleep(1)
+            self.console.sleep(1)
 
             # Dealer hits on 16 or less
-            while self._hand_value(dealer_hand) < 17:
-                print("\nDealer hits...")
-                time.sleep(0.8)
+            while dealer_hand.value() < 17:
+                self.console.print("\nDealer hits...")
+                self.console.sleep(0.8)
                 card = self._draw_card()
-                dealer_hand.append(card)
-                print(f"🎴 Dealer drew: {self._format_card(card)}")
-                time.sleep(0.5)
+                dealer_hand.add(card)
+                self.console.print(f"🎴 Dealer drew: {self._format_card(card)}")
+                self.console.sleep(0.5)
                 self._display_hand(dealer_hand, "Dealer's Hand")
-                time.sleep(0.8)
+                self.console.sleep(0.8)
 
-            dealer_value = self._hand_value(dealer_hand)
+            dealer_value = dealer_hand.value()
 
             if dealer_value > 21:
-                print("\n💥 Dealer BUSTS!")
-                time.sleep(0.5)
+                self.console.print("\n💥 Dealer BUSTS!")
+                self.console.sleep(0.5)
 
             # Final comparison
-            print("\n" + "="*40)
-            print("🏁 FINAL RESULT 🏁".center(40))
-            print("="*40 + "\n")
+            self.console.print("\n" + "="*40)
+            self.console.print("🏁 FINAL RESULT 🏁".center(40))
+            self.console.print("="*40 + "\n")
 
             self._display_hand(dealer_hand, "Dealer")
             self._display_hand(player_hand, "You")
-            print()
+            self.console.print()
 
-            player_value = self._hand_value(player_hand)
-            dealer_value = self._hand_value(dealer_hand)
+            net = self.settle(bet, player_hand, dealer_hand)
 
             if dealer_value > 21:
-                print(f"🎉 Dealer busts! You win {bet:.2f}! 🎉")
-                total_change += bet
-            elif player_value > dealer_value:
-                print(f"🎊 You win {bet:.2f}! 🎊")
-                total_change += bet
-            elif player_value == dealer_value:
-                print("🤝 Push! Bet returned.")
+                self.console.print(f"🎉 Dealer busts! You win {format_cents(bet)}! 🎉")
+            elif net > 0:
+                self.console.print(f"🎊 You win {format_cents(bet)}! 🎊")
+            elif net == 0:
+                self.console.print("🤝 Push! Bet returned.")
             else:
-                print(f"💀 Dealer wins. You lose {bet:.2f}.")
-                total_change -= bet
+                self.console.print(f"💀 Dealer wins. You lose {format_cents(bet)}.")
+            total_change += net
 
-            time.sleep(1)
-            print(f"\n💵 Bet: {bet:.2f}")
-            print(f"💰 Session net: {total_change:+.2f}")
+            self.console.sleep(1)
+            self.console.print(f"\n💵 Bet: {format_cents(bet)}")
+            self.console.print(f"💰 Session net: {format_cents(total_change, sign=True)}")
 
-            cont = get_char("\n♠ Play another hand? (y/n): ").lower().strip()
+            cont = self.console.read_char("\n♠ Play another hand? (y/n): ").lower().strip()
             if cont != 'y':
-                print("\n💼 Leaving Blackjack table...")
-                time.sleep(0.5)
+                self.console.print("\n💼 Leaving Blackjack table...")
+                self.console.sleep(0.5)
                 return total_change
 
 
+SLOTS_SPECIAL = 'ʕっ•ᴥ•ʔっ'  # the rare bear symbol
+
+
 class Slots(BaseGame):
     """
     Emoji-themed slot machine game.
@@ -1539,12 +5594,13 @@ class Slots(BaseGame):
     """
     name = "Cute Slots"
 
-    def __init__(self) -> None:
+    def __init__(self, console: Optional[Console] = None, seed: Optional[int] = None) -> None:
         """
         Initialize Slots game with symbols and their weights.
 
         Input:
-            None
+            console (Optional[Console]): The game's console (default: TerminalConsole).
+            seed (Optional[int]): Session seed (default: a new random seed).
 
         Output:
             None
@@ -1553,8 +5609,9 @@ class Slots(BaseGame):
             Sets up symbols list and probability weights. Special symbol (bear) has
             much lower probability (5%) compared to other symbols (23.75% each).
         """
+        super().__init__(console, seed)
         self.symbols = [
-            'ʕっ•ᴥ•ʔっ',   # Special - rare (5% chance)
+            SLOTS_SPECIAL,   # Special - rare (5% chance)
             ' (⇀‸↼‶)  ',  # Common (23.75% each)
             ' (・3・) ',
             ' (︶︹︶)',
@@ -1568,21 +5625,52 @@ class Slots(BaseGame):
             2: 25,   # 2 specials = big win
             1: 5     # 1 special = small win
         }
+        self._spins = OutcomeBuffer(self._spin_block,
+                                    key=lambda: (tuple(self.symbols), tuple(self.weights)))
+
+    def _weighted_choices(self, count: int) -> List[str]:
+        """
+        Choose random symbols based on weighted probabilities.
+
+        Input:
+            count (int): Number of symbols.
+
+        Output:
+            List[str]: Selected emoji symbols.
+
+        Description:
+            Uses choices with weights (on the outcome stream) to make special symbol appear less frequently.
+        """
+        return self.rng.outcome.choices(self.symbols, weights=self.weights, k=count)
 
-    def _weighted_choice(self) -> str:
+    def _spin_block(self, count: int) -> List[Tuple[str, str, str]]:
         """
-        Choose a random symbol based on weighted probabilities.
+        Generate a block of spins (runs in a prepare_service thread).
+
+        Input:
+            count (int): Spins to generate.
+
+        Output:
+            List[Tuple[str, str, str]]: Reel 1, 2 and 3 symbols of each spin.
+        """
+        reels = self._weighted_choices(3 * count)
+        return list(zip(reels[0::3], reels[1::3], reels[2::3]))
+
+    def spin(self) -> Tuple[str, str, str]:
+        """
+        Spin the three reels (outcome only, no animation).
 
         Input:
             None
 
         Output:
-            str: Selected emoji symbol.
+            Tuple[str, str, str]: Final symbols of reel 1, 2 and 3.
 
         Description:
-            Uses random.choices with weights to make special symbol appear less frequently.
+            Pops the next pre-generated spin (see OutcomeBuffer). Changing symbols or
+            weights drops spins generated with the old ones.
         """
-        return random.choices(self.symbols, weights=self.weights, k=1)[0]
+        return self._spins.pop()
 
     def _spin_generator(self, frames: int = 15) -> Generator[Tuple[str, str, str, float], None, None]:
         """
@@ -1596,23 +5684,20 @@ class Slots(BaseGame):
 
         Description:
             Creates realistic spinning effect with variable delays that slow down
-            over time. Uses time-based randomization for more realistic feel.
-            Uses weighted choice for final symbols.
+            over time. Frames come from the cosmetic stream; the final symbols are
+            drawn separately with the weighted choice.
         """
         for i in range(frames):
             # Progressive delay - starts fast, slows down
             delay = 0.05 + (i * 0.02)
 
-            # Add time-based seed variation for more randomness
-            random.seed(int(time.time() * 1000000) + i)
-
-            r1 = random.choice(self.symbols)
-            r2 = random.choice(self.symbols)
-            r3 = random.choice(self.symbols)
+            r1 = self.rng.cosmetic.choice(self.symbols)
+            r2 = self.rng.cosmetic.choice(self.symbols)
+            r3 = self.rng.cosmetic.choice(self.symbols)
 
             yield (r1, r2, r3, delay)
 
-    def _calculate_win(self, r1: str, r2: str, r3: str, bet: float) -> Tuple[float, str, int]:
+    def _calculate_win(self, r1: str, r2: str, r3: str, bet: int) -> Tuple[int, str, int]:
         """
         Calculate winnings based on special symbol count.
 
@@ -1620,43 +5705,54 @@ class Slots(BaseGame):
             r1 (str): First reel symbol.
             r2 (str): Second reel symbol.
             r3 (str): Third reel symbol.
-            bet (float): Bet amount.
+            bet (int): Bet amount in cents.
 
         Output:
-            Tuple[float, str, int]: (win_amount, message, special_count).
+            Tuple[int, str, int]: (win_amount in cents, message, special_count).
 
         Description:
             Counts special symbols (bear emoji) and returns appropriate winnings and message 
             based on fixed multipliers. Checks for triple match of regular symbols as a minor win.
         """
-        special = 'ʕっ•ᴥ•ʔっ'
-        special_count = [r1, r2, r3].count(special)
+        win, special_count = self.settle(r1, r2, r3, bet)
 
         if special_count == 3:
-            multiplier = self.multipliers[3]
-            win = bet * multiplier
-            return win, f"💎 MEGA JACKPOT! 3 Specials x{multiplier} => Won {win:.2f}! 💎", 3
-
+            return win, f"💎 MEGA JACKPOT! 3 Specials x{self.multipliers[3]} => Won {format_cents(win)}! 💎", 3
         elif special_count == 2:
-            multiplier = self.multipliers[2]
-            win = bet * multiplier
-            return win, f"✨ BIG WIN! 2 Specials x{multiplier} => Won {win:.2f}! ✨", 2
-
+            return win, f"✨ BIG WIN! 2 Specials x{self.multipliers[2]} => Won {format_cents(win)}! ✨", 2
         elif special_count == 1:
-            multiplier = self.multipliers[1]
-            win = bet * multiplier
-            return win, f"🌟 Lucky! 1 Special x{multiplier} => Won {win:.2f}!", 1
-
+            return win, f"🌟 Lucky! 1 Special x{self.multipliers[1]} => Won {format_cents(win)}!", 1
+        elif win > 0:
+            return win, f"🎊 Triple Match! x2 => Won {format_cents(win)}!", 0
         else:
-            # Check for three matching regular symbols
-            if r1 == r2 == r3:
-                win = bet * 2
-                return win, f"🎊 Triple Match! x2 => Won {win:.2f}!", 0
-            else:
-                return -bet, "😢 No win this spin.", 0
+            return -bet, "😢 No win this spin.", 0
+
+    def settle(self, r1: str, r2: str, r3: str, bet: int) -> Tuple[int, int]:
+        """
+        Settle a spin (no message formatting; shared with the simulator, tong_sim.py).
+
+        Input:
+            r1 (str): First reel symbol.
+            r2 (str): Second reel symbol.
+            r3 (str): Third reel symbol.
+            bet (int): Bet amount in cents.
+
+        Output:
+            Tuple[int, int]: (net change in cents, special_count).
+
+        Description:
+            Specials pay bet x multipliers[count]; otherwise three matching regular symbols pay
+            x2 and anything else loses the bet.
+        """
+        special_count = (r1 == SLOTS_SPECIAL) + (r2 == SLOTS_SPECIAL) + (r3 == SLOTS_SPECIAL)
+        if special_count:
+            return bet * self.multipliers[special_count], special_count
+        if r1 == r2 == r3:
+            return bet * 2, 0
+        return -bet, 0
 
     @game_session("Cute Emoji Slots")
-    def play_round(self, player: Player) -> float:
+    def play_round(self, player: Player) -> int:
         """
         Play one round of enhanced Slots.
 
@@ -1664,172 +5760,355 @@ class Slots(BaseGame):
             player (Player): The player object.
 
         Output:
-            float: Winnings (positive) or loss (negative), 0 if cancelled.
+            int: Winnings (positive) or loss (negative) in cents, 0 if cancelled.
 
         Description:
             Implements the main slot machine game loop, including betting, 
             animated spinning using the _spin_generator, result calculation, and visual feedback.
         """
-        total_change = 0.0
+        total_change = 0
 
         while True:
-            print("\n╔═════════════════════════════════════╗")
-            print("║          CUTE EMOJI SLOTS           ║")
-            print("╚═════════════════════════════════════╝")
-            print("\n💰 Prize Table:")
-            print("  3x ʕっ•ᴥ•ʔっ  = x100 (MEGA JACKPOT!)")
-            print("  2x ʕっ•ᴥ•ʔっ  = x25  (BIG WIN!)")
-            print("  1x ʕっ•ᴥ•ʔっ  = x5   (Lucky!)")
-            print("  3x Same   = x2   (Triple Match)")
-            print("\nʕっ•ᴥ•ʔっ is RARE - Good luck!\n")
-            print(f"💰 Session Balance: {player.wallet + total_change:.2f}\n")
-            print("Enter 0 to return to main menu.")
-
-            bet = get_valid_bet(player.wallet + total_change)
+            self.console.print("\n╔═════════════════════════════════════╗")
+            self.console.print("║          CUTE EMOJI SLOTS           ║")
+            self.console.print("╚═════════════════════════════════════╝")
+            self.console.print("\n💰 Prize Table:")
+            self.console.print("  3x ʕっ•ᴥ•ʔっ  = x100 (MEGA JACKPOT!)")
+            self.console.print("  2x ʕっ•ᴥ•ʔっ  = x25  (BIG WIN!)")
+            self.console.print("  1x ʕっ•ᴥ•ʔっ  = x5   (Lucky!)")
+            self.console.print("  3x Same   = x2   (Triple Match)")
+            self.console.print("\nʕっ•ᴥ•ʔっ is RARE - Good luck!\n")
+            self.console.print(f"💰 Session Balance: {format_cents(player.wallet + total_change)}\n")
+            self.console.print("Enter 0 to return to main menu.")
+
+            bet = get_valid_bet(self.console, player.wallet + total_change)
             if bet == 0:
-                print("💼 Cashing out from Cute emoji slots...")
-                time.sleep(0.5)
+                self.console.print("💼 Cashing out from Cute emoji slots...")
+                self.console.sleep(0.5)
                 return total_change
 
             # Enhanced spinning animation with visual effects
-            print("\n" + "="*40)
-            print("🎰 SPINNING... 🎰".center(40))
-            print("="*40 + "\n")
+            self.console.print("\n" + "="*40)
+            self.console.print("🎰 SPINNING... 🎰".center(40))
+            self.console.print("="*40 + "\n")
 
             # Show spinning animation with progressive slowdown
             for (r1, r2, r3, delay) in self._spin_generator(frames=20):
-                print(f"║ {r1} ║ {r2} ║ {r3} ║", end="\r", flush=True)
-                time.sleep(delay)
+                self.console.print(f"║ {r1} ║ {r2} ║ {r3} ║", end="\r", flush=True)
+                self.console.sleep(delay)
 
-            print()  # newline after animation
+            self.console.print()  # newline after animation
 
             # Final result using weighted selection
-            r1 = self._weighted_choice()
-            r2 = self._weighted_choice()
-            r3 = self._weighted_choice()
+            r1, r2, r3 = self.spin()
 
             # Display final result with visual emphasis
-            print("\n" + "="*40)
-            print("🎯 FINAL RESULT 🎯".center(40))
-            print("="*40)
-            print(f"\n    ║ {r1} ║ {r2} ║ {r3} ║\n")
-            print("="*40 + "\n")
+            self.console.print("\n" + "="*40)
+            self.console.print("🎯 FINAL RESULT 🎯".center(40))
+            self.console.print("="*40)
+            self.console.print(f"\n    ║ {r1} ║ {r2} ║ {r3} ║\n")
+            self.console.print("="*40 + "\n")
 
             # Calculate and display winnings
             win, message, special_count = self._calculate_win(r1, r2, r3, bet)
 
             # Show result with appropriate animation
             if win > 0:
-                print(message)
+                self.console.print(message)
                 if special_count >= 2:
                     # Extra celebration for big wins
-                    time.sleep(0.3)
-                    print("\n" + "🎉" * 20)
-                    time.sleep(0.3)
+                    self.console.sleep(0.3)
+                    self.console.print("\n" + "🎉" * 20)
+                    self.console.sleep(0.3)
             else:
-                print(message)
+                self.console.print(message)
 
             # Show statistics
-            print(f"\n💵 Bet: {bet:.2f}")
+            self.console.print(f"\n💵 Bet: {format_cents(bet)}")
             if win > 0:
-                print(f"💰 Won: {win:.2f}")
+                self.console.print(f"💰 Won: {format_cents(win)}")
             else:
-                print(f"💸 Lost: {abs(win):.2f}")
+                self.console.print(f"💸 Lost: {format_cents(abs(win))}")
 
             total_change += win
 
-            print(f"\n💰 Session net: {total_change:+.2f}")
+            self.console.print(f"\n💰 Session net: {format_cents(total_change, sign=True)}")
 
-            cont = get_char("\n♠ Spin more? (y/n): ").lower().strip()
+            cont = self.console.read_char("\n♠ Spin more? (y/n): ").lower().strip()
             if cont != 'y':
-                print("\n💼 Leaving Emoji Slots...")
-                time.sleep(0.5)
+                self.console.print("\n💼 Leaving Emoji Slots...")
+                self.console.sleep(0.5)
                 return total_change
 
 
 # ------------------------
 # Login / Register System
 # ------------------------
-def login_or_register_loop() -> "Player":
+def claim_player(console: Console, username: str) -> Optional["Player"]:
     """
-    Handle user login or registration.
+    Claim a username for this session and load its current state.
+
+    Input:
+        console (Console): The session's console.
+        username (str): Player's username.
+
+    Output:
+        Optional[Player]: The player, or None if it is logged in elsewhere or not found.
+
+    Description:
+        The player is loaded after the claim, so it includes everything a previous
+        session of the same account wrote or queued. Prints why the login was refused.
+    """
+    if not active_sessions.claim(username):
+        console.print("⚠️ This account is already logged in on another session.")
+        console.sleep(1)
+        return None
+    p = Player.load(username)
+    if p is None:
+        active_sessions.release(username)
+        console.print("❌ User not found.")
+        console.sleep(1)
+    return p
+
+
+def show_session_token(console: Console, token: str) -> None:
+    """
+    Show a network client its session token.
 
     Input:
+        console (Console): The session's console.
+        token (str): Token from session_tokens.issue().
+
+    Output:
         None
 
+    Description:
+        A client that reconnects within SESSION_TTL can type the token at the password
+        prompt instead of the password. The local terminal never shows tokens.
+    """
+    if not console.local:
+        console.print(f"🔑 Session token (valid {SESSION_TTL / 60:.0f} min, use it instead of the password "
+                      f"to reconnect):\n{token}")
+
+
+def login_or_register_loop(console: Console, tokens: Optional[Dict[str, str]] = None,
+                           source: str = "terminal") -> Optional["Player"]:
+    """
+    Handle user login or registration.
+
+    Input:
+        console (Console): The session's console.
+        tokens (Optional[Dict[str, str]]): Session tokens issued to this session, by username.
+            Filled in on login / registration so the caller can revoke them.
+        source (str): Where the session comes from, for login throttling (default: "terminal").
+
     Output:
-        Player: A logged-in Player instance.
+        Optional[Player]: A logged-in Player instance, or None if the user chose to exit.
 
     Description:
         Displays login menu and handles user authentication (login) or new account creation (register).
-        Loops until user successfully logs in, registers, or chooses to exit the program.
+        Loops until user successfully logs in, registers, or chooses to exit.
+        Usernames that do not match USERNAME_RE are refused before any store lookup.
+        A session is only resumed when the user explicitly types a session token at the password
+        prompt (a client reconnecting after a dropped connection), which costs an HMAC check
+        instead of a bcrypt password check; nothing is resumed automatically, so the next person
+        at a shared terminal always has to authenticate. Password checks and
+        registrations are rate limited per username and source (login_throttle) before any
+        bcrypt work is done. The returned player's username is claimed in active_sessions;
+        the caller releases it when the player logs out.
     """
+    if tokens is None:
+        tokens = {}
     while True:
-        clear_screen()
-        print(tong_777_pic)
-        print(login_pic)
-        choice = get_char("Choose: ").strip()
+        console.screen(tong_777_pic, login_pic)
+        choice = console.read_char("Choose: ").strip()
         if choice == '1':
-            clear_screen()
-            print(tong_777_pic)
-            print(login_pic)
-            username = input("Username: ").strip()
+            console.screen(tong_777_pic, login_pic)
+            username = console.read_line("Username: ").strip()
             if username == "":
-                print("Username cannot be empty.")
-                time.sleep(1)
+                console.print("Username cannot be empty.")
+                console.sleep(1)
+                continue
+            if not valid_username(username):
+                console.print("❌ User not found.")
+                console.sleep(1)
                 continue
             p = Player.load(username)
             if p is None:
-                print("❌ User not found.")
-                time.sleep(1)
+                console.print("❌ User not found.")
+                console.sleep(1)
+                continue
+            pw = console.read_line("Password: ").strip()
+            if session_tokens.verify(pw, username):
+                p = claim_player(console, username)
+                if p is None:
+                    continue
+                tokens[username] = pw
+                console.print(f"🔑 Session resumed. Welcome back, {username}!")
+                console.sleep(1)
+                return p
+            wait = login_throttle.check(username, source)
+            if wait > 0:
+                console.print(f"⏳ Too many login attempts. Try again in {wait:.0f} seconds.")
+                console.sleep(1)
+                continue
+            p = claim_player(console, username)
+            if p is None:
                 continue
-            pw = input("Password: ").strip()
             if p.check_password(pw):
-                print(f"✅ Welcome back, {username}!")
-                time.sleep(1)
+                tokens[username] = session_tokens.issue(username)
+                console.print(f"✅ Welcome back, {username}!")
+                show_session_token(console, tokens[username])
+                console.sleep(1)
                 return p
             else:
-                print("❌ Incorrect password.")
-                time.sleep(1)
+                active_sessions.release(username)
+                console.print("❌ Incorrect password.")
+                console.sleep(1)
                 continue
 
         elif choice == '2':
-            clear_screen()
-            print(tong_777_pic)
-            print(login_pic)
-            username = input("Choose username: ").strip()
+            console.screen(tong_777_pic, login_pic)
+            username = console.read_line("Choose username: ").strip()
             if username == "":
-                print("Username cannot be empty.")
-                time.sleep(1)
+                console.print("Username cannot be empty.")
+                console.sleep(1)
+                continue
+            if not valid_username(username):
+                console.print(f"❌ Username must be {USERNAME_RULES}.")
+                console.sleep(1)
                 continue
-            if Player.load(username) is not None:
-                print("⚠️ Username already exists.")
-                time.sleep(1)
+            if get_username_index().exists(username):
+                console.print("⚠️ Username already exists.")
+                console.sleep(1)
                 continue
-            pw = input("Set password: ").strip()
+            pw = console.read_line("Set password: ").strip()
             while pw == "":
-                pw = input("Password cannot be empty. Set password: ").strip()
-            p = Player.create_new(
-                username=username, password_plain=pw, starting_wallet=100.0)
-            print(
+                pw = console.read_line("Password cannot be empty. Set password: ").strip()
+            wait = login_throttle.check(username, source)
+            if wait > 0:
+                console.print(f"⏳ Too many attempts. Try again in {wait:.0f} seconds.")
+                console.sleep(1)
+                continue
+            try:
+                p = Player.create_new(
+                    username=username, password_plain=pw, starting_wallet=10000)
+            except FileExistsError:
+                console.print("⚠️ Username already exists.")
+                console.sleep(1)
+                continue
+            if not active_sessions.claim(username):
+                console.print("⚠️ This account is already logged in on another session.")
+                console.sleep(1)
+                continue
+            tokens[username] = session_tokens.issue(username)
+            console.print(
                 f"✅ Account '{username}' created. Bonus 100.00 credits added.")
-            time.sleep(1)
+            show_session_token(console, tokens[username])
+            console.sleep(1)
             return p
 
         elif choice == '3':
-            clear_screen()
-            print(tong_777_pic)
-            print(login_pic)
-            print("Goodbye.")
-            sys.exit(0)
+            console.screen(tong_777_pic, login_pic, "Goodbye.")
+            return None
         else:
-            print("Please choose 1-3.")
-            time.sleep(1)
+            console.print("Please choose 1-3.")
+            console.sleep(1)
 
 
 # ------------------------
 # Main menu
 # ------------------------
+def player_menu(console: Console, player: "Player", games: Dict[str, BaseGame]) -> bool:
+    """
+    Show the main menu for a logged-in player until they log out or exit.
+
+    Input:
+        console (Console): The session's console.
+        player (Player): The logged-in player.
+        games (Dict[str, BaseGame]): Games by menu key ("1"-"4").
+
+    Output:
+        bool: True on logout (back to login), False on exit.
+
+    Description:
+        Processes all game and financial choices.
+    """
+    while True:
+        console.screen(tong_777_pic,
+                       f"Player: {player.username} | Balance: {format_cents(player.wallet)}\n",
+                       menu_pic)
+        choice = console.read_char("Select option (1-8): ").strip()
+        if choice in ("1", "2", "3", "4"):
+            game = games[choice]
+            # decorator handles wallet update and save
+            game.play_round(player)
+        elif choice == "5":
+            player.deposit_interactive(console)
+        elif choice == "6":
+            player.withdraw_interactive(console)
+        elif choice == "7":
+            console.print("Logging out...")
+            write_behind.flush()
+            console.sleep(0.7)
+            return True  # back to login/register loop
+        elif choice == "8":
+            console.print("Saving and exiting...")
+            write_behind.submit(player)
+            write_behind.flush()
+            console.sleep(0.8)
+            return False
+        else:
+            console.print("Please select 1-8 only.")
+            console.sleep(1)
+
+
+def run_session(console: Console, source: str = "terminal") -> None:
+    """
+    Run one user session: login/register and the main menu, until the user exits.
+
+    Input:
+        console (Console): The session's console (terminal or network client).
+        source (str): Where the session comes from, for login throttling (default: "terminal").
+
+    Output:
+        None
+
+    Description:
+        Used by main() for the local terminal and by the TCP server for every client. Each
+        session gets its own game instances on its console, with random streams derived from
+        one session seed (see new_session_seed for replay). A player's session token is revoked on
+        logout and exit; it stays valid after a disconnect, so the client can reconnect with it.
+        On logout, exit or disconnect the write-behind queue is flushed and the player's username is
+        released from active_sessions.
+    """
+    seed = new_session_seed(source)
+    games = {
+        "1": HighLow(console, seed),
+        "2": CoinFlip(console, seed),
+        "3": Blackjack(console, seed),
+        "4": Slots(console, seed)
+    }
+    tokens: Dict[str, str] = {}  # session tokens issued in this session, by username
+    while True:
+        player = login_or_register_loop(console, tokens, source)
+        if player is None:
+            break
+        try:
+            logged_out = player_menu(console, player, games)
+        finally:
+            write_behind.submit(player)  # picks up a re-hashed password even if the wallet is unchanged
+            write_behind.flush()  # also when the client disconnected mid-menu
+            active_sessions.release(player.username)
+        token = tokens.pop(player.username, None)
+        if token is not None:
+            session_tokens.revoke(token)  # logged out: the next login needs the password again
+        if not logged_out:
+            break
+    for token in tokens.values():
+        session_tokens.revoke(token)
+
+
 def main() -> None:
     """
     Main program entry point.
@@ -1841,50 +6120,411 @@ def main() -> None:
         None
 
     Description:
-        Initializes the system, shows the loading screen, and enters the main game loop. 
-        Manages the user session by handling login/register, menu display, and processing 
-        all game and financial choices.
+        Initializes the system (builds the username index, calibrates the bcrypt cost), shows the loading screen,
+        and runs the terminal session. On exit, finishes pending rehashes and closes storage.
     """
+    get_username_index()
+    auth_service.calibrate()
     loading_screen()
+    run_session(TerminalConsole())
+    auth_service.close()  # finishes pending rehashes before storage closes
+    prepare_service.close()
+    close_storage()
+    sys.exit(0)
 
-    games = {
-        "1": HighLow(),
-        "2": CoinFlip(),
-        "3": Blackjack(),
-        "4": Slots()
-    }
 
-    while True:
-        player = login_or_register_loop()
-        # main menu loop
+# ------------------------
+# TCP server
+# ------------------------
+SERVER_HOST = os.environ.get("TONG777_HOST", "0.0.0.0")
+SERVER_PORT = int(os.environ.get("TONG777_PORT", "7777"))
+SERVER_MAX_SESSIONS = 5000
+SESSION_IDLE_TIMEOUT = 600.0  # seconds without input before a client is disconnected
+SESSION_STACK_SIZE = 512 * 1024  # session threads run shallow call stacks
+
+
+def strip_telnet(data: bytes) -> bytes:
+    """
+    Remove telnet negotiation sequences from client input.
+
+    Input:
+        data (bytes): Raw bytes from the socket.
+
+    Output:
+        bytes: The bytes without IAC commands (option negotiation and sub-negotiation).
+
+    Description:
+        Plain TCP clients (nc) never send IAC (0xFF), so their input passes through unchanged.
+    """
+    if b"\xff" not in data:
+        return data
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte != 0xFF:
+            out.append(byte)
+            i += 1
+        elif i + 1 < len(data) and data[i + 1] == 0xFF:  # escaped 0xFF
+            out.append(0xFF)
+            i += 2
+        elif i + 1 < len(data) and data[i + 1] == 0xFA:  # sub-negotiation up to IAC SE
+            end = data.find(b"\xff\xf0", i + 2)
+            i = len(data) if end < 0 else end + 2
+        elif i + 1 < len(data) and 0xFB <= data[i + 1] <= 0xFE:  # WILL/WONT/DO/DONT option
+            i += 3
+        else:
+            i += 2
+    return bytes(out)
+
+
+class NetSession:
+    """
+    One TCP client of the server, bridging a blocking game session to the event loop.
+
+    Input:
+        reader (asyncio.StreamReader): Client input stream.
+        writer (asyncio.StreamWriter): Client output stream.
+        loop (asyncio.AbstractEventLoop): The server's event loop.
+
+    Output:
+        None
+
+    Description:
+        The menu and the games are blocking code, so each session runs them on its own
+        small-stack thread (run) with a NetworkConsole over this session: writes are handed
+        to the event loop with call_soon_threadsafe, and reads wait on a coroutine scheduled
+        on the loop. All socket I/O, buffering and idle timeouts stay on the single event loop;
+        a session thread that waits for input or sleeps through an animation does not block
+        it, so idle sessions cost one parked thread each and no CPU.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Wrap an accepted connection.
+
+        Input:
+            reader (asyncio.StreamReader): Client input stream.
+            writer (asyncio.StreamWriter): Client output stream.
+            loop (asyncio.AbstractEventLoop): The server's event loop.
+
+        Output:
+            None
+        """
+        self.reader = reader
+        self.writer = writer
+        self.loop = loop
+        peer = writer.get_extra_info("peername")
+        self.source = peer[0] if peer else "unknown"
+        self.finished: asyncio.Future = loop.create_future()
+        self._skip_eol = False
+
+    # Event loop side
+    async def _readline(self) -> str:
+        """
+        Read one line from the client.
+
+        Input:
+            None
+
+        Output:
+            str: The line ending in "\\n", or "" if the client disconnected or went idle.
+
+        Description:
+            Waits for pending output to drain first (back-pressure against clients that do
+            not read). A bare line ending right after a single-key read is the rest of that
+            key's line (line-mode clients send "1\\r\\n") and is skipped.
+        """
+        await self.writer.drain()
         while True:
-            clear_screen()
-            print(tong_777_pic)
-            print(
-                f"Player: {player.username} | Balance: {player.wallet:.2f}\n")
-            print(menu_pic)
-            choice = get_char("Select option (1-8): ").strip()
-            if choice in ("1", "2", "3", "4"):
-                game = games[choice]
-                # decorator handles wallet update and save
-                game.play_round(player)
-            elif choice == "5":
-                player.deposit_interactive()
-            elif choice == "6":
-                player.withdraw_interactive()
-            elif choice == "7":
-                print("Logging out...")
-                time.sleep(0.7)
-                break  # back to login/register loop
-            elif choice == "8":
-                print("Saving and exiting...")
-                player.save()
-                time.sleep(0.8)
-                sys.exit(0)
-            else:
-                print("Please select 1-8 only.")
-                time.sleep(1)
+            line = await asyncio.wait_for(self.reader.readline(), SESSION_IDLE_TIMEOUT)
+            if not line:
+                return ""
+            line = strip_telnet(line).replace(b"\r", b"")
+            if self._skip_eol and line == b"\n":
+                self._skip_eol = False
+                continue
+            self._skip_eol = False
+            return line.decode("utf-8", errors="replace")
+
+    async def _read_char(self) -> str:
+        """
+        Read one key from the client.
+
+        Input:
+            None
+
+        Output:
+            str: One character, or "" if the client disconnected or went idle.
+
+        Description:
+            Skips line endings and telnet commands and decodes multi-byte UTF-8 characters.
+        """
+        await self.writer.drain()
+        pending = b""
+        while True:
+            data = await asyncio.wait_for(self.reader.read(1), SESSION_IDLE_TIMEOUT)
+            if not data:
+                return ""
+            if data == b"\xff":
+                command = await asyncio.wait_for(self.reader.read(1), SESSION_IDLE_TIMEOUT)
+                if command == b"\xfa":
+                    await asyncio.wait_for(self.reader.readuntil(b"\xff\xf0"), SESSION_IDLE_TIMEOUT)
+                elif command and 0xFB <= command[0] <= 0xFE:
+                    await asyncio.wait_for(self.reader.read(1), SESSION_IDLE_TIMEOUT)
+                continue
+            if not pending and data in (b"\r", b"\n", b"\0"):
+                continue
+            pending += data
+            try:
+                ch = pending.decode("utf-8")
+            except UnicodeDecodeError:
+                if len(pending) < 4:
+                    continue  # rest of a multi-byte character
+                pending = b""
+                continue
+            self._skip_eol = True
+            return ch
+
+    def _write(self, data: bytes) -> None:
+        """
+        Queue output on the transport (runs on the event loop).
+
+        Input:
+            data (bytes): Encoded output.
+
+        Output:
+            None
+        """
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+    # Session thread side
+    def _wait(self, coro) -> str:
+        """
+        Run a read coroutine on the event loop and wait for it from the session thread.
+
+        Input:
+            coro (Coroutine): _readline() or _read_char().
+
+        Output:
+            str: Its result, or "" if the client is gone or timed out.
+        """
+        try:
+            return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+        except (TimeoutError, ConnectionError, OSError, RuntimeError, asyncio.IncompleteReadError):
+            return ""
+
+    def write(self, text: str) -> int:
+        """
+        Send text to the client.
+
+        Input:
+            text (str): Output as printed ("\\n" line endings).
+
+        Output:
+            int: Number of characters accepted.
+        """
+        self.loop.call_soon_threadsafe(self._write, text.replace("\n", "\r\n").encode("utf-8"))
+        return len(text)
+
+    def readline(self) -> str:
+        """
+        Read one line (used by NetworkConsole.read_line).
+
+        Input:
+            None
+
+        Output:
+            str: The line, or "" at end of input.
+        """
+        return self._wait(self._readline())
+
+    def read_char(self) -> str:
+        """
+        Read one key (used by NetworkConsole.read_char).
+
+        Input:
+            None
+
+        Output:
+            str: One character.
+
+        Description:
+            Raises EOFError if the client disconnected or went idle.
+        """
+        ch = self._wait(self._read_char())
+        if ch == "":
+            raise EOFError("client disconnected")
+        return ch
+
+    def run(self) -> None:
+        """
+        Session thread: play login, menu and games for this client until it leaves.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Description:
+            A disconnect ends the session wherever it happens (EOFError from a read); wallet
+            changes were already handed to the write-behind queue round by round, and
+            run_session flushes them before the thread ends.
+        """
+        try:
+            run_session(NetworkConsole(self), self.source)
+        except (EOFError, ConnectionError, OSError):
+            pass
+        except Exception as e:
+            sys.__stderr__.write(f"session {self.source} failed: {e!r}\n")
+        finally:
+            self.loop.call_soon_threadsafe(self._close)
+
+    def _close(self) -> None:
+        """
+        Close the connection and mark the session finished (runs on the event loop).
+
+        Input:
+            None
+
+        Output:
+            None
+        """
+        self.writer.close()
+        if not self.finished.done():
+            self.finished.set_result(None)
+
+
+class NetworkConsole(Console):
+    """
+    Console of a TCP client, on top of its NetSession.
+
+    Input:
+        session (NetSession): The client's session.
+
+    Output:
+        None
+
+    Description:
+        Used from the session thread. Output is queued on the event loop; reads wait for the
+        client. clear() sends the ANSI clear / cursor-home sequence, sleep() parks only the
+        session thread.
+    """
+
+    def __init__(self, session: NetSession) -> None:
+        """
+        Wrap a session.
+
+        Input:
+            session (NetSession): The client's session.
+
+        Output:
+            None
+        """
+        self.session = session
+
+    def write(self, text: str) -> None:
+        """Send text to the client."""
+        self.session.write(text)
+
+    def read_line(self, prompt: str = "") -> str:
+        """Read a line from the client; EOFError if it disconnected."""
+        self.session.write(prompt)
+        line = self.session.readline()
+        if line == "":
+            raise EOFError("client disconnected")
+        return line.rstrip("\n")
+
+    def read_char(self, prompt: str = "") -> str:
+        """Read a key from the client; EOFError if it disconnected."""
+        self.session.write(prompt)
+        return self.session.read_char()
+
+    def clear(self) -> None:
+        """Clear the client's screen with ANSI codes."""
+        self.session.write(ANSI_CLEAR)
+
+    def screen(self, *sections: str) -> None:
+        """Send the whole screen in one write."""
+        self.session.write(render_screen(*sections))
+
+    def sleep(self, seconds: float) -> None:
+        """Pause the session thread."""
+        time.sleep(seconds)
+
+
+async def _serve(host: str, port: int) -> None:
+    """
+    Accept clients until cancelled.
+
+    Input:
+        host (str): Address to listen on.
+        port (int): TCP port.
+
+    Output:
+        None
+
+    Description:
+        Each connection gets a NetSession and its own session thread; the handler coroutine
+        just waits until that session finishes. Connections beyond SERVER_MAX_SESSIONS are
+        turned away.
+    """
+    loop = asyncio.get_running_loop()
+    active = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal active
+        if active >= SERVER_MAX_SESSIONS:
+            writer.write(b"Server is full, please try again later.\r\n")
+            writer.close()
+            return
+        active += 1
+        session = NetSession(reader, writer, loop)
+        try:
+            threading.Thread(target=session.run, name=f"session-{session.source}", daemon=True).start()
+            await session.finished
+        finally:
+            active -= 1
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"🎰 Tong777 server listening on {host}:{port} (telnet / nc)")
+    async with server:
+        await server.serve_forever()
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None) -> None:
+    """
+    Run the multi-session TCP server.
+
+    Input:
+        host (str): Address to listen on (default: SERVER_HOST).
+        port (int): TCP port (default: SERVER_PORT).
+
+    Output:
+        None
+
+    Description:
+        Initializes the system like main() and serves clients until interrupted (Ctrl+C), then flushes and closes storage.
+    """
+    get_username_index()
+    auth_service.calibrate()
+    threading.stack_size(SESSION_STACK_SIZE)
+    try:
+        asyncio.run(_serve(host or SERVER_HOST, port or SERVER_PORT))
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        auth_service.close()
+        prepare_service.close()
+        close_storage()
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        # python tong01.py --serve [port]
+        serve(port=int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    else:
+        main()
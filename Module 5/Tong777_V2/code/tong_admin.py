@@ -0,0 +1,360 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Dict
+
+import tong01
+
+V1_HASH_RE = re.compile(r"^\$2[aby]\$\d\d\$[./A-Za-z0-9]{53}$")
+
+# ------------------------
+# Commands
+# ------------------------
+
+
+def cmd_users(args: argparse.Namespace) -> int:
+    """
+    List registered usernames by prefix or range.
+
+    Input:
+        args (argparse.Namespace): Parsed arguments (prefix, low, high, limit, rebuild).
+
+    Output:
+        int: Process exit code.
+
+    Description:
+        Reads the username index file (fast), or rebuilds it from the player store
+        with --rebuild (or when the index file does not exist yet).
+    """
+    index = tong01.UsernameIndex()
+    if args.rebuild or index.load() == 0:
+        index.rebuild()
+    print(f"# {len(index)} players indexed")
+
+    if args.low is not None or args.high is not None:
+        names = index.range(args.low or "", args.high or "\U0010ffff", args.limit)
+    else:
+        names = index.prefix(args.prefix or "", args.limit)
+    for name in names:
+        print(name)
+    return 0
+
+
+# ------------------------
+# V1 -> V2 migration
+# ------------------------
+def convert_v1_chunk(directory: str, names: List[str]) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str]]]:
+    """
+    Validate and convert a chunk of V1 player files (runs in a worker process).
+
+    Input:
+        directory (str): V1 ID_user directory.
+        names (List[str]): File names in the directory to convert.
+
+    Output:
+        Tuple[List[Tuple[str, str, int]], List[Tuple[str, str]]]:
+            (records as (username, hashed_password, wallet cents), rejects as (file name, reason))
+
+    Description:
+        Each V1 file holds "username,hashed_password,wallet". A record is rejected if it is
+        not valid UTF-8, has the wrong number of fields, its username is not valid
+        (tong01.valid_username) or does not match the file name, the hash is not a bcrypt hash, or the wallet is not a non-negative amount with at most
+        2 decimals (parsed straight to integer cents).
+    """
+    records = []
+    rejects = []
+    for name in names:
+        username = name[:-4]
+        if not tong01.valid_username(username):
+            rejects.append((name, "invalid username"))
+            continue
+        try:
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                parts = f.read().strip().split(",")
+        except (IOError, OSError, UnicodeDecodeError) as e:
+            rejects.append((name, f"unreadable: {e}"))
+            continue
+        if len(parts) != 3:
+            rejects.append((name, "expected username,hash,wallet"))
+            continue
+        file_user, hashed_password, wallet_s = parts
+        if file_user != username:
+            rejects.append((name, f"username {file_user!r} does not match file name"))
+            continue
+        if not V1_HASH_RE.match(hashed_password):
+            rejects.append((name, "not a bcrypt hash"))
+            continue
+        try:
+            wallet = tong01.parse_cents(wallet_s)
+        except ValueError:
+            rejects.append((name, f"bad wallet {wallet_s!r}"))
+            continue
+        if wallet < 0:
+            rejects.append((name, f"bad wallet {wallet_s!r}"))
+            continue
+        records.append((username, hashed_password, wallet))
+    return records, rejects
+
+
+def write_checkpoint(path: str, state: Dict) -> None:
+    """
+    Atomically write the migration checkpoint.
+
+    Input:
+        path (str): Checkpoint file path.
+        state (Dict): Source directory, last committed file name and counters.
+
+    Output:
+        None
+
+    Description:
+        Temp file + rename, so an interrupted run never leaves a broken checkpoint.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    """
+    Migrate V1 ID_user files into the active V2 player store.
+
+    Input:
+        args (argparse.Namespace): Parsed arguments (source, workers, chunk, batch,
+            checkpoint, rejects, overwrite).
+
+    Output:
+        int: Process exit code (0 on success, 1 if the source directory is missing).
+
+    Description:
+        Lists the V1 directory with os.scandir and sorts the names, so a run can resume after
+        the last committed name in the checkpoint. Chunks of files are validated and converted
+        in a spawned process pool (executor.map keeps chunk order; spawned workers do not
+        inherit the open store, index or file locks). Converted records are committed in
+        batches of --batch records, after which the checkpoint is updated: with --overwrite
+        through PlayerStore.save_many, otherwise one PlayerStore.create per record, so players
+        that already exist in V2 (also ones registered after the index was read) are skipped.
+        Rejected files are listed in the rejects file. Prints throughput as it goes.
+    """
+    source = os.path.abspath(args.source)
+    if not os.path.isdir(source):
+        print(f"❌ Not a directory: {source}")
+        return 1
+
+    state = {"source": source, "last": "", "migrated": 0, "skipped": 0, "rejected": 0}
+    if os.path.exists(args.checkpoint):
+        with open(args.checkpoint, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("source") == source:
+            state.update(saved)
+            print(f"↪ Resuming after {state['last']!r}")
+
+    with os.scandir(source) as entries:
+        names = sorted(entry.name for entry in entries
+                       if entry.name.endswith(".txt") and entry.name > state["last"])
+    chunks = [names[i:i + args.chunk] for i in range(0, len(names), args.chunk)]
+    print(f"📂 {len(names)} files to migrate in {len(chunks)} chunks")
+
+    store = tong01.get_store()
+    index = tong01.get_username_index()
+    started = time.perf_counter()
+    done = 0
+    batch: List[Tuple[str, str, int]] = []
+
+    def commit(last_name: str) -> None:
+        if args.overwrite:
+            store.save_many(batch)
+            written = list(batch)
+        else:
+            written = [record for record in batch if store.create(*record)]
+            state["skipped"] += len(batch) - len(written)
+        store.sync()
+        for username, _, _ in written:
+            index.add(username)
+        state["migrated"] += len(written)
+        state["last"] = last_name
+        write_checkpoint(args.checkpoint, state)
+        batch.clear()
+        elapsed = time.perf_counter() - started
+        print(f"  {state['migrated']} migrated, {state['skipped']} skipped, "
+              f"{state['rejected']} rejected - {done / elapsed:,.0f} files/s")
+
+    with ProcessPoolExecutor(max_workers=args.workers,
+                             mp_context=multiprocessing.get_context("spawn")) as pool, \
+            open(args.rejects, "a", encoding="utf-8") as rejects_f:
+        results = pool.map(convert_v1_chunk, [source] * len(chunks), chunks)
+        for chunk, (records, rejects) in zip(chunks, results):
+            for name, reason in rejects:
+                rejects_f.write(f"{name}\t{reason}\n")
+            state["rejected"] += len(rejects)
+            for record in records:
+                if not args.overwrite and index.exists(record[0]):
+                    state["skipped"] += 1
+                else:
+                    batch.append(record)
+            done += len(chunk)
+            if len(batch) >= args.batch:
+                commit(chunk[-1])
+        if batch:
+            commit(chunks[-1][-1])
+        elif chunks:
+            state["last"] = chunks[-1][-1]  # also covers skipped records after the last commit
+            write_checkpoint(args.checkpoint, state)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Done in {elapsed:.2f}s ({done / elapsed if elapsed else 0:,.0f} files/s): "
+          f"{state['migrated']} migrated, {state['skipped']} skipped, {state['rejected']} rejected")
+    if state["rejected"]:
+        print(f"   Rejected files are listed in {args.rejects}")
+    return 0
+
+
+# ------------------------
+# Re-sharding
+# ------------------------
+def cmd_reshard(args: argparse.Namespace) -> int:
+    """
+    Move player files from the flat layout into hash shard directories, online.
+
+    Input:
+        args (argparse.Namespace): Parsed arguments (batch, dry_run, force).
+
+    Output:
+        int: Process exit code.
+
+    Description:
+        Safe while the game keeps running with TONG777_LAYOUT=sharded. Each flat file is
+        hard-linked into its shard path, which fails if the game already wrote a newer sharded
+        copy; in both cases the flat file is removed afterwards, so readers always find one of
+        the two (see tong01.player_file_candidates). Links are made durable (shard directory
+        fsync) in batches before the flat names are unlinked. Refuses to move anything
+        (exit code 1) unless TONG777_LAYOUT=sharded is set or --force is given, because a
+        game on the flat layout cannot find moved files.
+    """
+    with os.scandir(tong01.BASE_PATH) as entries:
+        names = [entry.name[:-4] for entry in entries
+                 if entry.name.endswith(".txt") and entry.is_file()]
+    print(f"📂 {len(names)} flat player files")
+    if args.dry_run:
+        return 0
+    if tong01.FILE_LAYOUT != "sharded" and not args.force:
+        print("❌ Set TONG777_LAYOUT=sharded (for this tool and the running games) before "
+              "moving files, or pass --force.")
+        return 1
+
+    started = time.perf_counter()
+    moved = 0
+    stale = 0
+    for i in range(0, len(names), args.batch):
+        linked: List[str] = []
+        directories = set()
+        for username in names[i:i + args.batch]:
+            flat = tong01.flat_player_path(username)
+            target = tong01.sharded_player_path(username)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.link(flat, target)
+                moved += 1
+                directories.add(os.path.dirname(target))
+            except FileExistsError:
+                stale += 1  # the game already wrote the sharded copy
+            except FileNotFoundError:
+                continue  # removed or moved by someone else meanwhile
+            linked.append(flat)
+        for directory in directories:
+            tong01.fsync_directory(directory)
+        for flat in linked:
+            os.unlink(flat)
+        tong01.fsync_directory(tong01.BASE_PATH)
+        elapsed = time.perf_counter() - started
+        print(f"  {moved} moved, {stale} stale flat copies removed - "
+              f"{(moved + stale) / elapsed:,.0f} files/s")
+
+    print(f"✅ Done: {moved} moved, {stale} stale flat copies removed")
+    return 0
+
+
+# ------------------------
+# Entry point
+# ------------------------
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser.
+
+    Input:
+        None
+
+    Output:
+        argparse.ArgumentParser: Parser with one sub-command per admin task.
+
+    Description:
+        Each sub-command stores its handler in the "func" default.
+    """
+    parser = argparse.ArgumentParser(description="Tong777 admin tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    users = sub.add_parser("users", help="search registered usernames")
+    users.add_argument("prefix", nargs="?", help="username prefix")
+    users.add_argument("--from", dest="low", help="range start (inclusive)")
+    users.add_argument("--to", dest="high", help="range end (exclusive)")
+    users.add_argument("--limit", type=int, default=100)
+    users.add_argument("--rebuild", action="store_true",
+                       help="rescan the player store instead of reading the index file")
+    users.set_defaults(func=cmd_users)
+
+    migrate = sub.add_parser("migrate", help="import V1 ID_user files into the V2 store")
+    migrate.add_argument("source", help="V1 ID_user directory")
+    migrate.add_argument("--workers", type=int, default=os.cpu_count(),
+                         help="worker processes (default: CPU count)")
+    migrate.add_argument("--chunk", type=int, default=2000,
+                         help="files per worker task")
+    migrate.add_argument("--batch", type=int, default=50000,
+                         help="records per store transaction")
+    migrate.add_argument("--checkpoint", default="migrate_v1.checkpoint.json",
+                         help="checkpoint file used to resume")
+    migrate.add_argument("--rejects", default="migrate_v1.rejects.txt",
+                         help="file that lists rejected V1 files")
+    migrate.add_argument("--overwrite", action="store_true",
+                         help="overwrite players that already exist in V2")
+    migrate.set_defaults(func=cmd_migrate)
+
+    reshard = sub.add_parser("reshard", help="move flat player files into hash shards")
+    reshard.add_argument("--batch", type=int, default=1000,
+                         help="files moved between directory fsyncs")
+    reshard.add_argument("--dry-run", action="store_true",
+                         help="only count the flat files")
+    reshard.add_argument("--force", action="store_true",
+                         help="move files even if TONG777_LAYOUT is not sharded")
+    reshard.set_defaults(func=cmd_reshard)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Admin tool entry point.
+
+    Input:
+        argv (Optional[List[str]]): Arguments (default: sys.argv[1:]).
+
+    Output:
+        int: Process exit code.
+
+    Description:
+        Runs the selected sub-command and closes the player store afterwards.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        tong01.close_storage()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
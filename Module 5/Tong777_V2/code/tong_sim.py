@@ -0,0 +1,376 @@
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple, Dict
+
+import tong01
+
+# ------------------------
+# Strategies
+# ------------------------
+
+
+class Strategy:
+    """
+    Player strategy for simulated rounds (Interface with simple defaults).
+
+    Input:
+        bet (int): Bet per round in cents (default: 100).
+
+    Output:
+        None
+
+    Description:
+        The simulator asks the strategy for every decision a player makes in play_round.
+        Subclass it and override the decisions; select it with --strategy module:Class.
+    """
+
+    def __init__(self, bet: int = 100) -> None:
+        """
+        Create a strategy.
+
+        Input:
+            bet (int): Bet per round in cents.
+
+        Output:
+            None
+        """
+        self.bet_cents = bet
+
+    def bet(self) -> int:
+        """
+        Bet for the next round.
+
+        Input:
+            None
+
+        Output:
+            int: Bet in cents.
+        """
+        return self.bet_cents
+
+    def highlow(self, num1: int) -> str:
+        """
+        High-Low guess.
+
+        Input:
+            num1 (int): The first number.
+
+        Output:
+            str: 'h' or 'l'.
+        """
+        return 'h'
+
+    def coin(self) -> str:
+        """
+        Coin Flip guess.
+
+        Input:
+            None
+
+        Output:
+            str: 'h' or 't'.
+        """
+        return 'h'
+
+    def blackjack(self, total: int, dealer_up: int) -> str:
+        """
+        Blackjack decision.
+
+        Input:
+            total (int): Player's hand value.
+            dealer_up (int): Value of the dealer's visible card (2-11).
+
+        Output:
+            str: 'h' (hit) or 's' (stand).
+        """
+        return 'h' if total < 17 else 's'
+
+
+class FixedStrategy(Strategy):
+    """
+    Always the same choice: High-Low and Coin Flip guess 'h', Blackjack hits below 17
+    (mimics the dealer).
+    """
+
+
+class SmartStrategy(Strategy):
+    """
+    Best simple play: High-Low guesses the side with more numbers left, Blackjack follows
+    the basic stand/hit rules for hard totals (no doubling or splitting in this game).
+    """
+
+    def highlow(self, num1: int) -> str:
+        """
+        Guess higher for 1-50 (more numbers above), lower for 51-100.
+
+        Input:
+            num1 (int): The first number.
+
+        Output:
+            str: 'h' or 'l'.
+        """
+        return 'h' if num1 <= 50 else 'l'
+
+    def blackjack(self, total: int, dealer_up: int) -> str:
+        """
+        Stand on 17+, stand on 12-16 against a weak dealer card (2-6), otherwise hit.
+
+        Input:
+            total (int): Player's hand value.
+            dealer_up (int): Value of the dealer's visible card.
+
+        Output:
+            str: 'h' or 's'.
+        """
+        if total >= 17 or (total >= 12 and 2 <= dealer_up <= 6):
+            return 's'
+        return 'h'
+
+
+STRATEGIES = {
+    "fixed": FixedStrategy,
+    "smart": SmartStrategy,
+}
+
+
+def load_strategy(spec: str, bet: int) -> Strategy:
+    """
+    Create a strategy from its name or "module:Class".
+
+    Input:
+        spec (str): Key of STRATEGIES or an importable "module:Class".
+        bet (int): Bet per round in cents.
+
+    Output:
+        Strategy: The strategy instance.
+
+    Description:
+        Raises ValueError for an unknown name.
+    """
+    if spec in STRATEGIES:
+        return STRATEGIES[spec](bet)
+    if ":" not in spec:
+        raise ValueError(f"Unknown strategy: {spec}")
+    module_name, class_name = spec.split(":", 1)
+    return getattr(importlib.import_module(module_name), class_name)(bet)
+
+
+# ------------------------
+# Round runners
+# ------------------------
+GAMES = {
+    "highlow": tong01.HighLow,
+    "coinflip": tong01.CoinFlip,
+    "blackjack": tong01.Blackjack,
+    "slots": tong01.Slots,
+}
+
+
+def run_rounds(game_name: str, rounds: int, strategy_spec: str, bet: int, seed: int) -> Dict[str, int]:
+    """
+    Play rounds of one game, outcome and settlement only (runs in a worker process).
+
+    Input:
+        game_name (str): Key of GAMES.
+        rounds (int): Rounds to play.
+        strategy_spec (str): Strategy name or "module:Class".
+        bet (int): Bet per round in cents.
+        seed (int): Session seed of the game (and seed of the random module for strategies).
+
+    Output:
+        Dict[str, int]: rounds, wagered, net, sum of squared net, wins, pushes, losses.
+
+    Description:
+        Calls the same draw and settle methods that play_round uses, without the console,
+        animations or wallet updates. The bankroll is unlimited (every round is bet).
+    """
+    random.seed(seed)
+    strategy = load_strategy(strategy_spec, bet)
+    game = GAMES[game_name](tong01.ScriptedConsole(()), seed)
+    wagered = net_total = net_squares = wins = pushes = 0
+
+    for _ in range(rounds):
+        stake = strategy.bet()
+        if game_name == "highlow":
+            num1 = game.draw_number()
+            guess = strategy.highlow(num1)
+            net = game.settle(stake, guess, num1, game.draw_number())
+        elif game_name == "coinflip":
+            guess = strategy.coin()
+            net = game.settle(stake, guess, game.flip())
+        elif game_name == "blackjack":
+            net = game.play_hand(stake, lambda hand, up: strategy.blackjack(
+                game._hand_value(hand), game._card_value(up)))
+        else:
+            r1, r2, r3 = game.spin()
+            net = game.settle(r1, r2, r3, stake)[0]
+        wagered += stake
+        net_total += net
+        net_squares += net * net
+        if net > 0:
+            wins += 1
+        elif net == 0:
+            pushes += 1
+
+    return {"rounds": rounds, "wagered": wagered, "net": net_total, "net_squares": net_squares,
+            "wins": wins, "pushes": pushes, "losses": rounds - wins - pushes}
+
+
+def merge_stats(total: Dict[str, int], part: Dict[str, int]) -> None:
+    """
+    Add one chunk's counters into the running totals.
+
+    Input:
+        total (Dict[str, int]): Running totals (updated in place).
+        part (Dict[str, int]): Counters from run_rounds.
+
+    Output:
+        None
+    """
+    for key, value in part.items():
+        total[key] = total.get(key, 0) + value
+
+
+def rtp_interval(stats: Dict[str, int]) -> Tuple[float, float]:
+    """
+    Return-to-player with a 95% confidence half-width.
+
+    Input:
+        stats (Dict[str, int]): Merged counters.
+
+    Output:
+        Tuple[float, float]: (RTP, half-width), both as fractions of the amount wagered.
+
+    Description:
+        Normal approximation over the per-round net results (fixed bet assumed).
+    """
+    n = stats["rounds"]
+    mean_bet = stats["wagered"] / n
+    mean = stats["net"] / n
+    variance = max(0.0, stats["net_squares"] / n - mean * mean)
+    return 1 + mean / mean_bet, 1.96 * math.sqrt(variance / n) / mean_bet
+
+
+# ------------------------
+# Entry point
+# ------------------------
+def simulate(game_name: str, rounds: int, strategy_spec: str, bet: int,
+             workers: int, chunk: int, seed: Optional[int]) -> Dict[str, int]:
+    """
+    Run a simulation, fanned out over worker processes, and report progress.
+
+    Input:
+        game_name (str): Key of GAMES.
+        rounds (int): Total rounds.
+        strategy_spec (str): Strategy name or "module:Class".
+        bet (int): Bet per round in cents.
+        workers (int): Worker processes (1 runs in this process).
+        chunk (int): Rounds per task.
+        seed (Optional[int]): Base seed for a reproducible run (default: random).
+
+    Output:
+        Dict[str, int]: Merged counters.
+
+    Description:
+        Each chunk gets its own seed (base seed + chunk number), so a seeded run gives the same
+        totals whatever the number of workers. Prints rounds/s as chunks complete.
+    """
+    base_seed = seed if seed is not None else int.from_bytes(os.urandom(8), "little")
+    sizes = [min(chunk, rounds - start) for start in range(0, rounds, chunk)]
+    stats: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    def report(final: bool = False) -> None:
+        elapsed = time.perf_counter() - started
+        rate = stats["rounds"] / elapsed if elapsed else 0.0
+        prefix = "✅" if final else "  "
+        print(f"{prefix} {stats['rounds']:,} rounds in {elapsed:.2f}s - {rate:,.0f} rounds/s")
+
+    if workers <= 1:
+        for i, size in enumerate(sizes):
+            merge_stats(stats, run_rounds(game_name, size, strategy_spec, bet, base_seed + i))
+            report()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_rounds, game_name, size, strategy_spec, bet, base_seed + i)
+                       for i, size in enumerate(sizes)]
+            for future in as_completed(futures):
+                merge_stats(stats, future.result())
+                report()
+    report(final=True)
+    return stats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser.
+
+    Input:
+        None
+
+    Output:
+        argparse.ArgumentParser: Parser for the simulator options.
+    """
+    parser = argparse.ArgumentParser(description="Tong777 headless game simulator")
+    parser.add_argument("game", choices=sorted(GAMES), help="game to simulate")
+    parser.add_argument("--rounds", type=int, default=1000000)
+    parser.add_argument("--bet", default="1.00", help="bet per round (default: 1.00)")
+    parser.add_argument("--strategy", default="fixed",
+                        help=f"one of {', '.join(sorted(STRATEGIES))} or module:Class")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=100000, help="rounds per worker task")
+    parser.add_argument("--seed", type=int, help="base seed for a reproducible run")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Simulator entry point.
+
+    Input:
+        argv (Optional[List[str]]): Arguments (default: sys.argv[1:]).
+
+    Output:
+        int: Process exit code.
+
+    Description:
+        Prints the throughput, the RTP with its 95% confidence interval and the win / push /
+        loss frequencies.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        bet = tong01.parse_cents(args.bet)
+        load_strategy(args.strategy, bet)
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"❌ {e}")
+        return 1
+    if bet <= 0 or args.rounds <= 0:
+        print("❌ --bet and --rounds must be positive")
+        return 1
+    if args.chunk <= 0 or args.workers <= 0:
+        print("❌ --chunk and --workers must be positive")
+        return 1
+
+    print(f"🎰 Simulating {args.rounds:,} rounds of {args.game} "
+          f"(strategy {args.strategy}, bet {tong01.format_cents(bet)}, {args.workers} workers)")
+    stats = simulate(args.game, args.rounds, args.strategy, bet,
+                     args.workers, args.chunk, args.seed)
+    rtp, half_width = rtp_interval(stats)
+    n = stats["rounds"]
+    print(f"   wagered {tong01.format_cents(stats['wagered'])}, "
+          f"net {tong01.format_cents(stats['net'], sign=True)}")
+    print(f"   RTP {rtp * 100:.3f}% ± {half_width * 100:.3f}% (95% CI)")
+    print(f"   wins {stats['wins'] / n:.2%}, pushes {stats['pushes'] / n:.2%}, "
+          f"losses {stats['losses'] / n:.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())